@@ -115,7 +115,8 @@ class Writer(api.RecordWriter):
         out_dir = jc["mapred.work.output.dir"]
         outfn = "%s/part-%05d" % (out_dir, part)
         hdfs_user = jc.get("pydoop.hdfs.user", None)
-        self.file = hdfs.open(outfn, "wt", user=hdfs_user)
+        self.file = hdfs.open(outfn, "wt", user=hdfs_user,
+                              write_buffer_size=1024 * 1024)
         self.sep = jc.get("mapred.textoutputformat.separator", "\t")
         self.eol = jc.get("mapred.textoutputformat.eol", "\n")
 
@@ -38,8 +38,9 @@ try:
     from pydoop.version import version as __version__
 except ImportError:  # should only happen at compile time
     DEFAULT_HADOOP_HOME = __version__ = None
+# Hadoop paths & co. are computed (and cached) on demand: doing it here
+# would slow down the import of any pydoop module considerably
 _PATH_FINDER = hu.PathFinder()
-_HADOOP_INFO = _PATH_FINDER.find()  # fill the cache ASAP
 
 __author__ = ", ".join((
     "Simone Leo",
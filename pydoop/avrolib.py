@@ -23,9 +23,14 @@ Avro tools.
 # module anywhere in the main code (importing it in the Avro examples
 # is OK, ofc).
 
+import os
 import sys
+import bz2
+import zlib
+import struct
+from collections import deque
 import avro.schema
-from avro.datafile import DataFileReader, DataFileWriter
+from avro.datafile import DataFileReader
 from avro.io import DatumReader, DatumWriter, BinaryDecoder, BinaryEncoder
 
 import pydoop
@@ -33,15 +38,18 @@ import pydoop.mapreduce.pipes as pp
 from pydoop.mapreduce.api import RecordWriter, RecordReader
 import pydoop.hdfs as hdfs
 from pydoop.app.submit import AVRO_IO_CHOICES
-from pydoop.utils.py3compat import StringIO, iteritems
+from pydoop.utils.py3compat import StringIO
 
 parse = avro.schema.Parse if sys.version_info[0] == 3 else avro.schema.parse
 
 
 class Deserializer(object):
-    def __init__(self, schema_str):
+    def __init__(self, schema_str, reader_schema_str=None):
         schema = parse(schema_str)
-        self.reader = DatumReader(schema)
+        if reader_schema_str is None:
+            self.reader = DatumReader(schema)
+        else:
+            self.reader = DatumReader(schema, parse(reader_schema_str))
 
     def deserialize(self, rec_bytes):
         return self.reader.read(BinaryDecoder(StringIO(rec_bytes)))
@@ -71,6 +79,23 @@ except ImportError as e:
     AvroSerializer = Serializer
 
 
+def make_deserializer(schema_str, reader_schema_str=None):
+    """
+    Return a deserializer for data written with ``schema_str``.
+
+    If ``reader_schema_str`` is not :obj:`None`, records are resolved
+    against it (see the "Schema Resolution" section of the Avro
+    specification). In particular, if the reader schema is a projection
+    of the writer's one (i.e., a record with a subset of its fields),
+    the other fields are skipped without being converted to Python
+    objects. Since ``pyavroc`` does not support schema resolution, the
+    pure Python deserializer is used in this case.
+    """
+    if reader_schema_str is None:
+        return AvroDeserializer(schema_str)
+    return Deserializer(schema_str, reader_schema_str)
+
+
 AVRO_IO_CHOICES = set(AVRO_IO_CHOICES)
 
 AVRO_INPUT = pydoop.PROPERTIES['AVRO_INPUT']
@@ -79,6 +104,17 @@ AVRO_KEY_INPUT_SCHEMA = pydoop.PROPERTIES['AVRO_KEY_INPUT_SCHEMA']
 AVRO_KEY_OUTPUT_SCHEMA = pydoop.PROPERTIES['AVRO_KEY_OUTPUT_SCHEMA']
 AVRO_VALUE_INPUT_SCHEMA = pydoop.PROPERTIES['AVRO_VALUE_INPUT_SCHEMA']
 AVRO_VALUE_OUTPUT_SCHEMA = pydoop.PROPERTIES['AVRO_VALUE_OUTPUT_SCHEMA']
+AVRO_KEY_INPUT_PROJECTION = pydoop.PROPERTIES['AVRO_KEY_INPUT_PROJECTION']
+AVRO_VALUE_INPUT_PROJECTION = pydoop.PROPERTIES['AVRO_VALUE_INPUT_PROJECTION']
+AVRO_INPUT_WORKERS = pydoop.PROPERTIES['AVRO_INPUT_WORKERS']
+AVRO_INPUT_BLOCKS = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS']
+AVRO_INPUT_BLOCKS_SCHEMA = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS_SCHEMA']
+AVRO_INPUT_BLOCKS_CODEC = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS_CODEC']
+AVRO_OUTPUT_CODEC = pydoop.PROPERTIES['AVRO_OUTPUT_CODEC']
+AVRO_OUTPUT_SYNC_INTERVAL = pydoop.PROPERTIES['AVRO_OUTPUT_SYNC_INTERVAL']
+AVRO_OUTPUT_WRITE_BUFFER_SIZE = pydoop.PROPERTIES[
+    'AVRO_OUTPUT_WRITE_BUFFER_SIZE'
+]
 
 
 class AvroContext(pp.TaskContext):
@@ -90,21 +126,40 @@ class AvroContext(pp.TaskContext):
     (``src/it/crs4/pydoop/mapreduce/pipes``).  Avro I/O mode must
     be explicitly requested when launching the application with pydoop
     submit (``--avro-input``, ``--avro-output``).
+
+    If ``AVRO_INPUT_BLOCKS`` is set to ``true`` in the job conf, each
+    input item is a whole Avro data block (see :class:`BlockDecoder`)
+    rather than a single record: blocks are decoded in one go, and the
+    mapper is called once for each record, with the key and/or value
+    already deserialized.
     """
     def deserializing(self, meth, deserializer):
         """
         Decorate a key/value getter to make it auto-deserialize Avro
         records.
+
+        The deserialized datum is cached until the getter returns a
+        different raw object, so accessing the key or value of the
+        current record more than once does not decode it again.
         """
+        memo = [None, None]  # raw record, datum
+
         def deserialize(*args, **kwargs):
             ret = meth(*args, **kwargs)
+            if ret is memo[0] and ret is not None:
+                return memo[1]
             with self.timer.time_block('avro deserialization'):
-                return deserializer.deserialize(ret)
+                datum = deserializer.deserialize(ret)
+            memo[:] = ret, datum
+            return datum
         return deserialize
 
     def __init__(self, *args, **kwargs):
         super(AvroContext, self).__init__(*args, **kwargs)
-        self.__serializers = {'K': None, 'V': None}
+        self.__serialize = None
+        self.__map_only = False
+        self.__block_decoder = None
+        self.__avro_input = None
 
     def set_job_conf(self, vals):
         """
@@ -116,32 +171,112 @@ class AvroContext(pp.TaskContext):
             avro_input = jc.get(AVRO_INPUT).upper()
             if avro_input not in AVRO_IO_CHOICES:
                 raise RuntimeError('invalid avro input: %s' % avro_input)
-            if avro_input == 'K' or avro_input == 'KV':
-                deserializer = AvroDeserializer(
-                    jc.get(AVRO_KEY_INPUT_SCHEMA)
+            self.__avro_input = avro_input
+            if jc.get_bool(AVRO_INPUT_BLOCKS, False):
+                self.__block_decoder = self.__make_block_decoder(
+                    avro_input, jc
+                )
+            elif avro_input == 'K' or avro_input == 'KV':
+                deserializer = make_deserializer(
+                    jc.get(AVRO_KEY_INPUT_SCHEMA),
+                    jc.get(AVRO_KEY_INPUT_PROJECTION, None)
                 )
                 self.get_input_key = self.deserializing(
                     self.get_input_key, deserializer
                 )
-            if avro_input == 'V' or avro_input == 'KV':
-                deserializer = AvroDeserializer(
-                    jc.get(AVRO_VALUE_INPUT_SCHEMA)
+            if self.__block_decoder is None and (
+                    avro_input == 'V' or avro_input == 'KV'
+            ):
+                deserializer = make_deserializer(
+                    jc.get(AVRO_VALUE_INPUT_SCHEMA),
+                    jc.get(AVRO_VALUE_INPUT_PROJECTION, None)
                 )
                 self.get_input_value = self.deserializing(
                     self.get_input_value, deserializer
                 )
+        self.__serialize = None
         if AVRO_OUTPUT in jc:
             avro_output = jc.get(AVRO_OUTPUT).upper()
             if avro_output not in AVRO_IO_CHOICES:
                 raise RuntimeError('invalid avro output: %s' % avro_output)
-            if avro_output == 'K' or avro_output == 'KV':
-                self.__serializers['K'] = AvroSerializer(
-                    jc.get(AVRO_KEY_OUTPUT_SCHEMA)
-                )
-            if avro_output == 'V' or avro_output == 'KV':
-                self.__serializers['V'] = AvroSerializer(
-                    jc.get(AVRO_VALUE_OUTPUT_SCHEMA)
-                )
+            self.__serialize = self.__make_serialize(avro_output, jc)
+            self.__map_only = self.__is_map_only()
+        self.__bind_emit()
+
+    def set_is_mapper(self):
+        super(AvroContext, self).set_is_mapper()
+        self.__bind_emit()
+
+    def set_is_reducer(self):
+        super(AvroContext, self).set_is_reducer()
+        self.__bind_emit()
+
+    def __make_block_decoder(self, avro_input, jc):
+        codec = jc.get(AVRO_INPUT_BLOCKS_CODEC, 'null')
+        if avro_input == 'KV':
+            # projections only apply to key or value records
+            return BlockDecoder(jc.get(AVRO_INPUT_BLOCKS_SCHEMA), codec=codec)
+        if avro_input == 'K':
+            schema_prop = AVRO_KEY_INPUT_SCHEMA
+            proj_prop = AVRO_KEY_INPUT_PROJECTION
+        else:
+            schema_prop = AVRO_VALUE_INPUT_SCHEMA
+            proj_prop = AVRO_VALUE_INPUT_PROJECTION
+        schema = jc.get(AVRO_INPUT_BLOCKS_SCHEMA, None) or jc.get(schema_prop)
+        return BlockDecoder(
+            schema, codec=codec, reader_schema=jc.get(proj_prop, None)
+        )
+
+    def expand_input(self, stream):
+        """
+        In block mode, turn the stream of Avro data blocks into a
+        stream of deserialized ``(key, value)`` records.
+        """
+        decoder = self.__block_decoder
+        if decoder is None:
+            return stream
+        return self.__expand_blocks(stream, decoder, self.__avro_input)
+
+    def __expand_blocks(self, stream, decoder, avro_input):
+        timer = self.timer
+        for _, block in stream:
+            with timer.time_block('avro deserialization'):
+                records = decoder.decode(block)
+            if avro_input == 'V':
+                for r in records:
+                    yield None, r
+            elif avro_input == 'K':
+                for r in records:
+                    yield r, None
+            else:
+                for r in records:
+                    yield r['key'], r['value']
+
+    def __make_serialize(self, avro_output, jc):
+        """
+        Return a function that serializes the key, the value or both,
+        according to the Avro output mode.
+        """
+        timer = self.timer
+        if avro_output == 'K' or avro_output == 'KV':
+            key_ser = AvroSerializer(jc.get(AVRO_KEY_OUTPUT_SCHEMA)).serialize
+        if avro_output == 'V' or avro_output == 'KV':
+            val_ser = AvroSerializer(
+                jc.get(AVRO_VALUE_OUTPUT_SCHEMA)
+            ).serialize
+        if avro_output == 'K':
+            def serialize(key, value):
+                with timer.time_block('avro serialization'):
+                    return key_ser(key), value
+        elif avro_output == 'V':
+            def serialize(key, value):
+                with timer.time_block('avro serialization'):
+                    return key, val_ser(value)
+        else:
+            def serialize(key, value):
+                with timer.time_block('avro serialization'):
+                    return key_ser(key), val_ser(value)
+        return serialize
 
     def emit(self, key, value):
         """
@@ -151,20 +286,27 @@ class AvroContext(pp.TaskContext):
 
         #. AVRO_OUTPUT is in the job conf and
         #. we are either in a reducer or in a map-only app's mapper
+
+        Since both conditions are fixed once the job conf and the task
+        type are known, this method is replaced, on the instance, by
+        either a serializing emit or the plain one (see
+        :meth:`set_job_conf`, :meth:`set_is_mapper` and
+        :meth:`set_is_reducer`).
         """
-        key, value = self.__serialize_as_needed(key, value)
-        super(AvroContext, self).emit(key, value)
+        self.__bind_emit()
+        self.emit(key, value)
+
+    def __bind_emit(self):
+        emit = super(AvroContext, self).emit
+        serialize = self.__serialize
+        if serialize is None or not (self.__map_only or self.is_reducer()):
+            self.emit = emit
+            return
 
-    def __serialize_as_needed(self, key, value):
-        out_kv = {'K': key, 'V': value}
-        jc = self.job_conf
-        if AVRO_OUTPUT in jc and (self.is_reducer() or self.__is_map_only()):
-            for mode, record in iteritems(out_kv):
-                serializer = self.__serializers.get(mode)
-                if serializer is not None:
-                    with self.timer.time_block('avro serialization'):
-                        out_kv[mode] = serializer.serialize(record)
-        return out_kv['K'], out_kv['V']
+        def serializing_emit(key, value):
+            key, value = serialize(key, value)
+            emit(key, value)
+        self.emit = serializing_emit
 
     # move to super?
     def __is_map_only(self):
@@ -199,45 +341,472 @@ class SeekableDataFileReader(DataFileReader):
                 f.seek(pos + sync_offset)
                 self._block_count = 0
                 return
-            pos += len(data)
+            # the marker might straddle two windows
+            pos += max(len(data) - sml + 1, 1)
+
+
+MAGIC = b"Obj\x01"
+SYNC_SIZE = 16
+DEFAULT_BUFSIZE = 4 * 2**20
+DEFAULT_SYNC_INTERVAL = 64000  # same as the Java implementation
+
+_DECOMPRESS = {
+    "null": None,
+    "deflate": lambda data: zlib.decompress(data, -15),
+    "bzip2": bz2.decompress,
+}
+try:
+    import lzma
+except ImportError:
+    pass
+else:
+    _DECOMPRESS["xz"] = lzma.decompress
+try:
+    import snappy
+except ImportError:
+    pass
+else:
+    # the compressed data is followed by a 4-byte CRC32 checksum
+    _DECOMPRESS["snappy"] = lambda data: snappy.decompress(data[:-4])
+
+
+def _deflate(data):
+    c = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+
+_COMPRESS = {"null": None, "deflate": _deflate, "bzip2": bz2.compress}
+if "xz" in _DECOMPRESS:
+    _COMPRESS["xz"] = lzma.compress
+if "snappy" in _DECOMPRESS:
+    _COMPRESS["snappy"] = lambda data: snappy.compress(data) + struct.pack(
+        ">I", zlib.crc32(data) & 0xffffffff
+    )
+
+
+def _read_long(buf, pos):
+    """
+    Decode the zig-zag varint starting at ``buf[pos]``. Return the
+    value and the position right after it.
+    """
+    b = bytearray(buf[pos: pos + 10])
+    n = shift = i = 0
+    while 1:
+        try:
+            c = b[i]
+        except IndexError:
+            raise EOFError("truncated varint at %d" % pos)
+        n |= (c & 0x7f) << shift
+        i += 1
+        if not c & 0x80:
+            break
+        shift += 7
+    return (n >> 1) ^ -(n & 1), pos + i
+
+
+def _encode_long(n):
+    n = (n << 1) ^ (n >> 63)
+    out = bytearray()
+    while n & ~0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _pread(f, position, length):
+    try:
+        pread = f.pread
+    except AttributeError:
+        f.seek(position)
+        return f.read(length)
+    return pread(position, length)
+
+
+def block_deserializer(schema_str, reader_schema_str=None):
+    """
+    Return a deserializer that decodes a whole Avro data block, framed
+    by :func:`frame_block`, into a list of records.
+
+    Framing the block as an Avro array lets the decoder (``pyavroc``,
+    if available) process all records in a single call. See
+    :func:`make_deserializer` for ``reader_schema_str``.
+    """
+    def array_of(s):
+        return '{"type": "array", "items": %s}' % s
+    if reader_schema_str is None:
+        return make_deserializer(array_of(schema_str))
+    return make_deserializer(array_of(schema_str), array_of(reader_schema_str))
+
+
+def frame_block(count, data):
+    """
+    Turn the (uncompressed) contents of a data block holding ``count``
+    records into an array-encoded datum.
+    """
+    return b"".join((_encode_long(count), data, b"\x00"))
+
+
+def pack_block(count, data):
+    """
+    Pack the contents of a data block holding ``count`` records, as
+    stored in the file (i.e., possibly compressed), into a single
+    string, for block passthrough (see :class:`BlockDecoder`).
+    """
+    return _encode_long(count) + data
+
+
+class BlockDecoder(object):
+    """
+    Decode Avro data blocks packed by :func:`pack_block`.
+
+    ``codec`` is the compression codec of the blocks, as in the
+    ``avro.codec`` metadata of the file they come from. If
+    ``reader_schema`` is not :obj:`None`, records are resolved against
+    it (see :func:`make_deserializer`).
+    """
+    def __init__(self, schema, codec="null", reader_schema=None):
+        if codec not in _DECOMPRESS:
+            raise ValueError("unsupported codec: %r" % (codec,))
+        self.codec = codec
+        self.deserializer = block_deserializer(schema, reader_schema)
+        self.__decompress = _DECOMPRESS[codec]
+
+    def decode(self, block):
+        """
+        Return the list of records in ``block``.
+        """
+        deserialize = self.deserializer.deserialize
+        if self.__decompress is None:  # already framed, except for the end
+            return deserialize(block + b"\x00")
+        count, pos = _read_long(block, 0)
+        data = self.__decompress(block[pos:])
+        return deserialize(frame_block(count, data))
+
+
+class AvroBlockReader(object):
+    """
+    Split-aware reader for Avro container files.
+
+    Reads the data blocks that belong to the ``[start, start + length)``
+    region of file object ``f``: a block belongs to the region where
+    the sync marker that precedes it starts, so that the blocks of a
+    file are partitioned among the input splits. Data is fetched with
+    positional reads of ``bufsize`` bytes. If ``workers`` is greater
+    than 1, blocks are decompressed on a pool of threads while records
+    are being decoded.
+
+    Records are decoded one block at a time (see
+    :func:`block_deserializer`): :meth:`batches` generates the list of
+    records in each block, while iterating over the reader generates
+    the individual records. If ``reader_schema`` is not :obj:`None`,
+    records are resolved against it (see :func:`make_deserializer`).
+    """
+    def __init__(self, f, start=0, length=None, workers=1,
+                 bufsize=DEFAULT_BUFSIZE, reader_schema=None):
+        self.f = f
+        self.bufsize = bufsize
+        self.workers = workers
+        self.file_length = getattr(f, "size", None)
+        if self.file_length is None:  # not an HDFS file
+            f.seek(0, os.SEEK_END)
+            self.file_length = f.tell()
+        self.start = start
+        self.end = self.file_length if length is None else start + length
+        self.__buf, self.__buf_pos = b"", 0
+        self.__read_header()
+        self.codec = self.meta.get("avro.codec", b"null").decode("ascii")
+        if self.codec not in _DECOMPRESS:
+            raise ValueError("unsupported codec: %r" % (self.codec,))
+        self.schema = self.meta["avro.schema"].decode("utf-8")
+        self.reader_schema = reader_schema
+        self.deserializer = block_deserializer(self.schema, reader_schema)
+        self.position = self.start
+
+    def __get(self, position, length):
+        """
+        Return ``length`` bytes starting at ``position``, reading in
+        chunks of at least ``bufsize`` bytes.
+        """
+        offset = position - self.__buf_pos
+        if offset < 0 or offset + length > len(self.__buf):
+            self.__buf = _pread(self.f, position, max(length, self.bufsize))
+            self.__buf_pos, offset = position, 0
+        return self.__buf[offset: offset + length]
+
+    def __read_header(self):
+        size = 4096
+        while 1:
+            buf = _pread(self.f, 0, size)
+            try:
+                self.meta, pos = self.__parse_header(buf)
+            except EOFError:
+                if len(buf) < size:
+                    raise IOError("%s: truncated header" % self.f.name)
+                size *= 4
+            else:
+                break
+        if len(buf) < pos + SYNC_SIZE:
+            raise IOError("%s: truncated header" % self.f.name)
+        self.sync_marker = buf[pos: pos + SYNC_SIZE]
+        self.header_end = pos + SYNC_SIZE
+
+    def __parse_header(self, buf):
+        if buf[:len(MAGIC)] != MAGIC:
+            raise IOError("%s: not an Avro data file" % self.f.name)
+        meta, pos = {}, len(MAGIC)
+        while 1:
+            count, pos = _read_long(buf, pos)
+            if count == 0:
+                return meta, pos
+            if count < 0:
+                count = -count
+                _, pos = _read_long(buf, pos)  # size in bytes
+            for _ in range(count):
+                items = []
+                for _ in range(2):
+                    n, pos = _read_long(buf, pos)
+                    if pos + n > len(buf):
+                        raise EOFError
+                    items.append(buf[pos: pos + n])
+                    pos += n
+                meta[items[0].decode("utf-8")] = items[1]
+
+    def find_sync(self, position):
+        """
+        Return the position of the first sync marker that starts at or
+        after ``position`` (-1 if there is none).
+        """
+        sm = self.sync_marker
+        position = max(position, self.header_end - SYNC_SIZE)
+        while position <= self.file_length - SYNC_SIZE:
+            data = _pread(self.f, position, self.bufsize)
+            i = data.find(sm)
+            if i > -1:
+                return position + i
+            if len(data) < SYNC_SIZE:
+                break
+            # the marker might straddle two windows
+            position += len(data) - SYNC_SIZE + 1
+        return -1
+
+    def raw_blocks(self):
+        """
+        Generate ``(offset, count, data)`` tuples for the data blocks
+        in the region, where ``data`` is still compressed.
+        """
+        sync = self.find_sync(self.start)
+        if sync < 0 or sync >= self.end:
+            return
+        pos = sync + SYNC_SIZE
+        while pos < self.file_length:
+            head = self.__get(pos, 20)
+            count, i = _read_long(head, 0)
+            size, i = _read_long(head, i)
+            data_pos = pos + i
+            chunk = self.__get(data_pos, size + SYNC_SIZE)
+            if len(chunk) < size + SYNC_SIZE:
+                raise IOError("%s: truncated block at %d" % (
+                    self.f.name, pos
+                ))
+            if chunk[size:] != self.sync_marker:
+                raise IOError("%s: bad sync marker after block at %d" % (
+                    self.f.name, pos
+                ))
+            yield pos, count, chunk[:size]
+            self.position = sync = data_pos + size
+            if sync >= self.end:
+                break
+            pos = sync + SYNC_SIZE
+        self.position = self.end
+
+    def blocks(self):
+        """
+        Generate ``(offset, count, data)`` tuples for the data blocks
+        in the region, with ``data`` decompressed.
+        """
+        decompress = _DECOMPRESS[self.codec]
+        if decompress is None:
+            for t in self.raw_blocks():
+                yield t
+            return
+        if self.workers <= 1:
+            for offset, count, data in self.raw_blocks():
+                yield offset, count, decompress(data)
+            return
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(self.workers)
+        pending = deque()
+        try:
+            for offset, count, data in self.raw_blocks():
+                pending.append(
+                    (offset, count, pool.apply_async(decompress, (data,)))
+                )
+                if len(pending) > 2 * self.workers:
+                    offset, count, res = pending.popleft()
+                    yield offset, count, res.get()
+            while pending:
+                offset, count, res = pending.popleft()
+                yield offset, count, res.get()
+        finally:
+            pool.close()
+            pool.join()
+
+    def batches(self):
+        """
+        Generate ``(offset, records)`` tuples, where ``records`` is the
+        list of records in the data block that starts at ``offset``.
+        """
+        deserialize = self.deserializer.deserialize
+        for offset, count, data in self.blocks():
+            yield offset, deserialize(frame_block(count, data))
+
+    def __iter__(self):
+        for _, records in self.batches():
+            for r in records:
+                yield r
+
+    def get_progress(self):
+        if self.end <= self.start:
+            return 1.0
+        return min(max(
+            (self.position - self.start) / float(self.end - self.start), 0.0
+        ), 1.0)
+
+
+def _encode_bytes(b):
+    return _encode_long(len(b)) + b
+
+
+class AvroBlockWriter(object):
+    """
+    Writer for Avro container files.
+
+    Records passed to :meth:`append` are serialized (with ``pyavroc``,
+    if available) into a buffer, which is compressed with ``codec`` and
+    written to file object ``f`` as a single data block as soon as it
+    holds at least ``sync_interval`` bytes, so that the file is written
+    in large chunks. ``meta`` is an optional dictionary of additional
+    metadata for the header (keys are strings, values are bytes).
+    """
+    def __init__(self, f, schema, codec="null",
+                 sync_interval=DEFAULT_SYNC_INTERVAL, meta=None):
+        if codec not in _COMPRESS:
+            raise ValueError("unsupported codec: %r" % (codec,))
+        if sync_interval <= 0:
+            raise ValueError("sync interval must be positive")
+        self.f = f
+        self.schema = str(schema)
+        self.codec = codec
+        self.sync_interval = sync_interval
+        self.sync_marker = os.urandom(SYNC_SIZE)
+        self.serializer = AvroSerializer(self.schema)
+        self.__compress = _COMPRESS[codec]
+        self.__chunks, self.__size, self.__count = [], 0, 0
+        header = dict(meta or {})
+        header["avro.schema"] = self.schema.encode("utf-8")
+        header["avro.codec"] = codec.encode("ascii")
+        self.__write_header(header)
+
+    def __write_header(self, meta):
+        parts = [MAGIC, _encode_long(len(meta))]
+        for k, v in sorted(meta.items()):
+            parts.extend((_encode_bytes(k.encode("utf-8")), _encode_bytes(v)))
+        parts.extend((b"\x00", self.sync_marker))
+        self.f.write(b"".join(parts))
+
+    def append(self, record):
+        data = self.serializer.serialize(record)
+        self.__chunks.append(data)
+        self.__size += len(data)
+        self.__count += 1
+        if self.__size >= self.sync_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered records as a data block.
+        """
+        if not self.__count:
+            return
+        data = b"".join(self.__chunks)
+        if self.__compress is not None:
+            data = self.__compress(data)
+        self.f.write(b"".join((
+            _encode_long(self.__count), _encode_bytes(data), self.sync_marker
+        )))
+        self.__chunks, self.__size, self.__count = [], 0, 0
+
+    def close(self):
+        """
+        Write buffered records and close the underlying file.
+        """
+        self.flush()
+        self.f.close()
 
 
-# FIXME this is just an example with no error checking
 class AvroReader(RecordReader):
     """
     Avro data file reader.
 
-    Reads all data blocks that begin within the given input split.
+    Reads all data blocks that begin within the given input split (see
+    :class:`AvroBlockReader`). Keys are the offsets of the blocks that
+    contain the records. If the job conf sets the value input
+    projection (``AVRO_VALUE_INPUT_PROJECTION``), it's used as the
+    reader schema. ``AVRO_INPUT_WORKERS`` (default: 1) sets the number
+    of threads used to decompress blocks.
     """
     def __init__(self, ctx):
         super(AvroReader, self).__init__(ctx)
         isplit = ctx.input_split
         self.region_start = isplit.offset
         self.region_end = isplit.offset + isplit.length
-        self.reader = SeekableDataFileReader(hdfs.open(isplit.filename),
-                                             DatumReader())
-        self.reader.align_after(isplit.offset)
+        jc = getattr(ctx, "job_conf", None) or {}
+        self.reader = AvroBlockReader(
+            hdfs.open(isplit.filename), isplit.offset, isplit.length,
+            workers=int(jc.get(AVRO_INPUT_WORKERS, 1)),
+            reader_schema=jc.get(AVRO_VALUE_INPUT_PROJECTION, None)
+        )
+        self.__records = self.__iter_records()
+
+    def __iter_records(self):
+        for offset, records in self.reader.batches():
+            for r in records:
+                yield offset, r
 
     def next(self):
-        pos = self.reader.reader.tell()
-        if pos > self.region_end and self.reader._block_count == 0:
-            raise StopIteration
-        record = next(self.reader)
-        return pos, record
+        return next(self.__records)
 
     def get_progress(self):
         """
         Give a rough estimate of the progress done.
         """
-        pos = self.reader.reader.tell()
-        return min((pos - self.region_start) /
-                   float(self.region_end - self.region_start),
-                   1.0)
+        return self.reader.get_progress()
 
+    def close(self):
+        f = self.reader.f
+        f.close()
+        fs = getattr(f, "fs", None)
+        if fs is not None:
+            fs.close()
 
-# FIXME this is just an example with no error checking
-class AvroWriter(RecordWriter):
 
+class AvroWriter(RecordWriter):
+    """
+    Avro data file writer.
+
+    Subclasses must set ``schema`` and call ``self.writer.append`` (see
+    :class:`AvroBlockWriter`) in :meth:`emit`. The following job conf
+    properties are used:
+
+    * ``AVRO_OUTPUT_CODEC``: compression codec (``null``, ``deflate``,
+      ``bzip2``, plus ``xz`` and ``snappy`` if the corresponding
+      modules are installed), defaults to ``null``;
+    * ``AVRO_OUTPUT_SYNC_INTERVAL``: approximate size in bytes of the
+      (uncompressed) data blocks;
+    * ``AVRO_OUTPUT_WRITE_BUFFER_SIZE``: size of the buffer used to
+      coalesce writes to HDFS (see :func:`pydoop.hdfs.open`).
+    """
     schema = None
 
     def __init__(self, context):
@@ -246,10 +815,19 @@ class AvroWriter(RecordWriter):
         part = int(job_conf['mapreduce.task.partition'])
         outdir = job_conf["mapreduce.task.output.dir"]
         outfn = "%s/part-r-%05d.avro" % (outdir, part)
-        wh = hdfs.open(outfn, "w")
-        self.writer = DataFileWriter(wh, DatumWriter(), self.schema)
+        codec = job_conf.get(AVRO_OUTPUT_CODEC, "null")
+        sync_interval = int(job_conf.get(
+            AVRO_OUTPUT_SYNC_INTERVAL, DEFAULT_SYNC_INTERVAL
+        ))
+        buf_size = int(job_conf.get(AVRO_OUTPUT_WRITE_BUFFER_SIZE, 0))
+        if codec not in _COMPRESS:
+            raise ValueError("unsupported codec: %r" % (codec,))
+        wh = hdfs.open(outfn, "w", write_buffer_size=buf_size)
+        self.writer = AvroBlockWriter(
+            wh, self.schema, codec=codec, sync_interval=sync_interval
+        )
 
     def close(self):
         self.writer.close()
         # FIXME do we really need to explicitly close the filesystem?
-        self.writer.writer.fs.close()
+        self.writer.f.fs.close()
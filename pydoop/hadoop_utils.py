@@ -27,18 +27,16 @@ Known issues: from-tarball CDH installation is not supported.
 """
 
 import os
+import sys
 import glob
 import re
-import platform
-import subprocess as sp
-import xml.dom.minidom as dom
-from xml.parsers.expat import ExpatError
 
 try:
     from pydoop.config import DEFAULT_HADOOP_HOME
 except ImportError:  # should only happen at compile time
     DEFAULT_HADOOP_HOME = None
-SYSTEM = platform.system().lower()
+# same as platform.system().lower(), without importing platform
+SYSTEM = os.uname()[0].lower()
 
 
 def first_dir_in_glob(pattern):
@@ -48,9 +46,7 @@ def first_dir_in_glob(pattern):
 
 
 CDH_HADOOP_HOME_PKG = '/usr/lib/hadoop'  # Cloudera bin packages
-CDH_HADOOP_HOME_PARCEL = first_dir_in_glob(
-    '/opt/cloudera/parcels/CDH-*/lib/hadoop'  # Cloudera Manager
-)
+CDH_HADOOP_HOME_PARCEL_PATTERN = '/opt/cloudera/parcels/CDH-*/lib/hadoop'
 
 
 class HadoopVersionError(Exception):
@@ -68,8 +64,7 @@ class HadoopXMLError(Exception):
 def get_arch():
     # if SYSTEM == 'darwin':
     #     return "", ""
-    bits, _ = platform.architecture()
-    if bits == "64bit":
+    if sys.maxsize > 2**32:
         return "amd64", "64"
     return "i386", "32"
 
@@ -77,8 +72,10 @@ def get_arch():
 def _cdh_hadoop_home():
     if os.path.isdir(CDH_HADOOP_HOME_PKG):
         return CDH_HADOOP_HOME_PKG
-    elif os.path.isdir(CDH_HADOOP_HOME_PARCEL or ''):
-        return CDH_HADOOP_HOME_PARCEL
+    # Cloudera Manager
+    parcel_home = first_dir_in_glob(CDH_HADOOP_HOME_PARCEL_PATTERN)
+    if parcel_home:
+        return parcel_home
     raise RuntimeError("unsupported CDH deployment")
 
 
@@ -330,6 +327,8 @@ def extract_text(node):
 
 
 def parse_hadoop_conf_file(fn):
+    import xml.dom.minidom as dom
+    from xml.parsers.expat import ExpatError
     items = []
     try:
         doc = dom.parse(fn)
@@ -382,6 +381,7 @@ def _hadoop_home_from_version_cmd():
         hadoop_exec = None
 
     if hadoop_exec:
+        import subprocess as sp
         try:
             output = sp.check_output([hadoop_exec, 'version'],
                                      universal_newlines=True)
@@ -477,6 +477,7 @@ class PathFinder(object):
                 except ValueError:
                     pass
                 else:
+                    import subprocess as sp
                     try:
                         env = os.environ.copy()
                         # why pop HADOOP_HOME?
@@ -46,6 +46,11 @@ sets ``LIBHDFS_OPTS`` to ``-Xmx48m``\ , a value that we found to be
 appropriate for most applications.  If your needs are different, you
 can set the environment variable externally and it will override the
 above setting.
+
+Connections to the local file system (i.e., ``hdfs("", 0)``, ``file:``
+paths or the default file system when Hadoop is configured in local
+mode) are handled by a pure Python driver that does not use libhdfs,
+so they don't require a JVM.
 """
 
 __all__ = [
@@ -57,13 +62,26 @@ __all__ = [
     'open',
     'dump',
     'load',
+    'dump_many',
+    'load_many',
     'cp',
+    'sync',
+    'block_locations',
     'put',
     'get',
     'mkdir',
     'rmr',
+    'iter_lsl',
     'lsl',
+    'Listing',
+    'PathInfo',
+    'HandlePool',
     'ls',
+    'glob',
+    'iglob',
+    'du',
+    'content_summary',
+    'ContentSummary',
     'chmod',
     'move',
     'chown',
@@ -73,59 +91,187 @@ __all__ = [
     'lstat',
     'access',
     'utime',
+    'set_replication',
+    'delete_many',
 ]
 
 
+import io
 import os
-import operator
-from functools import reduce
+import threading
+import time
+from itertools import islice
 
 import pydoop
 from . import common, path
-from pydoop.utils.py3compat import bintype
+from pydoop.utils.py3compat import bintype, basestring
 
 try:
     _ORIG_CLASSPATH
 except NameError:
     _ORIG_CLASSPATH = os.getenv("CLASSPATH", "")
 
+_INITIALIZED = False
+_INIT_LOCK = threading.Lock()
+
 
 # --- MODULE CONFIG ---
 def init():
+    """\
+    Set up the environment (``CLASSPATH``, ``LIBHDFS_OPTS``) for libhdfs.
+
+    Since finding the Hadoop jars and native libraries can be expensive,
+    this is not done at import time, but right before the first HDFS
+    connection: you only need to call it explicitly if you need the
+    above environment variables to be set in advance.
+    """
+    global _INITIALIZED
     os.environ["CLASSPATH"] = "%s:%s:%s" % (
         pydoop.hadoop_classpath(), _ORIG_CLASSPATH, pydoop.hadoop_conf()
     )
     os.environ["LIBHDFS_OPTS"] = os.getenv(
         "LIBHDFS_OPTS", common.DEFAULT_LIBHDFS_OPTS
     ) + " -Djava.library.path=%s" % pydoop.hadoop_native()
+    _INITIALIZED = True
 
 
-init()
+def _init_once():
+    with _INIT_LOCK:
+        if not _INITIALIZED:
+            init()
 
 
 def reset():
     pydoop.reset()
+    path.clear_cache()
     init()
 # ---------------------
 
 
 from .fs import hdfs, default_is_local
+from .listing import Listing, PathInfo
+from .pool import HandlePool
+from .summary import ContentSummary
+# submodules used by only a few functions (transfer, node_cache, blocks,
+# globbing, summary, compression) are imported by the functions
+# themselves, since some of them load expensive dependencies
 
 
 def open(hdfs_path, mode="r", buff_size=0, replication=0, blocksize=0,
          readline_chunk_size=common.BUFSIZE, user=None,
-         encoding=None, errors=None):
+         encoding=None, errors=None, cache=None, block_cache=None,
+         compression=None, compression_workers=1, write_buffer_size=0,
+         flush_interval=None):
     """
     Open a file, returning an :class:`~.file.hdfs_file` object.
 
     ``hdfs_path`` and ``user`` are passed to :func:`~path.split`,
     while the other args are passed to the :class:`~.file.hdfs_file`
     constructor.
+
+    If ``cache`` is ``"node"``, the file (which must be opened for
+    reading) is copied to a cache directory on the local node (see
+    :mod:`~.node_cache`) and the returned object reads from the local
+    copy. This is useful for side data that is read by many tasks
+    running on the same node. ``block_cache``, ``write_buffer_size``
+    and ``flush_interval`` are passed to :meth:`~.fs.hdfs.open_file`.
+
+    If ``compression`` is set, data is decompressed on reading or
+    compressed on writing (see :mod:`~.compression`): pass the name of
+    the codec (``"gzip"``, ``"bz2"`` or ``"xz"``) or ``"infer"`` to
+    detect it from the file extension (if the extension is not
+    recognized, the file is opened as usual). Multi-member gzip and
+    bzip2 files are decompressed by ``compression_workers`` threads.
     """
+    if cache not in (None, "node"):
+        raise ValueError("unsupported cache type: %r" % (cache,))
+    if compression:
+        from . import compression as compress
+    if compression == "infer":
+        compression = compress.infer(hdfs_path)
+    if compression:
+        compress.check(compression)
+        m = common.Mode(mode)
+        f = open(hdfs_path, m.value[0], buff_size, replication, blocksize,
+                 user=user, cache=cache, block_cache=block_cache)
+        try:
+            return compress.wrap(
+                f, m, compression, workers=compression_workers,
+                encoding=encoding, errors=errors
+            )
+        except BaseException:
+            f.close()
+            f.fs.close()
+            raise
+    def open_file(fs, path_):
+        return fs.open_file(path_, mode, buff_size, replication, blocksize,
+                            readline_chunk_size, encoding, errors,
+                            block_cache, write_buffer_size, flush_interval)
+
     host, port, path_ = path.split(hdfs_path, user)
     fs = hdfs(host, port, user)
-    return fs.open_file(path_, mode, buff_size, replication, blocksize,
-                        readline_chunk_size, encoding, errors)
+    if cache and fs.host:
+        if common.Mode(mode).writable:
+            fs.close()
+            raise ValueError("node cache requires a readonly opening mode")
+        from . import node_cache
+        local_fs = hdfs("", 0)
+        try:
+            return node_cache.default_cache().fetch_open(
+                fs, path_, lambda p: open_file(local_fs, p)
+            )
+        except BaseException:
+            local_fs.close()
+            raise
+        finally:
+            fs.close()
+    return open_file(fs, path_)
+
+
+# options handled by open, but not by fs.open_file
+_OPEN_ONLY_KWARGS = frozenset(("cache", "compression", "compression_workers"))
+
+
+def _file_fs(f):
+    """\
+    Return the fs handle of a file object returned by :func:`open`.
+    """
+    while not hasattr(f, "fs"):
+        f = f.buffer if isinstance(f, io.TextIOBase) else f.raw
+    return f.fs
+
+
+def _open_handle(hdfs_path, kwargs):
+    user = kwargs.pop("user", None)
+    host, port, path_ = path.split(hdfs_path, user)
+    kwargs["flags"] = kwargs.pop("mode", "r")
+    return hdfs(host, port, user), path_
+
+
+def _write_all(fo, data, bufsize=common.BUFSIZE):
+    if not isinstance(data, bintype):
+        return fo.write(data)
+    view = memoryview(data)
+    for i in range(0, len(view), bufsize):
+        fo.write(view[i: i + bufsize])
+
+
+def _read_all(fi, text=False):
+    if text:
+        return fi.read()
+    buf = bytearray(fi.size)
+    view = memoryview(buf)
+    n = 0
+    while n < len(buf):
+        count = fi.readinto(view[n:])
+        if not count:
+            break
+        n += count
+    del view
+    del buf[n:]
+    if n == fi.size:  # the file might have grown since we opened it
+        buf.extend(fi.read())
+    return bytes(buf)
 
 
 def dump(data, hdfs_path, **kwargs):
@@ -136,13 +282,16 @@ def dump(data, hdfs_path, **kwargs):
     which is forced to ``"w"`` (or ``"wt"`` for text data).
     """
     kwargs["mode"] = "w" if isinstance(data, bintype) else "wt"
-    with open(hdfs_path, **kwargs) as fo:
-        i = 0
-        bufsize = common.BUFSIZE
-        while i < len(data):
-            fo.write(data[i: i + bufsize])
-            i += bufsize
-    fo.fs.close()
+    if _OPEN_ONLY_KWARGS.intersection(kwargs):
+        fo = open(hdfs_path, **kwargs)
+        with _file_fs(fo):
+            with fo:
+                _write_all(fo, data)
+        return
+    fs, path_ = _open_handle(hdfs_path, kwargs)
+    with fs:
+        with fs.open_file(path_, **kwargs) as fo:
+            _write_all(fo, data)
 
 
 def load(hdfs_path, **kwargs):
@@ -155,32 +304,112 @@ def load(hdfs_path, **kwargs):
     m = common.Mode(kwargs.get("mode", "r"))
     if m.writable:
         raise ValueError("opening mode must be readonly")
-    data = []
-    with open(hdfs_path, **kwargs) as fi:
-        bufsize = common.BUFSIZE
-        while 1:
-            chunk = fi.read(bufsize)
-            if chunk:
-                data.append(chunk)
-            else:
-                break
-    fi.fs.close()
-    return reduce(operator.add, data)
+    if _OPEN_ONLY_KWARGS.intersection(kwargs):
+        fi = open(hdfs_path, **kwargs)
+        with _file_fs(fi):
+            with fi:
+                return fi.read()
+    fs, path_ = _open_handle(hdfs_path, kwargs)
+    with fs:
+        with fs.open_file(path_, **kwargs) as fi:
+            return _read_all(fi, m.text)
+
+
+def _run_many(func, args, workers):
+    if workers > 1 and len(args) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(workers, len(args)))
+        try:
+            return pool.map(func, args, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    return [func(_) for _ in args]
+
+
+def _connections(paths, user):
+    """\
+    Split ``paths``, opening one handle per distinct file system.
+    """
+    fs_map, split_paths = {}, []
+    try:
+        for p in paths:
+            host, port, path_ = path.split(p, user)
+            if (host, port) not in fs_map:
+                fs_map[(host, port)] = hdfs(host, port, user)
+            split_paths.append((fs_map[(host, port)], path_))
+    except Exception:
+        for fs in fs_map.values():
+            fs.close()
+        raise
+    return fs_map, split_paths
+
+
+def load_many(hdfs_paths, workers=1, **kwargs):
+    """\
+    Read the contents of all files in ``hdfs_paths``.
+
+    Useful for loading many small files (e.g., side data in a mapper's
+    constructor): files are read by up to ``workers`` threads, sharing
+    a single connection for each distinct file system. Keyword arguments
+    are handled as in :func:`load`.
+
+    :rtype: list
+    :return: the contents of the files, in the same order as the paths
+    """
+    m = common.Mode(kwargs.get("mode", "r"))
+    if m.writable:
+        raise ValueError("opening mode must be readonly")
+    if _OPEN_ONLY_KWARGS.intersection(kwargs):
+        return _run_many(lambda p: load(p, **kwargs), list(hdfs_paths),
+                         workers)
+    kwargs["flags"] = kwargs.pop("mode", "r")
+    fs_map, split_paths = _connections(hdfs_paths, kwargs.pop("user", None))
+
+    def read_one(fs_path):
+        with fs_path[0].open_file(fs_path[1], **kwargs) as fi:
+            return _read_all(fi, m.text)
+
+    try:
+        return _run_many(read_one, split_paths, workers)
+    finally:
+        for fs in fs_map.values():
+            fs.close()
 
 
-def _cp_file(src_fs, src_path, dest_fs, dest_path, **kwargs):
+def dump_many(items, workers=1, **kwargs):
+    """\
+    Write many files concurrently.
+
+    ``items`` is a mapping from paths to data, or an iterable of
+    ``(path, data)`` pairs. Files are written by up to ``workers``
+    threads, sharing a single connection for each distinct file system.
+    Keyword arguments are handled as in :func:`dump`.
+    """
+    if hasattr(items, "items"):
+        items = items.items()
+    items = list(items)
     kwargs.pop("mode", None)
-    kwargs["flags"] = "r"
-    with src_fs.open_file(src_path, **kwargs) as fi:
-        kwargs["flags"] = "w"
-        with dest_fs.open_file(dest_path, **kwargs) as fo:
-            bufsize = common.BUFSIZE
-            while 1:
-                chunk = fi.read(bufsize)
-                if chunk:
-                    fo.write(chunk)
-                else:
-                    break
+    if _OPEN_ONLY_KWARGS.intersection(kwargs):
+        _run_many(lambda item: dump(item[1], item[0], **kwargs), items,
+                  workers)
+        return
+    fs_map, split_paths = _connections(
+        [p for p, _ in items], kwargs.pop("user", None)
+    )
+
+    def write_one(i):
+        fs, path_ = split_paths[i]
+        data = items[i][1]
+        mode = "w" if isinstance(data, bintype) else "wt"
+        with fs.open_file(path_, mode, **kwargs) as fo:
+            _write_all(fo, data)
+
+    try:
+        _run_many(write_one, range(len(items)), workers)
+    finally:
+        for fs in fs_map.values():
+            fs.close()
 
 
 def cp(src_hdfs_path, dest_hdfs_path, **kwargs):
@@ -190,8 +419,19 @@ def cp(src_hdfs_path, dest_hdfs_path, **kwargs):
     If ``src_hdfs_path`` is a directory, its contents will be copied
     recursively. Source file(s) are opened for reading and copies are
     opened for writing. Additional keyword arguments, if any, are
-    handled like in :func:`open`.
+    handled like in :func:`open`, except for:
+
+    * ``workers``: number of threads used to list and copy files
+      (default: 1)
+    * ``progress``: a callback that receives a
+      :class:`~.transfer.CopyStats` object as the copy progresses
+
+    See :class:`~.transfer.Copier` for details.
+
+    :rtype: :class:`~.transfer.CopyStats`
+    :return: number of files and bytes copied, throughput
     """
+    from . import transfer
     src, dest = {}, {}
     try:
         for d, p in ((src, src_hdfs_path), (dest, dest_hdfs_path)):
@@ -206,31 +446,17 @@ def cp(src_hdfs_path, dest_hdfs_path, **kwargs):
         try:
             dest["info"] = dest["fs"].get_path_info(dest["path"])
         except IOError:
-            if src["info"]["kind"] == "file":
-                _cp_file(src["fs"], src["path"], dest["fs"], dest["path"],
-                         **kwargs)
-                return
-            else:
-                dest["fs"].create_directory(dest["path"])
-                dest_hdfs_path = dest["fs"].get_path_info(dest["path"])["name"]
-                for item in src["fs"].list_directory(src["path"]):
-                    cp(item["name"], dest_hdfs_path, **kwargs)
-                return
-        # --- dest exists. Is it a file? ---
-        if dest["info"]["kind"] == "file":
-            raise IOError("%r already exists" % (dest["path"]))
-        # --- dest is a directory ---
-        dest["path"] = path.join(dest["path"], path.basename(src["path"]))
-        if dest["fs"].exists(dest["path"]):
-            raise IOError("%r already exists" % (dest["path"]))
-        if src["info"]["kind"] == "file":
-            _cp_file(src["fs"], src["path"], dest["fs"], dest["path"],
-                     **kwargs)
+            pass
         else:
-            dest["fs"].create_directory(dest["path"])
-            dest_hdfs_path = dest["fs"].get_path_info(dest["path"])["name"]
-            for item in src["fs"].list_directory(src["path"]):
-                cp(item["name"], dest_hdfs_path, **kwargs)
+            # --- dest exists. Is it a file? ---
+            if dest["info"]["kind"] == "file":
+                raise IOError("%r already exists" % (dest["path"]))
+            # --- dest is a directory ---
+            dest["path"] = path.join(dest["path"], path.basename(src["path"]))
+            if dest["fs"].exists(dest["path"]):
+                raise IOError("%r already exists" % (dest["path"]))
+        copier = transfer.Copier(src["fs"], dest["fs"], **kwargs)
+        return copier.copy(src["info"], dest["path"])
     finally:
         for d in src, dest:
             try:
@@ -239,6 +465,69 @@ def cp(src_hdfs_path, dest_hdfs_path, **kwargs):
                 pass
 
 
+def sync(src_hdfs_path, dest_hdfs_path, delete=False, checksum=False,
+         user=None, **kwargs):
+    """\
+    Make ``dest_hdfs_path`` a copy of ``src_hdfs_path``, transferring
+    only files that changed.
+
+    Unlike :func:`cp`, the destination is never taken to be a parent
+    directory: if ``src_hdfs_path`` is a directory, ``dest_hdfs_path``
+    is created or updated to mirror it. Files are compared by size and
+    modification time; with ``checksum=True``, files that differ only
+    by modification time are also compared by content. If ``delete`` is
+    :obj:`True`, paths under ``dest_hdfs_path`` that are not in the
+    source are removed. ``user`` is passed to :func:`~path.split` and
+    used to connect to both file systems. Other keyword arguments
+    (e.g., ``workers``) are handled as in :func:`cp`. See
+    :func:`~.transfer.sync` for details.
+
+    :rtype: :class:`~.transfer.CopyStats`
+    :return: number of files copied, skipped and deleted
+    """
+    from . import transfer
+    src_host, src_port, src_path = path.split(src_hdfs_path, user)
+    dest_host, dest_port, dest_path = path.split(dest_hdfs_path, user)
+    with hdfs(src_host, src_port, user) as src_fs:
+        with hdfs(dest_host, dest_port, user) as dest_fs:
+            return transfer.sync(src_fs, src_path, dest_fs, dest_path,
+                                 delete=delete, checksum=checksum, **kwargs)
+
+
+def block_locations(paths, workers=1, user=None):
+    """\
+    Get the locations of the blocks of many files.
+
+    ``paths`` can contain paths (directories are traversed recursively)
+    and path info dictionaries, such as the ones generated by
+    :func:`iter_lsl` or :meth:`~.fs.hdfs.walk` (directories are
+    skipped). Block locations are retrieved by ``workers`` threads.
+    See :class:`~.blocks.BlockLocations` for grouping the results by
+    host.
+
+    :rtype: :class:`~.blocks.BlockLocations`
+    """
+    from . import blocks
+    items = list(paths)
+    names = [_ if isinstance(_, basestring) else _["name"] for _ in items]
+    fs_map, split_paths = _connections(names, user)
+    try:
+        files = []
+        for item, (fs, path_) in zip(items, split_paths):
+            if not isinstance(item, basestring):
+                files.append((fs, item))
+                continue
+            info = fs.get_path_info(path_)
+            if info["kind"] == "directory":
+                files.extend((fs, _) for _ in fs.walk(path_))
+            else:
+                files.append((fs, info))
+        return blocks.locate(files, workers=workers)
+    finally:
+        for fs in fs_map.values():
+            fs.close()
+
+
 def put(src_path, dest_hdfs_path, **kwargs):
     """\
     Copy the contents of ``src_path`` to ``dest_hdfs_path``.
@@ -285,7 +574,38 @@ def rmr(hdfs_path, user=None):
     return retval
 
 
-def lsl(hdfs_path, user=None, recursive=False):
+def iter_lsl(hdfs_path, user=None, recursive=False, workers=1, prune=None,
+             compact=False):
+    """
+    Generate dictionaries of file properties.
+
+    Same as :func:`lsl`, but items are generated as they are retrieved,
+    rather than collected into a list. The ``workers`` and ``prune``
+    arguments are passed on to :meth:`~.fs.hdfs.walk` for recursive
+    listings, and are ignored otherwise. If ``compact`` is
+    :obj:`True`, items are :class:`~.listing.PathInfo` objects.
+    """
+    host, port, path_ = path.split(hdfs_path, user)
+    fs = hdfs(host, port, user)
+    try:
+        if not recursive:
+            for info in fs.list_directory(path_, compact=compact):
+                yield info
+            return
+        treewalk = fs.walk(path_, workers=workers, prune=prune,
+                           compact=compact)
+        top = next(treewalk)
+        if top['kind'] != 'directory':
+            yield top
+            return
+        for info in treewalk:
+            yield info
+    finally:
+        fs.close()
+
+
+def lsl(hdfs_path, user=None, recursive=False, workers=1, prune=None,
+        compact=False):
     """
     Return a list of dictionaries of file properties.
 
@@ -294,21 +614,18 @@ def lsl(hdfs_path, user=None, recursive=False):
     :obj:`False`, each list item corresponds to a file or directory
     contained by it; if it is a directory and ``recursive`` is
     :obj:`True`, the list contains one item for every file or directory
-    in the tree rooted at ``hdfs_path``.
+    in the tree rooted at ``hdfs_path``. See :func:`iter_lsl` for the
+    ``workers`` and ``prune`` arguments.
+
+    If ``compact`` is :obj:`True`, return a :class:`~.listing.Listing`
+    instead of a list, which is much smaller for large trees.
     """
-    host, port, path_ = path.split(hdfs_path, user)
-    fs = hdfs(host, port, user)
-    if not recursive:
-        dir_list = fs.list_directory(path_)
-    else:
-        treewalk = fs.walk(path_)
-        top = next(treewalk)
-        if top['kind'] == 'directory':
-            dir_list = list(treewalk)
-        else:
-            dir_list = [top]
-    fs.close()
-    return dir_list
+    if compact and not recursive:
+        host, port, path_ = path.split(hdfs_path, user)
+        with hdfs(host, port, user) as fs:
+            return fs.list_directory(path_, compact=True)
+    infos = iter_lsl(hdfs_path, user, recursive, workers, prune, compact)
+    return Listing(infos) if compact else list(infos)
 
 
 def ls(hdfs_path, user=None, recursive=False):
@@ -322,15 +639,163 @@ def ls(hdfs_path, user=None, recursive=False):
     return [d["name"] for d in dir_list]
 
 
-def chmod(hdfs_path, mode, user=None):
+def iglob(hdfs_pattern, user=None, workers=8):
+    """
+    Generate the hdfs paths that match ``hdfs_pattern``.
+
+    Same as :func:`glob`, but paths are generated as they are found,
+    rather than collected into a list.
+    """
+    from . import globbing
+    host, port, pattern = path.split(hdfs_pattern, user)
+    fs = hdfs(host, port, user)
+    try:
+        for name in globbing.iglob(fs, pattern, workers=workers):
+            yield name
+    finally:
+        fs.close()
+
+
+def glob(hdfs_pattern, user=None, workers=8):
+    """
+    Return a sorted list of the hdfs paths that match ``hdfs_pattern``.
+
+    The pattern can contain shell-style wildcards (``*``, ``?`` and
+    ``[...]``), ``{a,b}`` alternatives and ``**`` components, which
+    match any number of directories (see :mod:`~.globbing` for
+    details). Only the directories that can contain matches are listed,
+    using up to ``workers`` concurrent requests::
+
+      parts = hdfs.glob("/data/{2025,2026}-*/**/part-*")
+
+    :type hdfs_pattern: str
+    :param hdfs_pattern: the pattern (wildcards are not allowed in the
+      scheme and netloc parts)
+    :rtype: list
+    :return: the matching paths, in the same (fully qualified) form as
+      the names returned by :func:`ls`
+    """
+    return sorted(iglob(hdfs_pattern, user, workers))
+
+
+def du(hdfs_path, depth=0, workers=1, user=None):
+    """
+    Compute the disk usage of a tree.
+
+    Return a dictionary that maps the name of ``hdfs_path`` and of each
+    path below it, down to ``depth`` levels, to the
+    :class:`~.summary.ContentSummary` of its subtree. For instance, the
+    sizes of the subdirectories of ``d`` are given by::
+
+      for name, s in hdfs.du(d, depth=1, workers=8).items():
+          print(name, s.length)
+
+    The tree is traversed only once, listing up to ``workers``
+    directories concurrently.
+    """
+    from . import summary
+    host, port, path_ = path.split(hdfs_path, user)
+    with hdfs(host, port, user) as fs:
+        return summary.summarize(fs, path_, depth, workers)
+
+
+def content_summary(hdfs_path, workers=1, user=None):
+    """
+    Return the :class:`~.summary.ContentSummary` of ``hdfs_path``: total
+    size, number of files and directories and space consumed by
+    replicas.
+    """
+    from . import summary
+    host, port, path_ = path.split(hdfs_path, user)
+    with hdfs(host, port, user) as fs:
+        totals = summary.summarize(fs, path_, 0, workers)
+    return totals.popitem()[1]
+
+
+_BATCH_SIZE = 1024
+
+
+def _apply_all(func, tasks, workers):
+    """\
+    Call ``func(fs, path_)`` for each ``(key, fs, path_)`` tuple in
+    ``tasks``, on up to ``workers`` threads. Return a dictionary that
+    maps the keys of the calls that failed to the corresponding
+    :exc:`IOError`.
+    """
+    def apply_one(task):
+        try:
+            func(*task[1:])
+        except IOError as e:
+            return task[0], e
+
+    if workers <= 1:
+        return dict(_ for _ in map(apply_one, tasks) if _ is not None)
+    from multiprocessing.pool import ThreadPool
+    failed, tasks = {}, iter(tasks)
+    pool = ThreadPool(workers)
+    try:
+        while 1:
+            batch = list(islice(tasks, _BATCH_SIZE))
+            if not batch:
+                return failed
+            failed.update(_ for _ in pool.map(apply_one, batch)
+                          if _ is not None)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _mutate_tree(hdfs_path, user, workers, func, directories=True):
+    """\
+    Call ``func(fs, name)`` for each path in the tree rooted at
+    ``hdfs_path``, as described in :func:`chmod`.
+
+    Non-directories are processed (in parallel) while the tree is
+    walked. Directories are processed after that, level by level from
+    the deepest one up, so that a directory is changed only when its
+    whole subtree is done (e.g., removing permissions from a parent
+    does not prevent changing its children).
+    """
+    host, port, path_ = path.split(hdfs_path, user)
+    with hdfs(host, port, user) as fs:
+        walker = fs.walk(path_, workers=workers, topdown=False, compact=True)
+        levels = {}
+
+        def leaves():
+            for info in walker:
+                name = info["name"]
+                if info["kind"] != "directory":
+                    yield name, fs, name
+                elif directories:
+                    depth = name.rstrip("/").count("/")
+                    levels.setdefault(depth, []).append(name)
+        failed = _apply_all(func, leaves(), workers)
+        for depth in sorted(levels, reverse=True):
+            failed.update(_apply_all(
+                func, [(_, fs, _) for _ in levels.pop(depth)], workers
+            ))
+        return failed
+
+
+def chmod(hdfs_path, mode, user=None, recursive=False, workers=1):
     """
     Change file mode bits.
 
+    If ``recursive`` is :obj:`True`, change the mode of all files and
+    directories in the tree rooted at ``hdfs_path``, using up to
+    ``workers`` threads. In this case, a failure on one path does not
+    stop the operation: the return value is a dictionary that maps the
+    paths that could not be changed to the corresponding errors.
+
     :type path: string
     :param path: the path to the file or directory
     :type mode: int
     :param mode: the bitmask to set it to (e.g., 0777)
     """
+    if recursive:
+        return _mutate_tree(
+            hdfs_path, user, workers, lambda fs, p: fs.chmod(p, mode)
+        )
     host, port, path_ = path.split(hdfs_path, user)
     fs = hdfs(host, port, user)
     retval = fs.chmod(path_, mode)
@@ -354,17 +819,86 @@ def move(src, dest, user=None):
         dest_fs.close()
 
 
-def chown(hdfs_path, user=None, group=None, hdfs_user=None):
+def chown(hdfs_path, user=None, group=None, hdfs_user=None,
+          recursive=False, workers=1):
     """
-    See :meth:`fs.hdfs.chown`.
+    See :meth:`fs.hdfs.chown`. The ``recursive`` and ``workers``
+    arguments work as in :func:`chmod`.
     """
     user = user or ''
     group = group or ''
+    if recursive:
+        return _mutate_tree(
+            hdfs_path, hdfs_user, workers,
+            lambda fs, p: fs.chown(p, user=user, group=group)
+        )
     host, port, path_ = path.split(hdfs_path, hdfs_user)
     with hdfs(host, port, hdfs_user) as fs:
         return fs.chown(path_, user=user, group=group)
 
 
+def utime(hdfs_path, times=None, user=None, recursive=False, workers=1):
+    """
+    Set the access and modification times of ``hdfs_path``.
+
+    If ``times`` is :obj:`None`, both are set to the current time;
+    otherwise, it must be an ``(atime, mtime)`` tuple. The
+    ``recursive`` and ``workers`` arguments work as in :func:`chmod`.
+    """
+    if not recursive:
+        return path.utime(hdfs_path, times, user)
+    atime, mtime = times or 2 * (time.time(),)
+    return _mutate_tree(
+        hdfs_path, user, workers, lambda fs, p: fs.utime(p, mtime, atime)
+    )
+
+
+def set_replication(hdfs_path, replication, user=None, recursive=False,
+                    workers=1):
+    """
+    Set the replication factor of a file.
+
+    If ``recursive`` is :obj:`True`, set the replication factor of all
+    files in the tree rooted at ``hdfs_path``, as described in
+    :func:`chmod`.
+    """
+    if recursive:
+        return _mutate_tree(
+            hdfs_path, user, workers,
+            lambda fs, p: fs.set_replication(p, replication),
+            directories=False
+        )
+    host, port, path_ = path.split(hdfs_path, user)
+    with hdfs(host, port, user) as fs:
+        return fs.set_replication(path_, replication)
+
+
+def delete_many(hdfs_paths, recursive=True, workers=1, user=None):
+    """\
+    Delete all paths in ``hdfs_paths``, on up to ``workers`` threads
+    sharing a single connection for each distinct file system.
+
+    A failure on one path does not stop the operation: the return value
+    is a dictionary that maps the paths that could not be deleted to
+    the corresponding errors.
+
+    :type recursive: bool
+    :param recursive: delete non-empty directories
+    :rtype: dict
+    """
+    hdfs_paths = list(hdfs_paths)
+    fs_map, split_paths = _connections(hdfs_paths, user)
+    try:
+        return _apply_all(
+            lambda fs, p: fs.delete(p, recursive),
+            [(p,) + fs_path for p, fs_path in zip(hdfs_paths, split_paths)],
+            workers
+        )
+    finally:
+        for fs in fs_map.values():
+            fs.close()
+
+
 def rename(from_path, to_path, user=None):
     """
     See :meth:`fs.hdfs.rename`.
@@ -393,4 +927,3 @@ def renames(from_path, to_path, user=None):
 stat = path.stat
 lstat = path.lstat
 access = path.access
-utime = path.utime
@@ -0,0 +1,327 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.aio -- asyncio Interface
+------------------------------------
+
+Coroutine versions of the main HDFS operations, for use in
+:mod:`asyncio` applications (requires Python >= 3.6). Blocking calls
+are run on a bounded thread pool, so that many concurrent operations
+can be multiplexed from a single event loop::
+
+  import asyncio
+  from pydoop.hdfs.aio import AsyncHdfs
+
+  async def main(paths):
+      async with AsyncHdfs(max_workers=32) as client:
+          sizes = await asyncio.gather(*(
+              client.get_path_info(p) for p in paths
+          ))
+          async for info in client.walk("/data"):
+              print(info["name"])
+          async with await client.open("/data/log.txt", "rt") as f:
+              async for line in f:
+                  print(line)
+
+Paths are interpreted as in the top-level functions of
+:mod:`pydoop.hdfs` (see :func:`~pydoop.hdfs.path.split`). Whole-file
+reads and positional reads go through a
+:class:`~pydoop.hdfs.pool.HandlePool`, so that repeated accesses to the
+same files do not reopen them.
+"""
+
+import asyncio
+import collections
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pydoop.hdfs as hdfs
+from . import common
+from . import path as hpath
+from .pool import HandlePool, DEFAULT_MAX_OPEN
+
+DEFAULT_MAX_WORKERS = 16
+
+# get_event_loop is deprecated in coroutines, but Python 3.6 lacks the
+# replacement (there, get_event_loop returns the running loop)
+_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class AsyncFile(object):
+    """
+    Wraps a file object returned by :func:`pydoop.hdfs.open`, running
+    its blocking methods on the executor of an :class:`AsyncHdfs`
+    instance. Operations on the same file are serialized.
+
+    Iterating over an :class:`AsyncFile` with ``async for`` yields
+    lines; data is read in chunks of ``chunk_size`` bytes, so that each
+    executor call returns many lines.
+    """
+    def __init__(self, f, client, chunk_size=common.BUFSIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.__client = client
+        self.__lock = asyncio.Lock()
+        self.__buf = None  # read ahead by readline
+
+    @property
+    def name(self):
+        return self.f.name
+
+    @property
+    def closed(self):
+        return self.f.closed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+    async def __run(self, func, *args):
+        return await self.__client.run(func, *args)
+
+    async def read(self, length=-1):
+        async with self.__lock:
+            buf, self.__buf = self.__buf, None
+            if buf and 0 <= length <= len(buf):
+                self.__buf = buf[length:]
+                return buf[:length]
+            if buf and length >= 0:
+                length -= len(buf)
+            data = await self.__run(self.f.read, length)
+            return buf + data if buf else data
+
+    async def readline(self):
+        async with self.__lock:
+            buf, self.__buf = self.__buf, None
+            while 1:
+                if buf:
+                    i = buf.find(b"\n" if isinstance(buf, bytes) else "\n")
+                    if i >= 0:
+                        self.__buf = buf[i + 1:]
+                        return buf[:i + 1]
+                chunk = await self.__run(self.f.read, self.chunk_size)
+                if not chunk:
+                    return buf if buf is not None else chunk
+                buf = buf + chunk if buf else chunk
+
+    async def pread(self, position, length):
+        async with self.__lock:
+            return await self.__run(self.f.pread, position, length)
+
+    async def write(self, data):
+        async with self.__lock:
+            return await self.__run(self.f.write, data)
+
+    async def seek(self, position, whence=0):
+        async with self.__lock:
+            self.__buf = None
+            return await self.__run(self.f.seek, position, whence)
+
+    async def tell(self):
+        async with self.__lock:
+            pos = await self.__run(self.f.tell)
+            return pos - len(self.__buf or b"")
+
+    async def flush(self):
+        async with self.__lock:
+            return await self.__run(self.f.flush)
+
+    async def close(self):
+        async with self.__lock:
+            if not self.f.closed:
+                await self.__run(self.__close)
+
+    def __close(self):
+        try:
+            self.f.close()
+        finally:
+            fs = getattr(self.f, "fs", None)
+            if fs is not None:
+                fs.close()
+
+
+class AsyncHdfs(object):
+    """
+    Run HDFS operations on a pool of ``max_workers`` threads.
+
+    ``max_open`` is the maximum number of idle files kept open by the
+    internal :class:`~pydoop.hdfs.pool.HandlePool`.
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS,
+                 max_open=DEFAULT_MAX_OPEN, user=None):
+        self.user = user
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers)
+        self.pool = HandlePool(max_open=max_open, user=user)
+        self.closed = False
+        self.__fs = {}
+        self.__lock = threading.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __submit(self, func, *args, **kwargs):
+        if self.closed:
+            raise ValueError("operation on closed client")
+        loop = _running_loop()
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        return loop.run_in_executor(self.executor, func, *args)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` on the executor.
+        """
+        return await self.__submit(func, *args, **kwargs)
+
+    def __split(self, hdfs_path):
+        # called from executor threads
+        host, port, path_ = hpath.split(hdfs_path, self.user)
+        with self.__lock:
+            try:
+                fs = self.__fs[(host, port)]
+            except KeyError:
+                fs = self.__fs[(host, port)] = hdfs.hdfs(
+                    host, port, self.user
+                )
+        return fs, path_
+
+    def __call_fs(self, name, hdfs_path, *args):
+        fs, path_ = self.__split(hdfs_path)
+        return getattr(fs, name)(path_, *args)
+
+    async def open(self, hdfs_path, mode="r", **kwargs):
+        """
+        Open a file (see :func:`pydoop.hdfs.open`).
+
+        :rtype: :class:`AsyncFile`
+        """
+        f = await self.run(hdfs.open, hdfs_path, mode, **kwargs)
+        return AsyncFile(f, self)
+
+    def __read(self, hdfs_path):
+        with self.pool.open(hdfs_path) as f:
+            return hdfs._read_all(f)
+
+    async def read(self, hdfs_path):
+        """
+        Return the contents of a file.
+        """
+        return await self.run(self.__read, hdfs_path)
+
+    def __pread(self, hdfs_path, position, length):
+        with self.pool.open(hdfs_path) as f:
+            return f.pread(position, length)
+
+    async def pread(self, hdfs_path, position, length):
+        """
+        Read ``length`` bytes of a file, starting from ``position``.
+        """
+        return await self.run(self.__pread, hdfs_path, position, length)
+
+    async def write(self, hdfs_path, data, **kwargs):
+        """
+        Write ``data`` to a file (see :func:`pydoop.hdfs.dump`).
+        """
+        await self.run(hdfs.dump, data, hdfs_path, **kwargs)
+        self.pool.invalidate(hdfs_path)
+
+    async def get_path_info(self, hdfs_path):
+        return await self.run(self.__call_fs, "get_path_info", hdfs_path)
+
+    async def list_directory(self, hdfs_path):
+        return await self.run(self.__call_fs, "list_directory", hdfs_path)
+
+    async def walk(self, top):
+        """
+        Asynchronously generate path infos for ``top`` and everything
+        under it, like :meth:`~pydoop.hdfs.fs.hdfs.walk`. Directories
+        are listed concurrently, so the output is in breadth-first
+        order, with each directory listed before its contents.
+
+        At most ``max_workers`` listings are in flight at any time:
+        directories found in the meantime wait in a queue of names.
+        """
+        info = await self.get_path_info(top)
+        yield info
+        if info["kind"] != "directory":
+            return
+        todo = collections.deque([info["name"]])
+        pending = collections.deque()
+
+        def fill():
+            while todo and len(pending) < self.max_workers:
+                pending.append(self.__submit(
+                    self.__call_fs, "list_directory", todo.popleft()
+                ))
+        fill()
+        try:
+            while pending:
+                infos = await pending.popleft()
+                todo.extend(
+                    _["name"] for _ in infos if _["kind"] == "directory"
+                )
+                fill()
+                for info in infos:
+                    yield info
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def cp(self, src_hdfs_path, dest_hdfs_path, **kwargs):
+        """
+        Copy files (see :func:`pydoop.hdfs.cp`).
+        """
+        return await self.run(hdfs.cp, src_hdfs_path, dest_hdfs_path,
+                              **kwargs)
+
+    def __close(self):
+        try:
+            self.pool.close()
+        finally:
+            with self.__lock:
+                handles = list(self.__fs.values())
+                self.__fs.clear()
+            for fs in handles:
+                fs.close()
+
+    async def close(self):
+        """
+        Close all files and connections, and shut down the executor.
+        """
+        if self.closed:
+            return
+        await self.run(self.__close)
+        self.closed = True
+        self.executor.shutdown(wait=False)
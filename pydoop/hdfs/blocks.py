@@ -0,0 +1,162 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.blocks -- Block Locations
+-------------------------------------
+
+Bulk retrieval of the hosts that store the blocks of many files, for
+locality-aware scheduling (see :func:`~pydoop.hdfs.block_locations`).
+"""
+
+from array import array
+from collections import namedtuple
+
+from .listing import INT64
+
+Block = namedtuple("Block", "path offset length hosts")
+
+
+class BlockLocations(object):
+    """
+    Locations of the blocks of a set of files, stored by column.
+
+    The ``file``, ``offset`` and ``length`` attributes are 64-bit
+    integer arrays (``file`` holds indices into the ``paths`` list),
+    while ``hosts`` is a list of tuples of host names (equal tuples are
+    shared). Indexing and iteration yield :class:`Block` tuples.
+    """
+    def __init__(self):
+        self.paths = []
+        self.file = array(INT64)
+        self.offset = array(INT64)
+        self.length = array(INT64)
+        self.hosts = []
+        self.__hosts = {}
+
+    def add_file(self, path, size, block_size, hosts):
+        """
+        Add the blocks of a file, given the list of hosts for each
+        block (as returned by :meth:`~.fs.hdfs.get_hosts`).
+        """
+        n = len(hosts)
+        if not n:
+            return
+        if block_size <= 0 or n != -(-size // block_size):  # e.g., local
+            block_size = -(-size // n)
+        idx = len(self.paths)
+        self.paths.append(path)
+        for i, h in enumerate(hosts):
+            offset = i * block_size
+            h = tuple(h)
+            self.file.append(idx)
+            self.offset.append(offset)
+            self.length.append(min(block_size, size - offset))
+            self.hosts.append(self.__hosts.setdefault(h, h))
+
+    def __len__(self):
+        return len(self.offset)
+
+    def __getitem__(self, i):
+        return Block(self.paths[self.file[i]], self.offset[i],
+                     self.length[i], self.hosts[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "<%s: %d blocks in %d files>" % (
+            self.__class__.__name__, len(self), len(self.paths)
+        )
+
+    def all_hosts(self):
+        """
+        Return the sorted list of hosts that store at least one block.
+        """
+        return sorted(set(h for hosts in self.__hosts for h in hosts))
+
+    def by_host(self):
+        """
+        Group blocks by host.
+
+        :rtype: dict
+        :return: a mapping from host names to lists of :class:`Block`
+          objects stored on that host (a block appears once for each of
+          its replicas).
+        """
+        groups = {}
+        for b in self:
+            for h in b.hosts:
+                groups.setdefault(h, []).append(b)
+        return groups
+
+    def files_by_host(self):
+        """
+        Group files by host.
+
+        :rtype: dict
+        :return: a mapping from host names to lists of ``(path,
+          local_bytes)`` tuples, where ``local_bytes`` is the amount of
+          data of ``path`` stored on the host. Each list is sorted by
+          decreasing ``local_bytes``.
+        """
+        local_bytes = {}
+        for i in range(len(self)):
+            for h in self.hosts[i]:
+                d = local_bytes.setdefault(h, {})
+                f = self.file[i]
+                d[f] = d.get(f, 0) + self.length[i]
+        return dict((h, sorted(
+            ((self.paths[f], n) for f, n in d.items()),
+            key=lambda t: (-t[1], t[0])
+        )) for h, d in local_bytes.items())
+
+
+def locate(files, workers=1):
+    """
+    Get the block locations of the given files.
+
+    :type files: iterable
+    :param files: ``(fs, info)`` pairs, where ``fs`` is an
+      :class:`~.fs.hdfs` instance and ``info`` is the path info
+      dictionary of a file on ``fs`` (directories are skipped)
+    :type workers: int
+    :param workers: number of threads used to query the namenode
+    :rtype: :class:`BlockLocations`
+    """
+    files = [_ for _ in files if _[1]["kind"] == "file"]
+
+    def get_hosts(fs_info):
+        fs, info = fs_info
+        return fs.get_hosts(info["name"], 0, info["size"])
+
+    if workers > 1 and len(files) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(workers, len(files)))
+        try:
+            all_hosts = pool.map(get_hosts, files, chunksize=16)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        all_hosts = [get_hosts(_) for _ in files]
+    loc = BlockLocations()
+    for (_, info), hosts in zip(files, all_hosts):
+        loc.add_file(info["name"], info["size"], info["block_size"], hosts)
+    return loc
@@ -0,0 +1,211 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.cache -- Metadata and Block Caches
+----------------------------------------------
+
+A bounded, expiring cache for path information, used by
+:class:`~.fs.hdfs` handles when the metadata cache is enabled (see
+:meth:`~.fs.hdfs.enable_metadata_cache`), and an in-memory cache for
+file data, used by :class:`~.file.hdfs_file` objects opened with a
+``block_cache``.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTL = 5.0  # seconds
+DEFAULT_MAX_SIZE = 100000
+DEFAULT_BLOCK_SIZE = 2**17
+DEFAULT_MAX_BYTES = 2**26
+
+# marks paths known not to exist
+MISSING = object()
+
+_now = getattr(time, "monotonic", time.time)
+
+_DEFAULT_BLOCK_CACHE = None
+_DEFAULT_BLOCK_CACHE_LOCK = threading.Lock()
+
+
+def default_block_cache():
+    """
+    Return the process-wide :class:`BlockCache`, creating it if needed.
+    """
+    global _DEFAULT_BLOCK_CACHE
+    with _DEFAULT_BLOCK_CACHE_LOCK:
+        if _DEFAULT_BLOCK_CACHE is None:
+            _DEFAULT_BLOCK_CACHE = BlockCache()
+        return _DEFAULT_BLOCK_CACHE
+
+
+class MetadataCache(object):
+    """
+    A thread-safe mapping from absolute paths to path infos.
+
+    Entries expire ``ttl`` seconds after they are stored; when there are
+    more than ``max_size`` entries, the least recently used ones are
+    discarded. Keys are absolute, normalized paths without scheme and
+    netloc (e.g., ``'/user/foo/bar'``).
+    """
+    def __init__(self, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = self.misses = 0
+        self.__entries = OrderedDict()  # key -> (expiration time, value)
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        """
+        Return the value stored for ``key``, or :obj:`None` if it's not
+        there or it has expired.
+        """
+        with self.__lock:
+            try:
+                expires, value = self.__entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires < _now():
+                self.misses += 1
+                return None
+            self.__entries[key] = expires, value  # most recently used
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = _now() + self.ttl, value
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove ``key``, all of its ancestors and, unless ``key`` is known
+        to be a file, all paths under it.
+        """
+        with self.__lock:
+            try:
+                _, value = self.__entries.pop(key)
+            except KeyError:
+                value = None
+            if value is None or value is MISSING or \
+               value["kind"] == "directory":
+                prefix = key.rstrip("/") + "/"
+                for k in [_ for _ in self.__entries if _.startswith(prefix)]:
+                    del self.__entries[k]
+            while key != "/":
+                key = key.rsplit("/", 1)[0] or "/"
+                self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = self.misses = 0
+
+
+class BlockCache(object):
+    """
+    A thread-safe LRU cache for fixed-size, aligned blocks of file data.
+
+    Blocks are keyed by a file identifier (which should change when
+    the file's contents change) and the block's index in the file.
+    When the cached blocks take up more than ``max_bytes``, the least
+    recently used ones are discarded. A single cache can be shared by
+    any number of files.
+    """
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        if max_bytes < block_size:
+            raise ValueError("max_bytes must be at least block_size")
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self.__blocks = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__blocks)
+
+    def get(self, file_id, index):
+        """
+        Return the ``index``-th block of ``file_id``, or :obj:`None` if
+        it's not in the cache.
+        """
+        key = file_id, index
+        with self.__lock:
+            try:
+                block = self.__blocks.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.__blocks[key] = block  # most recently used
+            self.hits += 1
+            return block
+
+    def put(self, file_id, index, block):
+        key = file_id, index
+        with self.__lock:
+            old = self.__blocks.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self.__blocks[key] = block
+            self.nbytes += len(block)
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= len(self.__blocks.popitem(last=False)[1])
+
+    def read(self, file_id, fetch, position, length):
+        """
+        Read ``length`` bytes of ``file_id``, starting from ``position``.
+
+        Missing blocks are read by calling ``fetch(offset, length)``,
+        which must return ``length`` bytes unless the end of the file is
+        reached.
+        """
+        bs = self.block_size
+        end = position + length
+        chunks = []
+        for i in range(position // bs, (end + bs - 1) // bs):
+            block = self.get(file_id, i)
+            if block is None:
+                block = fetch(i * bs, bs)
+                self.put(file_id, i, block)
+            offset = i * bs
+            chunks.append(block[max(position - offset, 0): end - offset])
+            if len(block) < bs:  # EOF
+                break
+        return b"".join(chunks)
+
+    def clear(self):
+        with self.__lock:
+            self.__blocks.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
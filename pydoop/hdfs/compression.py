@@ -0,0 +1,340 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.compression -- Compressed Files
+-------------------------------------------
+
+Streaming compression and decompression of gzip, bzip2 and xz files,
+used by :func:`~pydoop.hdfs.open` when called with a ``compression``
+argument. Compressed data is read and written in large chunks through
+the incremental (de)compressors provided by the :mod:`zlib`,
+:mod:`bz2` and :mod:`lzma` modules (the latter is not available in
+Python 2), and the resulting streams are wrapped in standard buffered
+(or text) :mod:`io` objects.
+
+Files consisting of multiple members (e.g., concatenated gzip files, or
+the output of parallel bzip2 compressors such as ``pbzip2``) can be
+decompressed on a pool of threads (Python 3 only): since the
+decompressors release the GIL, this scales with the number of cores.
+"""
+
+import io
+import os
+import re
+import zlib
+import bz2
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+from . import common
+
+DEFAULT_BUFSIZE = 2**20
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+}
+CODECS = frozenset(EXTENSIONS.values())
+
+# where members can start (checked by decompressing)
+_MEMBER_START = {
+    "gzip": re.compile(b"\x1f\x8b\x08"),
+    "bz2": re.compile(b"BZh[1-9]1AY&SY"),
+}
+_CAN_DETECT_EOF = hasattr(zlib.decompressobj(), "eof")
+_ERRORS = (zlib.error, IOError, OSError, EOFError, ValueError)
+if lzma is not None:
+    _ERRORS += (lzma.LZMAError,)
+
+
+def infer(path):
+    """
+    Return the codec for ``path`` based on its extension (:obj:`None`
+    if the extension is not recognized).
+    """
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def check(codec):
+    if codec not in CODECS:
+        raise ValueError("unsupported compression: %r" % (codec,))
+    if codec == "xz" and lzma is None:
+        raise ValueError("xz compression requires the lzma module")
+
+
+def _decompressor(codec):
+    if codec == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if codec == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor()
+
+
+def _compressor(codec, level):
+    if codec == "gzip":
+        if level is None:
+            level = zlib.Z_DEFAULT_COMPRESSION
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if codec == "bz2":
+        return bz2.BZ2Compressor(9 if level is None else level)
+    return lzma.LZMACompressor(preset=level)
+
+
+def _decompress_members(codec, data):
+    """
+    Decompress ``data``, which must consist of complete members. Return
+    :obj:`None` if it doesn't.
+    """
+    out = []
+    while data:
+        d = _decompressor(codec)
+        try:
+            out.append(d.decompress(data))
+        except _ERRORS:
+            return None
+        if not d.eof:
+            return None
+        data = d.unused_data
+    return b"".join(out)
+
+
+class _DecompressingIO(io.RawIOBase):
+
+    def __init__(self, f, codec, bufsize=DEFAULT_BUFSIZE, workers=1):
+        super(_DecompressingIO, self).__init__()
+        self.f = f
+        self.codec = codec
+        self.bufsize = bufsize
+        self.workers = workers
+        self.__dec = None
+        self.__buf = b""
+        self.__pos = 0
+        self.__eof = False
+        self.__carry = b""
+        self.__pool = None
+        if workers > 1 and codec in _MEMBER_START and _CAN_DETECT_EOF:
+            from multiprocessing.pool import ThreadPool
+            self.__pool = ThreadPool(workers)
+
+    @property
+    def fs(self):
+        return self.f.fs
+
+    @property
+    def name(self):
+        return self.f.name
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self.__pos >= len(self.__buf):
+            if self.__eof:
+                return 0
+            if self.__pool is not None:
+                self.__parallel_fill()
+            else:
+                self.__fill()
+        n = min(len(b), len(self.__buf) - self.__pos)
+        b[:n] = memoryview(self.__buf)[self.__pos: self.__pos + n]
+        self.__pos += n
+        return n
+
+    def __set_output(self, chunks):
+        self.__buf = b"".join(chunks)
+        self.__pos = 0
+
+    def __decompress(self, data):
+        out = []
+        while data:
+            if self.__dec is None or getattr(self.__dec, "eof", False):
+                if self.codec == "gzip":
+                    data = data.lstrip(b"\x00")  # padding between members
+                    if not data:
+                        break
+                self.__dec = _decompressor(self.codec)
+            try:
+                out.append(self.__dec.decompress(data))
+            except _ERRORS as e:
+                raise IOError("%s: invalid %s data (%s)" % (
+                    self.name, self.codec, e
+                ))
+            data = self.__dec.unused_data
+        return out
+
+    def __finish(self):
+        self.__eof = True
+        if self.__dec is not None and not getattr(self.__dec, "eof", True):
+            raise IOError("%s: compressed data ended before the "
+                          "end-of-stream marker was reached" % self.name)
+
+    def __fill(self):
+        data = self.f.read(self.bufsize)
+        if not data:
+            return self.__finish()
+        self.__set_output(self.__decompress(data))
+
+    def __parallel_fill(self):
+        # self.__carry always starts at a member boundary
+        window = self.bufsize * self.workers
+        data = self.f.read(window)
+        if not data:
+            out = self.__decompress(self.__carry)
+            self.__carry = b""
+            self.__set_output(out)
+            if not out:
+                self.__finish()
+            return
+        data = self.__carry + data
+        starts = [m.start() for m in _MEMBER_START[self.codec].finditer(
+            data, 1
+        )]
+        if not starts or len(data) > 4 * window:
+            # a single large member: go on sequentially
+            self.__pool.close()
+            self.__pool = None
+            self.__carry = b""
+            self.__set_output(self.__decompress(data))
+            return
+        self.__carry = data[starts[-1]:]
+        bounds = [0] + starts
+        segments = [data[a: b] for a, b in zip(bounds, bounds[1:])]
+        results = self.__pool.map(
+            _decompress_members_star, [(self.codec, _) for _ in segments],
+            chunksize=1
+        )
+        out, merged = [], None
+        for seg, res in zip(segments, results):
+            # a None result means a false boundary: merge with the next
+            if merged is not None:
+                merged += seg
+                res = _decompress_members(self.codec, merged)
+                if res is None:
+                    continue
+                merged = None
+            elif res is None:
+                merged = seg
+                continue
+            out.append(res)
+        if merged is not None:
+            self.__carry = merged + self.__carry
+        self.__set_output(out)
+
+    def close(self):
+        if not self.closed:
+            try:
+                if self.__pool is not None:
+                    self.__pool.close()
+                    self.__pool = None
+                self.f.close()
+            finally:
+                super(_DecompressingIO, self).close()
+
+
+def _decompress_members_star(args):
+    return _decompress_members(*args)
+
+
+class _CompressingIO(io.RawIOBase):
+
+    def __init__(self, f, codec, level=None):
+        super(_CompressingIO, self).__init__()
+        self.f = f
+        self.codec = codec
+        self.__comp = _compressor(codec, level)
+
+    @property
+    def fs(self):
+        return self.f.fs
+
+    @property
+    def name(self):
+        return self.f.name
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = self.__comp.compress(memoryview(b).tobytes())
+        if data:
+            self.f.write(data)
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            try:
+                self.f.write(self.__comp.flush())
+                self.f.close()
+            finally:
+                super(_CompressingIO, self).close()
+
+
+class CompressedReader(io.BufferedReader):
+    """
+    A buffered reader that decompresses the contents of a file.
+    """
+    @property
+    def fs(self):
+        return self.raw.fs
+
+
+class CompressedWriter(io.BufferedWriter):
+    """
+    A buffered writer that compresses data before writing it to a file.
+    """
+    @property
+    def fs(self):
+        return self.raw.fs
+
+
+def wrap(f, mode, codec, level=None, bufsize=DEFAULT_BUFSIZE, workers=1,
+         encoding=None, errors=None):
+    """
+    Wrap the binary file object ``f``, opened with the given ``mode``,
+    so that data is decompressed on reading or compressed on writing.
+
+    :type codec: str
+    :param codec: one of ``"gzip"``, ``"bz2"`` and ``"xz"``
+    :type level: int
+    :param level: compression level (writing only)
+    :type bufsize: int
+    :param bufsize: size of the chunks read from (or written to) ``f``
+    :type workers: int
+    :param workers: number of threads used to decompress multi-member
+      gzip and bzip2 files (reading only)
+    :rtype: :class:`CompressedReader` or :class:`CompressedWriter` (or a
+      :class:`io.TextIOWrapper` around them in text mode)
+    """
+    check(codec)
+    m = common.Mode(mode)
+    if m.writable:
+        ret = CompressedWriter(_CompressingIO(f, codec, level), bufsize)
+    else:
+        ret = CompressedReader(
+            _DecompressingIO(f, codec, bufsize, workers), bufsize
+        )
+    if m.text:
+        ret = io.TextIOWrapper(
+            ret, encoding or common.TEXT_ENCODING, errors
+        )
+    return ret
@@ -22,8 +22,13 @@ HDFS core implementation.
 
 import os
 
+from .local_fs import CoreLocalFs  # noqa: F401
+
 
 def init():
+    # set up CLASSPATH & co. before libhdfs starts the JVM
+    from pydoop.hdfs import _init_once
+    _init_once()
     import pydoop.utils.jvm as jvm
     jvm.load_jvm_lib()
     try:
@@ -35,7 +40,7 @@ def init():
         return pydoop.native_core_hdfs
 
 
-def core_hdfs_fs(host, port, user):
+def core_hdfs_fs(host, port, user, new_instance=False):
     _CORE_MODULE = init()
     if _CORE_MODULE is None:
         if os.path.isdir("pydoop"):
@@ -43,4 +48,6 @@ def core_hdfs_fs(host, port, user):
         else:
             msg = "Check that Pydoop is correctly installed"
         raise RuntimeError("Core module unavailable. %s" % msg)
+    if new_instance:
+        return _CORE_MODULE.CoreHdfsFs(host, port, user, None, 1)
     return _CORE_MODULE.CoreHdfsFs(host, port, user)
@@ -0,0 +1,359 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+Pure Python implementation of the core fs interface for the local file
+system.
+
+This exposes the same methods as the native ``CoreHdfsFs`` class, with
+the same return values and error semantics, but it does not need a JVM:
+the ``hdfs`` handle uses it whenever it connects to the local fs.
+"""
+
+import os
+import io
+import stat
+import errno
+import pwd
+import grp
+from array import array
+from functools import wraps
+
+from pydoop.hdfs import common
+from pydoop.hdfs.listing import INT64, Listing, _tobytes
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+# same as the "fs.local.block.size" default in the Hadoop configuration
+DEFAULT_BLOCK_SIZE = 32 * 1024 * 1024
+# the local fs reports a fixed replication factor of 1 and a single host
+REPLICATION = 1
+LOCALHOST = "localhost"
+# permission bits returned by FsPermission.toShort (incl. the sticky bit)
+PERM_MASK = 0o1777
+
+
+def _ioerror(meth):
+    """
+    Report OS-level errors as :exc:`IOError` (only makes a difference
+    in Python 2, where :exc:`OSError` is not an alias of :exc:`IOError`).
+    """
+    @wraps(meth)
+    def wrapper(*args, **kwargs):
+        try:
+            return meth(*args, **kwargs)
+        except OSError as e:
+            if isinstance(e, IOError):
+                raise
+            raise IOError(e.errno, e.strerror, e.filename)
+    return wrapper
+
+
+def _user_name(uid):
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+def _group_name(gid):
+    try:
+        return grp.getgrgid(gid).gr_name
+    except KeyError:
+        return str(gid)
+
+
+class CoreLocalFs(object):
+    """
+    Local file system driver with the same interface as ``CoreHdfsFs``.
+
+    Path names returned by :meth:`get_path_info` and
+    :meth:`list_directory` are ``file:`` URIs, as in the Java
+    ``RawLocalFileSystem``. Input paths can be either plain local paths
+    or ``file:`` URIs; relative paths are resolved against the working
+    directory, which follows the process's current directory until
+    :meth:`set_working_directory` is called.
+    """
+    def __init__(self, host="", port=0, user=None, group=None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.group = group
+        self.__wd = None
+
+    def __abspath(self, path):
+        if not path:
+            raise ValueError("Empty path")
+        path = common.encode_path(path)
+        if path.startswith("file:"):
+            res = urlparse(path)
+            path = res.netloc + res.path if res.netloc else res.path
+        if not os.path.isabs(path):
+            wd = self.__wd
+            if wd is None:
+                wd = os.getcwd()
+            elif wd.startswith("file:"):
+                wd = urlparse(wd).path
+            path = os.path.join(wd, path)
+        return os.path.normpath(path)
+
+    @staticmethod
+    def __uri(path):
+        return "file:%s" % path
+
+    def __info(self, path, st):
+        return {
+            "name": self.__uri(path),
+            "kind": "directory" if stat.S_ISDIR(st.st_mode) else "file",
+            "group": _group_name(st.st_gid),
+            "last_mod": int(st.st_mtime),
+            "last_access": int(st.st_atime),
+            "replication": REPLICATION,
+            "owner": _user_name(st.st_uid),
+            "permissions": st.st_mode & PERM_MASK,
+            "block_size": DEFAULT_BLOCK_SIZE,
+            "path": self.__uri(path),
+            "size": st.st_size,
+        }
+
+    def close(self):
+        pass
+
+    def get_working_directory(self):
+        if self.__wd is None:
+            return self.__uri(os.getcwd())
+        return self.__wd
+
+    def set_working_directory(self, path):
+        if not path:
+            raise ValueError("Empty path")
+        self.__wd = path
+        return True
+
+    def get_default_block_size(self):
+        return DEFAULT_BLOCK_SIZE
+
+    def get_capacity(self):
+        raise RuntimeError(
+            "hdfsGetCapacity works only on a DistributedFileSystem"
+        )
+
+    def get_used(self):
+        st = os.statvfs("/")
+        return (st.f_blocks - st.f_bfree) * st.f_frsize
+
+    @_ioerror
+    def get_path_info(self, path):
+        path = self.__abspath(path)
+        return self.__info(path, os.stat(path))
+
+    @_ioerror
+    def list_directory(self, path):
+        path = self.__abspath(path)
+        if not os.path.isdir(path):
+            return [self.__info(path, os.stat(path))]
+        infos = []
+        for name in os.listdir(path):
+            p = os.path.join(path, name)
+            try:
+                infos.append(self.__info(p, os.stat(p)))
+            except OSError as e:
+                if e.errno != errno.ENOENT:  # removed while listing
+                    raise
+        return infos
+
+    @_ioerror
+    def list_directory_compact(self, path):
+        """
+        Same as :meth:`list_directory`, but return the listing as a tuple
+        of columns (see :meth:`pydoop.hdfs.listing.Listing.from_columns`).
+        """
+        path = self.__abspath(path)
+        if os.path.isdir(path):
+            paths = [os.path.join(path, _) for _ in os.listdir(path)]
+        else:
+            paths = [path]
+        names, kinds, owners, groups = [], array("b"), [], []
+        ints = [array(INT64) for _ in Listing.INT_FIELDS]
+        users, group_names = {}, {}
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError as e:
+                if e.errno != errno.ENOENT or p == path:
+                    raise
+                continue
+            names.append(self.__uri(p))
+            kinds.append(stat.S_ISDIR(st.st_mode))
+            if st.st_uid not in users:
+                users[st.st_uid] = _user_name(st.st_uid)
+            owners.append(users[st.st_uid])
+            if st.st_gid not in group_names:
+                group_names[st.st_gid] = _group_name(st.st_gid)
+            groups.append(group_names[st.st_gid])
+            for a, v in zip(ints, (
+                    st.st_size, int(st.st_mtime), int(st.st_atime),
+                    REPLICATION, st.st_mode & PERM_MASK, DEFAULT_BLOCK_SIZE
+            )):
+                a.append(v)
+        return tuple([names, _tobytes(kinds), owners, groups] +
+                     [_tobytes(_) for _ in ints])
+
+    def get_hosts(self, path, start, length):
+        if start < 0 or length < 0:
+            raise ValueError("Start position and length must be >= 0")
+        try:
+            info = self.get_path_info(path)
+        except IOError:
+            raise RuntimeError("Failed to get block information")
+        # as in FileSystem.getFileBlockLocations: a single, local block
+        if info["size"] <= start:
+            return []
+        return [[LOCALHOST]]
+
+    def exists(self, path):
+        return os.path.exists(self.__abspath(path))
+
+    @_ioerror
+    def create_directory(self, path):
+        path = self.__abspath(path)
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST or not os.path.isdir(path):
+                raise
+        return True
+
+    @_ioerror
+    def delete(self, path, recursive=True):
+        path = self.__abspath(path)
+        if os.path.isdir(path) and not os.path.islink(path):
+            if recursive:
+                import shutil  # loads bz2, lzma, etc.
+                shutil.rmtree(path)
+            else:
+                os.rmdir(path)
+        else:
+            os.remove(path)
+        return True
+
+    @_ioerror
+    def rename(self, from_path, to_path):
+        from_path = self.__abspath(from_path)
+        to_path = self.__abspath(to_path)
+        if os.path.isdir(to_path):
+            to_path = os.path.join(to_path, os.path.basename(from_path))
+        os.rename(from_path, to_path)
+        return True
+
+    def set_replication(self, path, replication):
+        self.get_path_info(path)
+        return True
+
+    @_ioerror
+    def chmod(self, path, mode):
+        os.chmod(self.__abspath(path), mode)
+        return True
+
+    @_ioerror
+    def chown(self, path, user="", group=""):
+        abspath = self.__abspath(path)
+        try:
+            uid = pwd.getpwnam(user).pw_uid if user else -1
+        except KeyError:
+            raise IOError(errno.EINVAL, "no such user: %r" % (user,), abspath)
+        try:
+            gid = grp.getgrnam(group).gr_gid if group else -1
+        except KeyError:
+            raise IOError(
+                errno.EINVAL, "no such group: %r" % (group,), abspath
+            )
+        os.chown(abspath, uid, gid)
+        return True
+
+    @_ioerror
+    def utime(self, path, mtime, atime):
+        os.utime(self.__abspath(path), (atime, mtime))
+        return True
+
+    @_ioerror
+    def open_file(self, path, flags=os.O_RDONLY, buff_size=0, replication=0,
+                  blocksize=0, readline_chunk_size=0):
+        """
+        Return a raw, unbuffered file object with the same read/write
+        interface as ``CoreHdfsFile``.
+        """
+        mode = common.Mode(flags)
+        return io.FileIO(self.__abspath(path), mode.value[0])
+
+    def copy(self, from_path, to_fs, to_path):
+        copy(self, from_path, to_fs, to_path)
+        return 0
+
+    def move(self, from_path, to_fs, to_path):
+        if isinstance(to_fs, CoreLocalFs):
+            return self.rename(from_path, to_fs.__abspath(to_path))
+        copy(self, from_path, to_fs, to_path)
+        return self.delete(from_path)
+
+
+def _basename(name):
+    return name.rstrip("/").rsplit("/", 1)[-1]
+
+
+def copy(from_fs, from_path, to_fs, to_path):
+    """\
+    Copy ``from_path`` to ``to_path`` through the core fs interface.
+
+    Works between any two core fs objects (local or native), following
+    ``FileUtil.copy``: if ``to_path`` is an existing directory, the
+    source is copied into it; existing files are overwritten.
+    """
+    info = from_fs.get_path_info(from_path)
+    try:
+        to_info = to_fs.get_path_info(to_path)
+    except IOError:
+        pass
+    else:
+        if to_info["kind"] == "directory":
+            to_path = "%s/%s" % (
+                to_path.rstrip("/"), _basename(info["name"])
+            )
+    if info["kind"] == "directory":
+        to_fs.create_directory(to_path)
+        for item in from_fs.list_directory(info["name"]):
+            copy(from_fs, item["name"], to_fs,
+                 "%s/%s" % (to_path.rstrip("/"), _basename(item["name"])))
+        return
+    fi = from_fs.open_file(info["name"], os.O_RDONLY)
+    try:
+        fo = to_fs.open_file(to_path, os.O_WRONLY)
+        try:
+            while 1:
+                chunk = fi.read(common.BUFSIZE)
+                if not chunk:
+                    break
+                fo.write(chunk)
+        finally:
+            fo.close()
+    finally:
+        fi.close()
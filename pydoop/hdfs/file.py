@@ -22,10 +22,12 @@ pydoop.hdfs.file -- HDFS File Objects
 """
 
 import os
+import threading
 from io import FileIO, UnsupportedOperation
 import codecs
 
 from pydoop.hdfs import common
+from pydoop.hdfs.cache import default_block_cache
 
 
 def _complain_ifclosed(closed):
@@ -59,7 +61,8 @@ class hdfs_file(object):
     ENDL = os.linesep
 
     def __init__(self, raw_hdfs_file, fs, name, mode,
-                 chunk_size=common.BUFSIZE, encoding=None, errors=None):
+                 chunk_size=common.BUFSIZE, encoding=None, errors=None,
+                 block_cache=None, write_buffer_size=0, flush_interval=None):
         if not chunk_size > 0:
             raise ValueError("chunk size must be positive")
         mode_obj = common.Mode(mode)
@@ -80,12 +83,35 @@ class hdfs_file(object):
             self.__encoding = self.__errors = None
         self.f = raw_hdfs_file
         self.__fs = fs
-        self.__name = fs.get_path_info(name)["name"]
-        self.__size = fs.get_path_info(name)["size"]
+        info = fs.get_path_info(name)
+        self.__name = info["name"]
+        self.__size = info["size"]
         self.__mode_obj = mode_obj
+        if block_cache is True:
+            block_cache = default_block_cache()
+        if block_cache is not None and mode_obj.writable:
+            raise ValueError("block cache requires a readonly opening mode")
+        self.__block_cache = block_cache
+        self.__file_id = info["name"], info["size"], info["last_mod"]
         self.chunk_size = chunk_size
         self.closed = False
         self.__reset()
+        if (write_buffer_size > 0 or flush_interval) and \
+           not mode_obj.writable:
+            raise ValueError("write options require a writable mode")
+        self.__write_buffer_size = write_buffer_size
+        self.__pending = []
+        self.__pending_size = 0
+        self.__dirty = False
+        self.__wlock = threading.RLock()
+        self.__flusher = self.__flush_error = None
+        if flush_interval:
+            self.__stop_flusher = threading.Event()
+            self.__flusher = threading.Thread(
+                target=self.__flush_loop, args=(flush_interval,)
+            )
+            self.__flusher.daemon = True
+            self.__flusher.start()
 
     def __reset(self):
         self.buffer_list = []
@@ -121,6 +147,13 @@ class hdfs_file(object):
         """
         return self.__size
 
+    @property
+    def block_cache(self):
+        """
+        The :class:`~.cache.BlockCache` used by this file, if any.
+        """
+        return self.__block_cache
+
     @property
     def mode(self):
         """
@@ -207,12 +240,39 @@ class hdfs_file(object):
         Close the file.
         """
         if not self.closed:
-            self.closed = True
-            retval = self.f.close()
+            if self.__flusher is not None:
+                self.__stop_flusher.set()
+                if self.__flusher is not threading.current_thread():
+                    self.__flusher.join()
+            with self.__wlock:
+                try:
+                    self.__write_pending()
+                finally:
+                    self.closed = True
+                    retval = self.f.close()
             if self.writable():
+                self.fs.invalidate_metadata(self.name)
                 self.__size = self.fs.get_path_info(self.name)["size"]
             return retval
 
+    def __fetch(self, position, length):
+        length = min(length, self.size - position)
+        chunks = []
+        while length > 0:
+            c = self.f.pread(position, length)
+            if not c:
+                break
+            chunks.append(c)
+            position += len(c)
+            length -= len(c)
+        return b"".join(chunks)
+
+    def __cached_read(self, position, length):
+        length = min(length, self.size - position)
+        return self.__block_cache.read(
+            self.__file_id, self.__fetch, position, length
+        )
+
     def pread(self, position, length):
         r"""
         Read ``length`` bytes of data from the file, starting from
@@ -232,6 +292,8 @@ class hdfs_file(object):
             raise IOError("position cannot be past EOF")
         if length < 0:
             length = self.size - position
+        if self.__block_cache is not None:
+            return self.__cached_read(position, length)
         return self.f.pread(position, length)
 
     def pread_chunk(self, position, chunk):
@@ -251,6 +313,10 @@ class hdfs_file(object):
         _complain_ifclosed(self.closed)
         if position > self.size:
             raise IOError("position cannot be past EOF")
+        if self.__block_cache is not None:
+            data = self.__cached_read(position, len(chunk))
+            chunk[:len(data)] = data
+            return len(data)
         return self.f.pread_chunk(position, chunk)
 
     def read(self, length=-1):
@@ -268,16 +334,21 @@ class hdfs_file(object):
         # to ensure that we actually read the required number of bytes.
         if length < 0:
             length = self.size
-        chunks = []
-        while 1:
-            if length <= 0:
-                break
-            c = self.f.read(min(self.chunk_size, length))
-            if c == b"":
-                break
-            chunks.append(c)
-            length -= len(c)
-        data = b"".join(chunks)
+        if self.__block_cache is not None:
+            position = self.f.tell()
+            data = self.__cached_read(position, length)
+            self.f.seek(position + len(data))
+        else:
+            chunks = []
+            while 1:
+                if length <= 0:
+                    break
+                c = self.f.read(min(self.chunk_size, length))
+                if c == b"":
+                    break
+                chunks.append(c)
+                length -= len(c)
+            data = b"".join(chunks)
         if self.__encoding:
             return data.decode(self.__encoding, self.__errors)
         else:
@@ -296,8 +367,21 @@ class hdfs_file(object):
         :return: the number of bytes read
         """
         _complain_ifclosed(self.closed)
+        if self.__block_cache is not None:
+            position = self.f.tell()
+            data = self.__cached_read(position, len(chunk))
+            chunk[:len(data)] = data
+            self.f.seek(position + len(data))
+            return len(data)
         return self.f.read_chunk(chunk)
 
+    def readinto(self, b):
+        """
+        Same as :meth:`read_chunk` (for compatibility with the
+        :mod:`io` module).
+        """
+        return self.read_chunk(b)
+
     def seek(self, position, whence=os.SEEK_SET):
         """
         Seek to ``position`` in file.
@@ -322,12 +406,21 @@ class hdfs_file(object):
         :return: current offset in bytes
         """
         _complain_ifclosed(self.closed)
+        if self.__pending:
+            with self.__wlock:
+                self.__write_pending()
         return self.f.tell()
 
     def write(self, data):
         """
         Write ``data`` to the file.
 
+        If the file has been opened with a ``write_buffer_size``, data is
+        accumulated in memory and written out in large chunks when the
+        buffer is full, when the file is flushed or closed, and,
+        if a ``flush_interval`` has been set, periodically by a
+        background thread.
+
         :type data: bytes
         :param data: the data to be written to the file
         :rtype: int
@@ -336,6 +429,18 @@ class hdfs_file(object):
         _complain_ifclosed(self.closed)
         if not self.writable():
             raise UnsupportedOperation("write")
+        if self.__flush_error is not None:
+            raise self.__flush_error
+        self.__dirty = True
+        if self.__write_buffer_size > 0:
+            if not self.__encoding and not isinstance(data, bytes):
+                data = memoryview(data).tobytes()  # the caller may reuse it
+            with self.__wlock:
+                self.__pending.append(data)
+                self.__pending_size += len(data)
+                if self.__pending_size >= self.__write_buffer_size:
+                    self.__write_pending()
+            return len(data)
         if self.__encoding:
             self.f.write(data.encode(self.__encoding, self.__errors))
             return len(data)
@@ -354,12 +459,60 @@ class hdfs_file(object):
         """
         return self.write(chunk)
 
+    def __write_pending(self):
+        # call with self.__wlock held
+        if not self.__pending:
+            return
+        chunks, self.__pending, self.__pending_size = self.__pending, [], 0
+        if self.__encoding:
+            self.f.write(u"".join(chunks).encode(
+                self.__encoding, self.__errors
+            ))
+        else:
+            self.f.write(b"".join(chunks))
+
+    def __flush_loop(self, interval):
+        while not self.__stop_flusher.wait(interval):
+            try:
+                with self.__wlock:
+                    if self.closed:
+                        break
+                    if self.__dirty:
+                        self.hflush()
+            except Exception as e:
+                self.__flush_error = e
+                break
+
     def flush(self):
         """
         Force any buffered output to be written.
         """
         _complain_ifclosed(self.closed)
-        return self.f.flush()
+        with self.__wlock:
+            self.__write_pending()
+            return self.f.flush()
+
+    def hflush(self):
+        """
+        Write out any buffered data and flush it to the DataNodes, so
+        that it becomes visible to new readers.
+        """
+        _complain_ifclosed(self.closed)
+        with self.__wlock:
+            self.__write_pending()
+            self.f.hflush()
+            self.__dirty = False
+
+    def hsync(self):
+        """
+        Like :meth:`hflush`, but also make sure that the DataNodes have
+        written the data to disk.
+        """
+        _complain_ifclosed(self.closed)
+        with self.__wlock:
+            self.__write_pending()
+            self.f.hsync()
+            self.__dirty = False
 
 
 class local_file(FileIO):
@@ -408,6 +561,7 @@ class local_file(FileIO):
             self.flush()
             os.fsync(self.fileno())
             self.__size = os.fstat(self.fileno()).st_size
+            self.fs.invalidate_metadata(self.name)
         super(local_file, self).close()
 
     def seek(self, position, whence=os.SEEK_SET):
@@ -434,9 +588,14 @@ class local_file(FileIO):
 
     def read_chunk(self, chunk):
         _complain_ifclosed(self.closed)
-        data = self.read(len(chunk))
-        chunk[:len(data)] = data
-        return len(data)
+        return self.readinto(chunk)
 
     def write_chunk(self, chunk):
         return self.write(chunk)
+
+    def hflush(self):
+        self.flush()
+
+    def hsync(self):
+        self.flush()
+        os.fsync(self.fileno())
@@ -27,22 +27,37 @@ import getpass
 import re
 import operator as ops
 import io
+import posixpath
+import threading
 
 import pydoop
 from . import common
 from .file import hdfs_file, local_file
-from .core import core_hdfs_fs
+from .core import core_hdfs_fs, CoreLocalFs
+from .core import local_fs
+from .listing import Listing, PathInfo
+from .cache import MetadataCache, MISSING, DEFAULT_TTL, DEFAULT_MAX_SIZE
 
 # py3 compatibility
 from functools import reduce
 
-from pydoop.utils.py3compat import basestring
+from pydoop.utils.py3compat import basestring, queue
 try:
     from urllib.parse import urlparse
 except ImportError:
     from urlparse import urlparse
 
 
+class _WalkNode(object):
+
+    __slots__ = ("info", "parent", "todo")
+
+    def __init__(self, info, parent=None):
+        self.info = info
+        self.parent = parent
+        self.todo = None  # subdirectories left to walk, None until listed
+
+
 class _FSStatus(object):
 
     def __init__(self, fs, host, port, user, refcount=1):
@@ -51,6 +66,7 @@ class _FSStatus(object):
         self.port = port
         self.user = user
         self.refcount = refcount
+        self.metadata_cache = None
 
     def __repr__(self):
         return "_FSStatus(%s, %s)" % (self.fs, self.refcount)
@@ -69,8 +85,22 @@ def _get_ip(host, default=None):
     return ip if ip != "0.0.0.0" else default
 
 
-def _get_connection_info(host, port, user):
-    fs = core_hdfs_fs(host, port, user)
+def _is_local(host):
+    if not host:
+        return True
+    if host != "default":
+        return False
+    try:
+        return default_is_local()
+    except ValueError:  # no Hadoop configuration, let libhdfs complain
+        return False
+
+
+def _get_connection_info(host, port, user, new_instance=False):
+    if _is_local(host):
+        # no need to start a JVM for the local fs
+        return "", 0, getpass.getuser(), CoreLocalFs()
+    fs = core_hdfs_fs(host, port, user, new_instance=new_instance)
     res = urlparse(fs.get_working_directory())
     if res.scheme == "file":
         h, p, u = "", 0, getpass.getuser()
@@ -115,12 +145,24 @@ class hdfs(object):
       started the JobTracker itself.
     :type groups: list
     :param groups: ignored. Included for backwards compatibility.
+    :type per_thread: bool
+    :param per_thread: if :obj:`True`, do not share the underlying
+      connection with handles created by other threads.
+
+    Handles to the same (host, port, user) are backed by a single,
+    reference counted connection, which is closed when the last handle
+    is closed. Creating and closing handles is thread safe. With
+    ``per_thread=True``, each thread gets its own connection (for HDFS,
+    an independent instance of the Java ``FileSystem``), shared only by
+    the handles created in that thread.
 
     **Note:** when connecting to the local file system, ``user`` is
     ignored (i.e., it will always be the current UNIX user).
     """
     _CACHE = {}
     _ALIASES = {"host": {}, "port": {}, "user": {}}
+    # guards _CACHE, _ALIASES and the reference counts
+    _LOCK = threading.RLock()
 
     def __canonize_hpu(self, hpu):
         host, port, user = hpu
@@ -129,10 +171,14 @@ class hdfs(object):
         user = self._ALIASES["user"].get(user, user)
         return host, port, user
 
-    def __lookup(self, hpu):
+    def __lookup(self, hpu, thread_id=None):
         if hpu[0]:
             hpu = self.__canonize_hpu(hpu)
-        return self._CACHE[hpu]
+        return self._CACHE[self.__cache_key(hpu, thread_id)]
+
+    @staticmethod
+    def __cache_key(hpu, thread_id):
+        return hpu if thread_id is None else hpu + (thread_id,)
 
     def __eq__(self, other):
         """
@@ -141,7 +187,8 @@ class hdfs(object):
         """
         return type(self) == type(other) and self.fs == other.fs
 
-    def __init__(self, host="default", port=0, user=None, groups=None):
+    def __init__(self, host="default", port=0, user=None, groups=None,
+                 per_thread=False):
         host = host.strip()
         raw_host = host
         host = common.encode_host(host)
@@ -150,30 +197,38 @@ class hdfs(object):
         if not host:
             port = 0
             user = user or getpass.getuser()
-        try:
-            self.__status = self.__lookup((host, port, user))
-        except KeyError:
-            h, p, u, fs = _get_connection_info(host, port, user)
-            aliasing_info = [] if user else [("user", u, user)]
-            if h != "":
-                aliasing_info.append(("port", p, port))
-            ip = _get_ip(h, None)
-            if ip:
-                aliasing_info.append(("host", ip, h))
-            else:
-                ip = h
-            aliasing_info.append(("host", ip, host))
-            if raw_host != host:
-                aliasing_info.append(("host", ip, raw_host))
-            for k, true_x, x in aliasing_info:
-                if true_x != x:
-                    self._ALIASES[k][x] = true_x
+        tid = threading.current_thread().ident if per_thread else None
+        self.__closed = False
+        # connecting while holding the lock ensures that concurrent
+        # requests for the same fs do not open redundant connections
+        with self._LOCK:
             try:
-                self.__status = self.__lookup((h, p, u))
+                self.__status = self.__lookup((host, port, user), tid)
             except KeyError:
-                self.__status = _FSStatus(fs, h, p, u, refcount=0)
-                self._CACHE[(ip, p, u)] = self.__status
-        self.__status.refcount += 1
+                h, p, u, fs = _get_connection_info(
+                    host, port, user, new_instance=per_thread
+                )
+                aliasing_info = [] if user else [("user", u, user)]
+                if h != "":
+                    aliasing_info.append(("port", p, port))
+                ip = _get_ip(h, None)
+                if ip:
+                    aliasing_info.append(("host", ip, h))
+                else:
+                    ip = h
+                aliasing_info.append(("host", ip, host))
+                if raw_host != host:
+                    aliasing_info.append(("host", ip, raw_host))
+                for k, true_x, x in aliasing_info:
+                    if true_x != x:
+                        self._ALIASES[k][x] = true_x
+                try:
+                    self.__status = self.__lookup((h, p, u), tid)
+                except KeyError:
+                    self.__status = _FSStatus(fs, h, p, u, refcount=0)
+                    key = self.__cache_key((ip, p, u), tid)
+                    self._CACHE[key] = self.__status
+            self.__status.refcount += 1
 
     def __enter__(self):
         return self
@@ -213,17 +268,93 @@ class hdfs(object):
     def close(self):
         """
         Close the HDFS handle (disconnect).
-        """
-        self.__status.refcount -= 1
-        if self.refcount == 0:
-            self.fs.close()
-            for k, status in list(self._CACHE.items()):  # yes, we want a copy
-                if status.refcount == 0:
-                    del self._CACHE[k]
+
+        The underlying connection is closed only when all handles that
+        share it have been closed. Calling this method more than once on
+        the same handle has no further effect.
+        """
+        with self._LOCK:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__status.refcount -= 1
+            if self.refcount == 0:
+                self.fs.close()
+                for k, status in list(self._CACHE.items()):  # we want a copy
+                    if status.refcount == 0:
+                        del self._CACHE[k]
 
     @property
     def closed(self):
-        return self.__status.refcount == 0
+        return self.__closed or self.__status.refcount == 0
+
+    def __is_local_core(self):
+        return isinstance(self.fs, CoreLocalFs)
+
+    @property
+    def metadata_cache(self):
+        """
+        The :class:`~.cache.MetadataCache` shared by all handles to this
+        fs, or :obj:`None` if metadata caching is disabled.
+        """
+        return self.__status.metadata_cache
+
+    def enable_metadata_cache(self, ttl=DEFAULT_TTL,
+                              max_size=DEFAULT_MAX_SIZE):
+        """
+        Cache path information retrieved through this fs.
+
+        When the cache is enabled, :meth:`get_path_info` and
+        :meth:`exists` reuse information obtained by previous calls and
+        by (non-compact) :meth:`list_directory` calls, including those
+        made by :meth:`walk`, for up to ``ttl`` seconds. Changes made
+        through any handle to this fs are reflected immediately, but
+        changes made by other clients can take up to ``ttl`` seconds to
+        become visible.
+
+        The cache is shared by all handles to the same fs, and it is
+        discarded when the last one is closed. Since the functions in
+        :mod:`pydoop.hdfs` and :mod:`pydoop.hdfs.path` open their own
+        handles, keep a handle with the cache enabled open to make
+        them use it.
+
+        :type ttl: float
+        :param ttl: maximum age of cache entries, in seconds
+        :type max_size: int
+        :param max_size: maximum number of entries
+        """
+        _complain_ifclosed(self.closed)
+        cache = MetadataCache(ttl, max_size)
+        with self._LOCK:
+            self.__status.metadata_cache = cache
+
+    def disable_metadata_cache(self):
+        """
+        Disable and discard the metadata cache.
+        """
+        with self._LOCK:
+            self.__status.metadata_cache = None
+
+    def invalidate_metadata(self, path=None):
+        """
+        Remove ``path`` (all paths if :obj:`None`) from the metadata
+        cache. Paths under ``path`` are also removed, as well as its
+        ancestors.
+        """
+        cache = self.__status.metadata_cache
+        if cache is None:
+            return
+        if path is None:
+            cache.clear()
+        else:
+            cache.invalidate(self.__metadata_key(path))
+
+    def __metadata_key(self, path):
+        p = urlparse(path).path
+        if not p.startswith("/"):
+            wd = urlparse(self.fs.get_working_directory()).path
+            p = posixpath.join(wd, p)
+        return posixpath.normpath(p)
 
     def open_file(self, path,
                   flags=os.O_RDONLY,
@@ -232,7 +363,10 @@ class hdfs(object):
                   blocksize=0,
                   readline_chunk_size=common.BUFSIZE,
                   encoding=None,
-                  errors=None):
+                  errors=None,
+                  block_cache=None,
+                  write_buffer_size=0,
+                  flush_interval=None):
         """
         Open an HDFS file.
 
@@ -253,6 +387,20 @@ class hdfs(object):
         :type readline_chunk_size: int
         :param readline_chunk_size: the amount of bytes that
           :meth:`~.file.hdfs_file.readline` will use for buffering
+        :type block_cache: :class:`~.cache.BlockCache` or bool
+        :param block_cache: if set, serve reads (including
+          :meth:`~.file.hdfs_file.pread`) from an in-memory cache of
+          file blocks: pass :obj:`True` to use the process-wide cache
+          (see :func:`~.cache.default_block_cache`). Ignored for local
+          files, which are cached by the operating system.
+        :type write_buffer_size: int
+        :param write_buffer_size: if positive, coalesce small writes in a
+          buffer of this size (see :meth:`~.file.hdfs_file.write`)
+        :type flush_interval: float
+        :param flush_interval: if set, a background thread calls
+          :meth:`~.file.hdfs_file.hflush` at these intervals (in
+          seconds) if new data has been written. Buffering options are
+          ignored for local files.
         :rtpye: :class:`~.file.hdfs_file`
         :return: handle to the open file
         """
@@ -260,14 +408,21 @@ class hdfs(object):
         if not path:
             raise ValueError("Empty path")
         m = common.Mode(flags)
+        if m.writable:
+            self.invalidate_metadata(path)
         if not self.host:
+            if path.startswith("file:"):  # e.g., a name from get_path_info
+                path = urlparse(path).path
             fret = local_file(self, path, common.Mode(m.value[0]))
             if m.text:
                 cls = io.BufferedWriter if m.writable else io.BufferedReader
                 fret = io.TextIOWrapper(cls(fret), encoding, errors)
             return fret
         f = self.fs.open_file(path, m.flags, buff_size, replication, blocksize)
-        fret = hdfs_file(f, self, path, m, readline_chunk_size)
+        fret = hdfs_file(f, self, path, m, readline_chunk_size,
+                         block_cache=block_cache,
+                         write_buffer_size=write_buffer_size,
+                         flush_interval=flush_interval)
         if m.flags == os.O_RDONLY:
             fret.seek(0)
         return fret
@@ -298,7 +453,12 @@ class hdfs(object):
         """
         _complain_ifclosed(self.closed)
         if isinstance(to_hdfs, self.__class__):
+            to_hdfs.invalidate_metadata(to_path)
             to_hdfs = to_hdfs.fs
+        if isinstance(to_hdfs, CoreLocalFs) and not self.__is_local_core():
+            # the native copy only works between native instances
+            local_fs.copy(self.fs, from_path, to_hdfs, to_path)
+            return 0
         return self.fs.copy(from_path, to_hdfs, to_path)
 
     def create_directory(self, path):
@@ -311,6 +471,7 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         return self.fs.create_directory(path)
 
     def default_block_size(self):
@@ -336,6 +497,7 @@ class hdfs(object):
           :obj:`False` and directory is non-empty
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         return self.fs.delete(path, recursive)
 
     def exists(self, path):
@@ -348,7 +510,17 @@ class hdfs(object):
         :return: :obj:`True` if ``path`` exists
         """
         _complain_ifclosed(self.closed)
-        return self.fs.exists(path)
+        cache = self.__status.metadata_cache
+        if cache is None:
+            return self.fs.exists(path)
+        key = self.__metadata_key(path)
+        info = cache.get(key)
+        if info is not None:
+            return info is not MISSING
+        retval = self.fs.exists(path)
+        if not retval:
+            cache.put(key, MISSING)
+        return retval
 
     def get_hosts(self, path, start, length):
         """
@@ -393,20 +565,47 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
-        return self.fs.get_path_info(path)
-
-    def list_directory(self, path):
+        cache = self.__status.metadata_cache
+        if cache is None:
+            return self.fs.get_path_info(path)
+        key = self.__metadata_key(path)
+        info = cache.get(key)
+        if info is None or info is MISSING:
+            info = self.fs.get_path_info(path)
+            cache.put(key, info)
+        return dict(info)
+
+    def list_directory(self, path, compact=False):
         r"""
         Get list of files and directories for ``path``\ .
 
+        If ``compact`` is :obj:`True`, return a
+        :class:`~.listing.Listing`, which stores path properties in
+        columns rather than in one dictionary per entry and takes much
+        less memory for large directories.
+
         :type path: str
         :param path: the path of the directory
-        :rtype: list
+        :type compact: bool
+        :param compact: return a compact listing
+        :rtype: list or :class:`~.listing.Listing`
         :return: list of files and directories in ``path``
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
-        return self.fs.list_directory(path)
+        if not compact:
+            infos = self.fs.list_directory(path)
+            cache = self.__status.metadata_cache
+            if cache is not None:
+                for info in infos:
+                    key = posixpath.normpath(urlparse(info["name"]).path)
+                    cache.put(key, dict(info))
+            return infos
+        try:
+            list_compact = self.fs.list_directory_compact
+        except AttributeError:  # native extension built without it
+            return Listing(self.fs.list_directory(path))
+        return Listing.from_columns(list_compact(path))
 
     def move(self, from_path, to_hdfs, to_path):
         """
@@ -422,7 +621,12 @@ class hdfs(object):
         """
         _complain_ifclosed(self.closed)
         if isinstance(to_hdfs, self.__class__):
+            to_hdfs.invalidate_metadata(to_path)
             to_hdfs = to_hdfs.fs
+        self.invalidate_metadata(from_path)
+        if isinstance(to_hdfs, CoreLocalFs) and not self.__is_local_core():
+            local_fs.copy(self.fs, from_path, to_hdfs, to_path)
+            return self.fs.delete(from_path, True)
         return self.fs.move(from_path, to_hdfs, to_path)
 
     def rename(self, from_path, to_path):
@@ -436,6 +640,8 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(from_path)
+        self.invalidate_metadata(to_path)
         return self.fs.rename(from_path, to_path)
 
     def set_replication(self, path, replication):
@@ -449,6 +655,7 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         return self.fs.set_replication(path, replication)
 
     def set_working_directory(self, path):
@@ -497,6 +704,7 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         return self.fs.chown(path, user, group)
 
     @staticmethod
@@ -579,6 +787,7 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         try:
             return self.fs.chmod(path, mode)
         except TypeError:
@@ -598,17 +807,40 @@ class hdfs(object):
         :raises: :exc:`~exceptions.IOError`
         """
         _complain_ifclosed(self.closed)
+        self.invalidate_metadata(path)
         return self.fs.utime(path, int(mtime), int(atime))
 
-    def walk(self, top):
+    def walk(self, top, workers=1, prune=None, topdown=True, compact=False):
         """
         Generate infos for all paths in the tree rooted at ``top`` (included).
 
         The ``top`` parameter can be either an HDFS path string or a
         dictionary of properties as returned by :meth:`get_path_info`.
 
+        The tree is traversed iteratively, so its depth is not limited
+        by the recursion limit. If ``workers`` is greater than 1,
+        directories are listed concurrently by a pool of ``workers``
+        threads, and path infos are generated as soon as listings come
+        in (i.e., not in depth-first order). If ``prune`` is given, it
+        is called with the info of each directory: if it returns
+        :obj:`True`, the directory is generated, but its contents are
+        not. If ``topdown`` is :obj:`False`, each directory is generated
+        after its contents rather than before them. If ``compact`` is
+        :obj:`True`, directories are listed in compact form (see
+        :meth:`list_directory`), and path infos are generated as
+        :class:`~.listing.PathInfo` objects.
+
         :type top: str, dict
         :param top: an HDFS path or path info dict
+        :type workers: int
+        :param workers: number of threads used to list directories
+        :type prune: callable
+        :param prune: predicate on directory infos; subtrees for which it
+          returns :obj:`True` are not traversed
+        :type topdown: bool
+        :param topdown: generate directories before their contents
+        :type compact: bool
+        :param compact: generate :class:`~.listing.PathInfo` objects
         :rtype: iterator
         :return: path infos of files and directories in the tree rooted at
           ``top``
@@ -619,8 +851,87 @@ class hdfs(object):
             raise ValueError("Empty path")
         if isinstance(top, basestring):
             top = self.get_path_info(top)
-        yield top
-        if top['kind'] == 'directory':
-            for info in self.list_directory(top['name']):
-                for item in self.walk(info):
-                    yield item
+        if compact and not isinstance(top, PathInfo):
+            top = PathInfo.from_dict(top)
+        if workers > 1:
+            walker = self.__parallel_walk(
+                top, workers, prune, topdown, compact
+            )
+        else:
+            walker = self.__walk(top, prune, topdown, compact)
+        for info in walker:
+            yield info
+
+    @staticmethod
+    def __descend(info, prune):
+        return info['kind'] == 'directory' and not (prune and prune(info))
+
+    def __walk(self, top, prune, topdown, compact):
+        if topdown:
+            yield top
+        if not self.__descend(top, prune):
+            if not topdown:
+                yield top
+            return
+        stack = [(top, iter(self.list_directory(top['name'], compact)))]
+        while stack:
+            info, children = stack[-1]
+            for child in children:
+                if topdown:
+                    yield child
+                if self.__descend(child, prune):
+                    listing = self.list_directory(child['name'], compact)
+                    stack.append((child, iter(listing)))
+                    break
+                if not topdown:
+                    yield child
+            else:
+                stack.pop()
+                if not topdown:
+                    yield info
+
+    def __parallel_walk(self, top, workers, prune, topdown, compact):
+        from multiprocessing.pool import ThreadPool
+        if topdown:
+            yield top
+        if not self.__descend(top, prune):
+            if not topdown:
+                yield top
+            return
+        results = queue.Queue()
+
+        def list_dir(node):
+            try:
+                results.put((node, self.list_directory(
+                    node.info['name'], compact
+                )))
+            except Exception as e:
+                results.put((node, e))
+
+        pool = ThreadPool(workers)
+        try:
+            pending = 1
+            pool.apply_async(list_dir, (_WalkNode(top),))
+            while pending:
+                node, children = results.get()
+                pending -= 1
+                if isinstance(children, Exception):
+                    raise children
+                node.todo = 0
+                for child in children:
+                    if topdown:
+                        yield child
+                    if self.__descend(child, prune):
+                        node.todo += 1
+                        pending += 1
+                        pool.apply_async(list_dir, (_WalkNode(child, node),))
+                    elif not topdown:
+                        yield child
+                # bottom-up: generate each directory whose subtree is done
+                while not topdown and node is not None and node.todo == 0:
+                    yield node.info
+                    node = node.parent
+                    if node is not None:
+                        node.todo -= 1
+        finally:
+            pool.terminate()
@@ -0,0 +1,228 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.globbing -- Pathname Pattern Expansion
+--------------------------------------------------
+
+Support for :func:`~pydoop.hdfs.glob` and :func:`~pydoop.hdfs.iglob`.
+
+Patterns can contain the following special elements:
+
+* ``*``: matches any sequence of characters, except ``/``;
+* ``?``: matches any single character, except ``/``;
+* ``[seq]``, ``[!seq]``: match any character in (not in) ``seq``;
+* ``{a,b}``: matches either ``a`` or ``b`` (alternatives can be nested
+  and can contain the other special elements and ``/``);
+* ``**``, as a whole path component: matches any number (including
+  zero) of directories.
+
+As in Hadoop's ``globStatus``, names starting with a dot are not
+treated specially. The literal part of the pattern that precedes the
+first special element is not listed, and at each level only the
+directories that can match are listed, concurrently.
+"""
+
+import re
+import fnmatch
+
+_MAGIC = re.compile(r"[*?[]")
+RECURSIVE = "**"
+
+
+def has_magic(s):
+    return _MAGIC.search(s) is not None
+
+
+def _split_alternatives(s):
+    alts, depth, start = [], 0, 0
+    for i, c in enumerate(s):
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            alts.append(s[start: i])
+            start = i + 1
+    alts.append(s[start:])
+    return alts
+
+
+def expand_braces(pattern):
+    """
+    Return the list of patterns obtained by expanding ``{a,b}``
+    alternatives in ``pattern`` (unbalanced braces are left as they
+    are).
+
+    .. code-block:: python
+
+      >>> expand_braces("/data/{2025,2026}/{a,b{1,2}}")
+      ['/data/2025/a', '/data/2025/b1', '/data/2025/b2', '/data/2026/a', \
+'/data/2026/b1', '/data/2026/b2']
+    """
+    depth, start = 0, None
+    for i, c in enumerate(pattern):
+        if c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif c == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                prefix, suffix = pattern[:start], pattern[i + 1:]
+                return [
+                    p for alt in _split_alternatives(pattern[start + 1: i])
+                    for p in expand_braces(prefix + alt + suffix)
+                ]
+    return [pattern]
+
+
+def _basename(name):
+    return name.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _join(d, name):
+    return "%s/%s" % (d.rstrip("/"), name)
+
+
+class _Globber(object):
+
+    def __init__(self, fs, workers):
+        self.fs = fs
+        self.workers = workers
+        self.pool = None
+        if workers > 1:
+            from multiprocessing.pool import ThreadPool
+            self.pool = ThreadPool(workers)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+    def imap(self, func, items):
+        if self.pool is None or len(items) < 2:
+            return (func(_) for _ in items)
+        return self.pool.imap(func, items)
+
+    def info(self, path):
+        try:
+            return self.fs.get_path_info(path)
+        except IOError:
+            return None
+
+    def is_dir(self, path):
+        info = self.info(path)
+        return info is not None and info["kind"] == "directory"
+
+    def list_dir(self, path):
+        # path must be a directory: listing a file returns the file itself
+        try:
+            return self.fs.list_directory(path)
+        except IOError:
+            return []
+
+    def listing(self, path):
+        return self.list_dir(path) if self.is_dir(path) else []
+
+    def walk_dir(self, path):
+        try:
+            return list(self.fs.walk(path, workers=self.workers))
+        except IOError:
+            return []
+
+    def tree(self, path):
+        return self.walk_dir(path) if self.is_dir(path) else []
+
+    def glob(self, pattern):
+        absolute = pattern.startswith("/")
+        parts = [_ for _ in pattern.split("/") if _]
+        i = 0
+        while i < len(parts) and parts[i] != RECURSIVE and \
+                not has_magic(parts[i]):
+            i += 1
+        prefix = "/".join(parts[:i])
+        if absolute:
+            prefix = "/" + prefix
+        info = self.info(prefix or ".")
+        if i == len(parts):  # nothing to expand
+            if info is not None:
+                yield info["name"]
+            return
+        # listing a file would return the file itself
+        if info is None or info["kind"] != "directory":
+            return
+        # candidates obtained from listings are known to be directories,
+        # those built from literal components must be checked
+        candidates, checked = [info["name"]], True
+        for j in range(i, len(parts)):
+            comp, last = parts[j], j == len(parts) - 1
+            if comp == RECURSIVE:
+                trees = self.imap(
+                    self.walk_dir if checked else self.tree, candidates
+                )
+                if last:
+                    for infos in trees:
+                        for info in infos:
+                            yield info["name"]
+                    return
+                candidates = [info["name"] for infos in trees
+                              for info in infos
+                              if info["kind"] == "directory"]
+                checked = True
+            elif has_magic(comp):
+                regex = re.compile(fnmatch.translate(comp))
+                listing = self.list_dir if checked else self.listing
+                candidates, checked, matches = [], True, (
+                    info for infos in self.imap(listing, candidates)
+                    for info in infos
+                    if regex.match(_basename(info["name"]))
+                )
+                for info in matches:
+                    if last:
+                        yield info["name"]
+                    elif info["kind"] == "directory":
+                        candidates.append(info["name"])
+            elif last:
+                paths = [_join(c, comp) for c in candidates]
+                for info in self.imap(self.info, paths):
+                    if info is not None:
+                        yield info["name"]
+            else:
+                candidates = [_join(c, comp) for c in candidates]
+                checked = False
+            if not candidates:
+                return
+
+
+def iglob(fs, pattern, workers=1):
+    """
+    Generate the names of the paths on the :class:`~.fs.hdfs` instance
+    ``fs`` that match ``pattern`` (a path without scheme and netloc).
+    Up to ``workers`` directories are listed concurrently.
+    """
+    globber = _Globber(fs, workers)
+    seen = set()
+    try:
+        for p in expand_braces(pattern):
+            for name in globber.glob(p):
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+    finally:
+        globber.close()
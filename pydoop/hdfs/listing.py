@@ -0,0 +1,234 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.listing -- Compact Directory Listings
+-------------------------------------------------
+
+Memory-efficient alternatives to the lists of dictionaries returned by
+:meth:`~.fs.hdfs.list_directory`. A :class:`Listing` stores the
+properties of all entries in columns (typed arrays for numeric fields),
+and a :class:`PathInfo` holds the properties of a single path in
+slots. Both support the dictionary-style access used with path info
+dictionaries, e.g., ``info["size"]``.
+"""
+
+from array import array
+
+try:
+    array("q")
+except ValueError:  # Python 2
+    INT64 = "l"
+else:
+    INT64 = "q"
+
+DIRECTORY, FILE = "directory", "file"
+
+
+class PathInfo(object):
+    """
+    Properties of a file or directory, with the same keys as the
+    dictionaries returned by :meth:`~.fs.hdfs.get_path_info`.
+    """
+    KEYS = (
+        "name", "kind", "group", "last_mod", "last_access", "replication",
+        "owner", "permissions", "block_size", "path", "size",
+    )
+    __slots__ = tuple(_ for _ in KEYS if _ != "path")
+
+    def __init__(self, name, kind, group, last_mod, last_access, replication,
+                 owner, permissions, block_size, size):
+        self.name = name
+        self.kind = kind
+        self.group = group
+        self.last_mod = last_mod
+        self.last_access = last_access
+        self.replication = replication
+        self.owner = owner
+        self.permissions = permissions
+        self.block_size = block_size
+        self.size = size
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(*(d[_] for _ in cls.__slots__))
+
+    @property
+    def path(self):
+        return self.name
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.KEYS)
+
+    def items(self):
+        return [(_, getattr(self, _)) for _ in self.KEYS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        try:
+            return all(self[_] == other[_] for _ in self.KEYS)
+        except (KeyError, TypeError):
+            return NotImplemented
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        return res if res is NotImplemented else not res
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.to_dict())
+
+
+class Listing(object):
+    """
+    Properties of a sequence of paths, stored by column.
+
+    Names, owners and groups are kept in lists (owners and groups share
+    a single string object per distinct value), the kind in a byte array
+    (1 for directories, 0 for files) and the other properties in 64-bit
+    integer arrays, available as attributes named after the path info
+    keys (e.g., ``listing.size``). Indexing and iteration yield
+    :class:`PathInfo` objects.
+    """
+    INT_FIELDS = (
+        "size", "last_mod", "last_access", "replication", "permissions",
+        "block_size",
+    )
+
+    def __init__(self, infos=()):
+        self.name = []
+        self.kind = array("b")
+        self.owner = []
+        self.group = []
+        for f in self.INT_FIELDS:
+            setattr(self, f, array(INT64))
+        self.__strings = {}
+        self.extend(infos)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a listing from the columns returned by the
+        ``list_directory_compact`` method of core fs objects: a tuple of
+        names, kinds (as bytes), owners, groups and one bytes object of
+        native 64-bit integers for each of :attr:`INT_FIELDS`.
+        """
+        self = cls()
+        names, kinds, owners, groups = columns[:4]
+        self.name = names
+        _frombytes(self.kind, kinds)
+        self.owner = owners
+        self.group = groups
+        for f, data in zip(cls.INT_FIELDS, columns[4:]):
+            _frombytes(getattr(self, f), data)
+        return self
+
+    def __shared(self, s):
+        return self.__strings.setdefault(s, s)
+
+    def append(self, info):
+        """
+        Append a path info (dictionary or :class:`PathInfo`).
+        """
+        self.name.append(info["name"])
+        self.kind.append(info["kind"] == DIRECTORY)
+        self.owner.append(self.__shared(info["owner"]))
+        self.group.append(self.__shared(info["group"]))
+        for f in self.INT_FIELDS:
+            getattr(self, f).append(info[f])
+
+    def extend(self, infos):
+        if isinstance(infos, Listing):
+            self.name.extend(infos.name)
+            self.kind.extend(infos.kind)
+            self.owner.extend(self.__shared(_) for _ in infos.owner)
+            self.group.extend(self.__shared(_) for _ in infos.group)
+            for f in self.INT_FIELDS:
+                getattr(self, f).extend(getattr(infos, f))
+            return
+        for info in infos:
+            self.append(info)
+
+    def __len__(self):
+        return len(self.name)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Listing(self[j] for j in range(*i.indices(len(self))))
+        return PathInfo(
+            self.name[i], DIRECTORY if self.kind[i] else FILE, self.group[i],
+            self.last_mod[i], self.last_access[i], self.replication[i],
+            self.owner[i], self.permissions[i], self.block_size[i],
+            self.size[i]
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "<%s: %d paths>" % (self.__class__.__name__, len(self))
+
+    def to_numpy(self):
+        """
+        Return a dictionary that maps column names to NumPy arrays.
+
+        Numeric columns are converted without copying; ``kind`` is a
+        boolean array (:obj:`True` for directories). Requires NumPy.
+        """
+        import numpy as np
+        d = {
+            "name": np.array(self.name, dtype=object),
+            "kind": np.frombuffer(self.kind, dtype=np.int8).astype(bool),
+            "owner": np.array(self.owner, dtype=object),
+            "group": np.array(self.group, dtype=object),
+        }
+        for f in self.INT_FIELDS:
+            d[f] = np.frombuffer(getattr(self, f), dtype=np.int64)
+        return d
+
+
+def _frombytes(a, data):
+    try:
+        a.frombytes(data)
+    except AttributeError:  # Python 2
+        a.fromstring(data)
+
+
+def _tobytes(a):
+    try:
+        return a.tobytes()
+    except AttributeError:  # Python 2
+        return a.tostring()
@@ -0,0 +1,259 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.node_cache -- Node-local File Cache
+-----------------------------------------------
+
+A read-through cache that keeps local copies of HDFS files, so that
+tasks running on the same node can share a single download of the same
+side data (e.g., dictionaries or models). It is used by :func:`~.open`
+when called with ``cache="node"``.
+
+Cached copies are keyed by path, size and modification time, so that a
+file that changes on HDFS is downloaded again. Copies are written to a
+temporary file and renamed into place, and a lock file ensures that
+concurrent readers (threads or processes) download each file only once.
+When the total size of the cache exceeds its limit, the least recently
+used copies are removed.
+
+The cache directory and size limit can be set through the
+``PYDOOP_NODE_CACHE_DIR`` and ``PYDOOP_NODE_CACHE_SIZE`` (in bytes)
+environment variables.
+"""
+
+import os
+import errno
+import fcntl
+import getpass
+import hashlib
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from . import common
+
+DEFAULT_MAX_SIZE = 4 * 2**30
+LOCK_SUFFIX = ".lock"
+TMP_SUFFIX = ".tmp"
+
+_DEFAULT = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_dir():
+    return os.getenv("PYDOOP_NODE_CACHE_DIR", os.path.join(
+        tempfile.gettempdir(), "pydoop_node_cache_%s" % getpass.getuser()
+    ))
+
+
+def default_cache():
+    """
+    Return the process-wide :class:`NodeCache`, creating it if needed.
+    """
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = NodeCache(
+                max_size=int(os.getenv(
+                    "PYDOOP_NODE_CACHE_SIZE", DEFAULT_MAX_SIZE
+                ))
+            )
+        return _DEFAULT
+
+
+@contextmanager
+def _locked(path):
+    """
+    Hold an exclusive lock on ``path``, creating it if necessary. The
+    lock file can be safely removed while the lock is held.
+    """
+    while 1:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                same = os.path.samestat(os.fstat(fd), os.stat(path))
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+                same = False
+        except Exception:
+            os.close(fd)
+            raise
+        if same:
+            break
+        os.close(fd)  # lock file removed by the previous holder: retry
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+class NodeCache(object):
+    """
+    A size-bounded directory of local copies of HDFS files.
+
+    :type directory: str
+    :param directory: where to store the copies (by default, a
+      per-user subdirectory of the system's temporary directory)
+    :type max_size: int
+    :param max_size: maximum total size of the copies in bytes
+    """
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE,
+                 bufsize=common.BUFSIZE):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.directory = os.path.abspath(directory or default_dir())
+        self.max_size = max_size
+        self.bufsize = bufsize
+        self.hits = self.misses = 0
+        try:
+            os.makedirs(self.directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def key(self, info):
+        """
+        Compute the cache key for the given path info.
+        """
+        s = "%s\0%d\0%d" % (info["name"], info["size"], info["last_mod"])
+        return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+    def fetch(self, fs, path):
+        """
+        Return the local path of a copy of ``path`` (on the
+        :class:`~.fs.hdfs` instance ``fs``), downloading it if needed.
+        """
+        info = fs.get_path_info(path)
+        if info["kind"] != "file":
+            raise IOError("%s is not a file" % info["name"])
+        key = self.key(info)
+        local_path = os.path.join(self.directory, key)
+        if self.__touch(local_path):
+            self.hits += 1
+            return local_path
+        lock_path = local_path + LOCK_SUFFIX
+        with _locked(lock_path):
+            if self.__touch(local_path):  # filled by someone else
+                self.hits += 1
+            else:
+                self.misses += 1
+                self.__fill(fs, info["name"], key, local_path)
+            os.unlink(lock_path)
+        self.evict(keep=local_path)
+        return local_path
+
+    def fetch_open(self, fs, path, opener):
+        """
+        Fetch ``path`` as in :meth:`fetch` and return
+        ``opener(local_path)``. If the copy is evicted by a concurrent
+        task before it can be opened, it is fetched again. Once open,
+        the copy can be evicted without affecting the reader.
+        """
+        while 1:
+            local_path = self.fetch(fs, path)
+            try:
+                return opener(local_path)
+            except (IOError, OSError) as e:
+                if e.errno != errno.ENOENT or os.path.exists(local_path):
+                    raise
+
+    def __touch(self, local_path):
+        try:
+            os.utime(local_path, None)  # mark as recently used
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return False
+        return True
+
+    def __fill(self, fs, name, key, local_path):
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=key, suffix=TMP_SUFFIX, dir=self.directory
+        )
+        try:
+            with os.fdopen(fd, "wb") as fo:
+                with fs.open_file(name, "rb") as fi:
+                    shutil.copyfileobj(fi, fo, self.bufsize)
+            os.chmod(tmp_path, 0o644)
+            os.rename(tmp_path, local_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def __entries(self):
+        entries = []
+        for bn in os.listdir(self.directory):
+            if bn.endswith(LOCK_SUFFIX) or bn.endswith(TMP_SUFFIX):
+                continue
+            p = os.path.join(self.directory, bn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue  # removed concurrently
+            entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def size(self):
+        """
+        Return the total size of the cached copies.
+        """
+        return sum(_[1] for _ in self.__entries())
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used copies until the total size is
+        within the limit. The copy at ``keep``, if given, is not removed.
+        Open files are not affected.
+
+        Each copy is removed while holding its lock, and only if it has
+        not been used since the cache was scanned.
+        """
+        entries = sorted(self.__entries())
+        total = sum(_[1] for _ in entries)
+        for mtime, size, p in entries:
+            if total <= self.max_size:
+                break
+            if p == keep:
+                continue
+            lock_path = p + LOCK_SUFFIX
+            with _locked(lock_path):
+                try:
+                    if os.stat(p).st_mtime == mtime:
+                        os.unlink(p)
+                        total -= size
+                except OSError:
+                    pass
+                os.unlink(lock_path)
+
+    def clear(self):
+        """
+        Remove all cached copies.
+        """
+        for _, _, p in self.__entries():
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+        self.hits = self.misses = 0
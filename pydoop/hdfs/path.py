@@ -19,11 +19,19 @@
 """
 pydoop.hdfs.path -- Path Name Manipulations
 -------------------------------------------
+
+The results of :func:`split` and :func:`abspath` are memoized, and the
+functions that query the file system share one handle per (host, port,
+user), rather than connecting and disconnecting at each call. Use
+:func:`clear_cache` if the Hadoop configuration changes (this is done
+by :func:`pydoop.hdfs.reset`).
 """
 
 import os
 import re
 import time
+import threading
+from collections import OrderedDict
 
 from . import common, fs as hdfs_fs
 from pydoop.utils.py3compat import clong
@@ -31,6 +39,91 @@ from pydoop.utils.py3compat import clong
 
 curdir, pardir, sep = '.', '..', '/'  # pylint: disable=C0103
 
+CACHE_SIZE = 4096
+DEFAULT_WORKERS = 8
+
+
+class _LRUCache(object):
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        with self.__lock:
+            try:
+                value = self.__entries.pop(key)
+            except KeyError:
+                return None
+            self.__entries[key] = value  # most recently used
+            return value
+
+    def put(self, key, value):
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = value
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+
+_SPLIT_CACHE = _LRUCache()
+_ABSPATH_CACHE = _LRUCache()
+_HANDLES = {}
+_HANDLES_PID = [os.getpid()]
+_HANDLES_LOCK = threading.Lock()
+
+
+def _handle(host, port, user=None):
+    """
+    Return the shared handle for (``host``, ``port``, ``user``). Do not
+    close it.
+    """
+    key = host, port, user
+    with _HANDLES_LOCK:
+        if _HANDLES_PID[0] != os.getpid():
+            # connections can't be shared with the parent process
+            _HANDLES.clear()
+            _HANDLES_PID[0] = os.getpid()
+        fs = _HANDLES.get(key)
+        if fs is None or fs.closed:
+            fs = _HANDLES[key] = hdfs_fs.hdfs(host, port, user)
+        return fs
+
+
+def clear_cache():
+    """
+    Clear the memoized results of :func:`split` and :func:`abspath`
+    and close the shared file system handles.
+    """
+    _SPLIT_CACHE.clear()
+    _ABSPATH_CACHE.clear()
+    with _HANDLES_LOCK:
+        handles = list(_HANDLES.values()) if \
+            _HANDLES_PID[0] == os.getpid() else []
+        _HANDLES.clear()
+    for fs in handles:
+        fs.close()
+
+
+def _map(func, items, workers):
+    if workers > 1 and len(items) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(workers, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+    return [func(_) for _ in items]
+
 
 class StatResult(object):
     """
@@ -201,8 +294,12 @@ def split(hdfs_path, user=None):
     :rtype: tuple
     :return: hostname, port, path
     """
-    # Use a helper class to compile URL_PATTERN once and for all
-    return _HdfsPathSplitter.split(hdfs_path, user or common.DEFAULT_USER)
+    key = hdfs_path, user or common.DEFAULT_USER
+    rval = _SPLIT_CACHE.get(key)
+    if rval is None:
+        rval = _HdfsPathSplitter.split(*key)
+        _SPLIT_CACHE.put(key, rval)
+    return rval
 
 
 def join(*parts):
@@ -268,13 +365,19 @@ def abspath(hdfs_path, user=None, local=False):
         return 'file:%s' % os.path.abspath(hdfs_path)
     if isfull(hdfs_path):
         return hdfs_path
+    key = hdfs_path, user or common.DEFAULT_USER
+    apath = _ABSPATH_CACHE.get(key)
+    if apath is not None:
+        return apath
     hostname, port, path = split(hdfs_path, user=user)
     if hostname:
-        fs = hdfs_fs.hdfs(hostname, port)
+        fs = _handle(hostname, port)
         apath = join("hdfs://%s:%s" % (fs.host, fs.port), path)
-        fs.close()
+    elif path.startswith("/"):
+        apath = "file:%s" % os.path.normpath(path)
     else:
-        apath = "file:%s" % os.path.abspath(path)
+        return "file:%s" % os.path.abspath(path)  # depends on the cwd
+    _ABSPATH_CACHE.put(key, apath)
     return apath
 
 
@@ -306,10 +409,16 @@ def exists(hdfs_path, user=None):
     Return :obj:`True` if ``hdfs_path`` exists in the default HDFS.
     """
     hostname, port, path = split(hdfs_path, user=user)
-    fs = hdfs_fs.hdfs(hostname, port)
-    retval = fs.exists(path)
-    fs.close()
-    return retval
+    return _handle(hostname, port).exists(path)
+
+
+def exists_many(hdfs_paths, user=None, workers=DEFAULT_WORKERS):
+    """
+    Return a list of booleans that tell whether each of ``hdfs_paths``
+    exists. Paths are checked concurrently, by up to ``workers``
+    threads.
+    """
+    return _map(lambda p: exists(p, user), list(hdfs_paths), workers)
 
 
 # -- libhdfs does not support fs.FileStatus.isSymlink() --
@@ -329,13 +438,10 @@ def kind(path, user=None):
     Return :obj:`None` if ``path`` doesn't exist.
     """
     hostname, port, path = split(path, user=user)
-    fs = hdfs_fs.hdfs(hostname, port)
     try:
-        return fs.get_path_info(path)['kind']
+        return _handle(hostname, port).get_path_info(path)['kind']
     except IOError:
         return None
-    finally:
-        fs.close()
 
 
 def isdir(path, user=None):
@@ -392,14 +498,29 @@ def stat(path, user=None):
     :class:`StatResult` object.
     """
     host, port, path_ = split(path, user)
-    fs = hdfs_fs.hdfs(host, port, user)
-    retval = StatResult(fs.get_path_info(path_))
+    retval = StatResult(_handle(host, port, user).get_path_info(path_))
     if not host:
         _update_stat(retval, path_)
-    fs.close()
     return retval
 
 
+def stat_many(paths, user=None, workers=DEFAULT_WORKERS):
+    """
+    Perform :func:`stat` on each of ``paths``, using up to ``workers``
+    threads.
+
+    :rtype: list
+    :return: a :class:`StatResult` for each path (:obj:`None` if the
+      path does not exist), in the same order as ``paths``
+    """
+    def stat_or_none(p):
+        try:
+            return stat(p, user)
+        except IOError:
+            return None
+    return _map(stat_or_none, list(paths), workers)
+
+
 def getatime(path, user=None):
     """
     Get time of last access of ``path``.
@@ -544,5 +665,4 @@ def access(path, mode, user=None):
 def utime(hdfs_path, times=None, user=None):
     atime, mtime = times or 2 * (time.time(),)
     hostname, port, path = split(hdfs_path, user=user)
-    with hdfs_fs.hdfs(hostname, port) as fs:
-        fs.utime(path, mtime, atime)
+    _handle(hostname, port).utime(path, mtime, atime)
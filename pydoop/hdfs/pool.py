@@ -0,0 +1,241 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.pool -- Open File Pool
+----------------------------------
+
+A pool of open, read-only files, for applications that access the same
+files many times (e.g., random lookups into a set of indexed files).
+Reusing an open file saves the metadata requests and the open/close
+calls that would otherwise be made for each access.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from . import path as hpath
+from .fs import hdfs
+from .cache import _now
+
+DEFAULT_MAX_OPEN = 128
+DEFAULT_MAX_AGE = 5.0  # seconds
+
+
+def _stamp(info):
+    return info["size"], info["last_mod"]
+
+
+class _Entry(object):
+
+    __slots__ = "file", "stamp", "checked", "lock", "evicted"
+
+    def __init__(self):
+        self.file = self.stamp = None
+        self.checked = 0
+        self.lock = threading.Lock()
+        self.evicted = False
+
+    def close(self):
+        if self.file is not None:
+            f, self.file = self.file, None
+            f.close()
+
+
+class HandlePool(object):
+    """
+    A thread-safe LRU pool of files opened for reading.
+
+    Files are obtained with :meth:`open`, which works like the
+    top-level :func:`~pydoop.hdfs.open` function (except that it returns
+    a context manager)::
+
+      with HandlePool(max_open=64) as pool:
+          for path, offset in lookups:
+              with pool.open(path) as f:
+                  rec = f.pread(offset, 100)
+
+    Each file can be used by only one thread at a time: other threads
+    that open it wait until it's returned to the pool. When there are
+    more than ``max_open`` files in the pool, the least recently used
+    ones that are not in use are closed.
+
+    When a file is reused more than ``max_age`` seconds after its
+    size and modification time were last checked, they are checked
+    again, and the file is reopened if it has changed. Use
+    :meth:`invalidate` to force a check on the next access.
+
+    Additional keyword arguments are passed to
+    :meth:`~.fs.hdfs.open_file`.
+
+    :type max_open: int
+    :param max_open: maximum number of open files (not in use)
+    :type max_age: float
+    :param max_age: seconds after which file metadata is checked again
+    :type user: str
+    :param user: passed to :func:`~.path.split`
+    """
+    def __init__(self, max_open=DEFAULT_MAX_OPEN, max_age=DEFAULT_MAX_AGE,
+                 user=None, **open_kwargs):
+        if max_open <= 0:
+            raise ValueError("max_open must be positive")
+        if "mode" in open_kwargs or "flags" in open_kwargs:
+            raise ValueError("pooled files are always opened for reading")
+        self.max_open = max_open
+        self.max_age = max_age
+        self.user = user
+        self.open_kwargs = open_kwargs
+        self.hits = self.misses = 0
+        self.closed = False
+        self.__entries = OrderedDict()
+        self.__fs = {}
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __get_fs(self, host, port):
+        try:
+            return self.__fs[(host, port)]
+        except KeyError:
+            fs = self.__fs[(host, port)] = hdfs(host, port, self.user)
+            return fs
+
+    def __remove(self, key, entry):
+        # call with both the pool lock and the entry lock held
+        if self.__entries.get(key) is entry:
+            del self.__entries[key]
+        entry.evicted = True
+
+    def __evict(self, keep):
+        to_close = []
+        with self.__lock:
+            for k, e in list(self.__entries.items()):
+                if len(self.__entries) <= self.max_open:
+                    break
+                if e is not keep and e.lock.acquire(False):
+                    self.__remove(k, e)
+                    to_close.append(e)
+        for e in to_close:
+            try:
+                e.close()
+            finally:
+                e.lock.release()
+
+    def __checkout(self, hdfs_path):
+        host, port, path_ = hpath.split(hdfs_path, self.user)
+        key = host, port, path_
+        while 1:
+            with self.__lock:
+                if self.closed:
+                    raise ValueError("I/O operation on closed pool")
+                fs = self.__get_fs(host, port)
+                entry = self.__entries.pop(key, None)
+                if entry is None:
+                    entry = _Entry()
+                self.__entries[key] = entry  # most recently used
+            entry.lock.acquire()
+            if not entry.evicted:
+                break
+            entry.lock.release()  # evicted while we were waiting
+        try:
+            self.__refresh(fs, path_, entry)
+        except BaseException:
+            with self.__lock:
+                self.__remove(key, entry)
+            try:
+                entry.close()
+            finally:
+                entry.lock.release()
+            raise
+        self.__evict(entry)
+        return entry
+
+    def __refresh(self, fs, path_, entry):
+        now = _now()
+        if entry.file is not None and now - entry.checked >= self.max_age:
+            if _stamp(fs.get_path_info(path_)) != entry.stamp:
+                entry.close()
+            else:
+                entry.checked = now
+        if entry.file is None:
+            self.misses += 1
+            entry.stamp = _stamp(fs.get_path_info(path_))
+            entry.file = fs.open_file(path_, "r", **self.open_kwargs)
+            entry.checked = now
+        else:
+            self.hits += 1
+            entry.file.seek(0)
+
+    @contextmanager
+    def open(self, hdfs_path):
+        """
+        Get an open file for ``hdfs_path`` from the pool (opening it if
+        needed) and return it to the pool at the end of the ``with``
+        block. The file's position is set to 0 at the beginning of the
+        block. Do not close the file.
+        """
+        entry = self.__checkout(hdfs_path)
+        try:
+            yield entry.file
+        finally:
+            entry.lock.release()
+
+    def invalidate(self, hdfs_path=None):
+        """
+        Check the size and modification time of ``hdfs_path`` (or of all
+        files, if ``hdfs_path`` is :obj:`None`) on the next access.
+        """
+        with self.__lock:
+            if hdfs_path is None:
+                entries = list(self.__entries.values())
+            else:
+                key = hpath.split(hdfs_path, self.user)
+                entries = [self.__entries.get(key)]
+            for e in entries:
+                if e is not None:
+                    e.checked = -self.max_age - 1
+
+    def close(self):
+        """
+        Close all files (waiting for the ones in use to be returned)
+        and the underlying filesystem handles.
+        """
+        with self.__lock:
+            if self.closed:
+                return
+            self.closed = True
+            entries = list(self.__entries.values())
+            self.__entries.clear()
+            handles = list(self.__fs.values())
+            self.__fs.clear()
+        try:
+            for e in entries:
+                with e.lock:
+                    e.evicted = True
+                    e.close()
+        finally:
+            for fs in handles:
+                fs.close()
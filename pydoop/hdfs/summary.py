@@ -0,0 +1,125 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.summary -- Disk Usage
+---------------------------------
+
+Size and file counts of directory trees (see :func:`~pydoop.hdfs.du`
+and :func:`~pydoop.hdfs.content_summary`). Trees are traversed with
+:meth:`~.fs.hdfs.walk`, optionally listing directories concurrently,
+and path infos are added to the running totals as they are generated,
+so memory usage does not depend on the size of the tree.
+"""
+
+from .listing import DIRECTORY
+
+
+class ContentSummary(object):
+    """
+    Totals for a file or directory tree, with the same meaning as the
+    fields of Hadoop's ``ContentSummary``.
+
+    * ``length``: total size of the files, in bytes;
+    * ``file_count``: number of files;
+    * ``directory_count``: number of directories, including the root
+      of the tree;
+    * ``space_consumed``: total size of the files multiplied by their
+      replication factor.
+    """
+    __slots__ = "length", "file_count", "directory_count", "space_consumed"
+
+    def __init__(self, length=0, file_count=0, directory_count=0,
+                 space_consumed=0):
+        self.length = length
+        self.file_count = file_count
+        self.directory_count = directory_count
+        self.space_consumed = space_consumed
+
+    def add(self, info):
+        """
+        Add a path info to the totals.
+        """
+        if info["kind"] == DIRECTORY:
+            self.directory_count += 1
+        else:
+            size = info["size"]
+            self.file_count += 1
+            self.length += size
+            self.space_consumed += size * info["replication"]
+
+    def _astuple(self):
+        return tuple(getattr(self, _) for _ in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentSummary):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, ", ".join(
+            "%s=%d" % (_, getattr(self, _)) for _ in self.__slots__
+        ))
+
+
+def summarize(fs, top, depth=0, workers=1):
+    """
+    Compute the :class:`ContentSummary` of ``top`` and of each path in
+    its tree whose depth (relative to ``top``) is at most ``depth``.
+
+    :type fs: :class:`~.fs.hdfs`
+    :param fs: the filesystem ``top`` is on
+    :type top: str, dict
+    :param top: a path or path info dict
+    :type depth: int
+    :param depth: maximum depth of the reported paths (0: ``top`` only)
+    :type workers: int
+    :param workers: number of threads used to list directories
+    :rtype: dict
+    :return: a mapping from fully qualified path names to summaries
+    """
+    if depth < 0:
+        raise ValueError("depth must be non-negative")
+    walker = fs.walk(top, workers=workers, compact=True)
+    root = next(walker)
+    root_name = root["name"].rstrip("/")
+    summary = ContentSummary()
+    summary.add(root)
+    totals = {root["name"]: summary}
+    if depth == 0:
+        for info in walker:
+            summary.add(info)
+        return totals
+    start = len(root_name) + 1
+    for info in walker:
+        summary.add(info)
+        name = info["name"]
+        parts = name[start:].split("/", depth)
+        key = root_name
+        for p in parts[:depth]:
+            key = "%s/%s" % (key, p)
+            try:
+                totals[key].add(info)
+            except KeyError:  # first path generated for this subtree
+                totals[key] = ContentSummary()
+                totals[key].add(info)
+    return totals
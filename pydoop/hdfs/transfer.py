@@ -0,0 +1,481 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+pydoop.hdfs.transfer -- Parallel Copy Engine
+--------------------------------------------
+
+Copies files and directory trees between two :class:`~.fs.hdfs`
+handles (HDFS or local) using a pool of threads. This is what
+:func:`pydoop.hdfs.cp`, :func:`~pydoop.hdfs.put` and
+:func:`~pydoop.hdfs.get` use under the hood.
+
+Files are copied concurrently, each by a single thread, with large
+buffers. When the destination is the local file system, large files
+are also split into ranges that are copied in parallel and written in
+place (HDFS files can only be written sequentially, so this is not
+possible for HDFS destinations).
+"""
+
+import io
+import os
+import time
+import hashlib
+import threading
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+DEFAULT_BUFSIZE = 4 * 1024 * 1024
+# maximum number of tasks waiting for a worker, per worker
+QUEUE_FACTOR = 4
+# block size for checksum comparisons in sync
+CHECKSUM_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+class CopyStats(object):
+    """
+    Progress and throughput of a copy operation.
+
+    ``bytes`` and ``files`` count data and files copied so far, while
+    ``total_bytes`` and ``total_files`` count those scheduled so far
+    (the latter stop growing when the whole source tree has been
+    listed). ``directories`` is the number of directories created. For
+    :func:`sync`, ``skipped`` is the number of files that were already
+    up to date and ``deleted`` the number of paths removed from the
+    destination.
+    """
+    def __init__(self):
+        self.bytes = self.files = self.directories = 0
+        self.total_bytes = self.total_files = 0
+        self.skipped = self.deleted = 0
+        self.start_time = time.time()
+        self.end_time = None
+
+    @property
+    def elapsed(self):
+        """
+        Seconds since the start of the copy (until its end, if done).
+        """
+        return (self.end_time or time.time()) - self.start_time
+
+    @property
+    def throughput(self):
+        """
+        Average throughput, in bytes per second.
+        """
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.
+
+    def __repr__(self):
+        return "<%s: %d/%d files, %d/%d bytes, %.1f MB/s>" % (
+            self.__class__.__name__, self.files, self.total_files,
+            self.bytes, self.total_bytes, self.throughput / 2**20
+        )
+
+
+class Copier(object):
+    """
+    Copy data from ``src_fs`` to ``dest_fs``.
+
+    :type src_fs: :class:`~.fs.hdfs`
+    :param src_fs: source file system
+    :type dest_fs: :class:`~.fs.hdfs`
+    :param dest_fs: destination file system
+    :type workers: int
+    :param workers: number of copying threads (also used to list
+      source directories)
+    :type bufsize: int
+    :param bufsize: size of the copy buffer (one per thread)
+    :type split_size: int
+    :param split_size: when the destination is local and ``workers``
+      is greater than 1, files larger than this are copied as ranges of
+      this size in parallel. Defaults to the block size of each file
+    :type progress: callable
+    :param progress: if not :obj:`None`, called with the
+      :class:`CopyStats` instance for the ongoing copy every time a
+      buffer has been written. It is called by worker threads, one at a
+      time: it should return quickly.
+    :type preserve_times: bool
+    :param preserve_times: set the modification and access times of
+      each copied file to those of the source
+
+    Additional keyword arguments are passed to
+    :meth:`~.fs.hdfs.open_file` when opening source and destination
+    files (e.g., ``replication``).
+    """
+    def __init__(self, src_fs, dest_fs, workers=1, bufsize=DEFAULT_BUFSIZE,
+                 split_size=None, progress=None, preserve_times=False,
+                 **kwargs):
+        if workers < 1:
+            raise ValueError("number of workers must be positive")
+        if bufsize < 1:
+            raise ValueError("buffer size must be positive")
+        self.src_fs = src_fs
+        self.dest_fs = dest_fs
+        self.workers = workers
+        self.bufsize = bufsize
+        self.split_size = split_size
+        self.progress = progress
+        self.preserve_times = preserve_times
+        kwargs.pop("mode", None)
+        kwargs.pop("flags", None)
+        self.open_kwargs = kwargs
+        self.stats = None
+        self.__lock = threading.Lock()
+
+    def copy(self, src, dest_path):
+        """
+        Copy ``src`` to ``dest_path``.
+
+        ``src`` can be a path or a path info dictionary. If it's a
+        directory, its whole tree is copied, and ``dest_path`` becomes
+        the copy of ``src`` (i.e., it must not exist, and its parent
+        must exist). Existing destination files are overwritten.
+
+        :rtype: :class:`CopyStats`
+        :return: stats for the copy
+        """
+        if not isinstance(src, dict):
+            src = self.src_fs.get_path_info(src)
+        if src["kind"] == "directory":
+            def schedule(pool):
+                self.__copy_tree(pool, src, dest_path)
+        else:
+            def schedule(pool):
+                self.__schedule_file(pool, src, dest_path)
+        try:
+            self.__run(schedule)
+        finally:
+            self.dest_fs.invalidate_metadata(dest_path)
+        return self.stats
+
+    def copy_files(self, pairs, stats=None):
+        """
+        Copy each source file to the corresponding destination.
+
+        :type pairs: iterable
+        :param pairs: (source path info, destination path) tuples
+        :type stats: :class:`CopyStats`
+        :param stats: update these stats instead of new ones
+        :rtype: :class:`CopyStats`
+        :return: stats for the copy
+        """
+        def schedule(pool):
+            for info, dest_path in pairs:
+                self.__schedule_file(pool, info, dest_path)
+        self.__run(schedule, stats)
+        return self.stats
+
+    def __run(self, schedule, stats=None):
+        self.stats = CopyStats() if stats is None else stats
+        pool = _TaskPool(self.workers)
+        try:
+            schedule(pool)
+            pool.join()
+        finally:
+            pool.terminate()
+            self.stats.end_time = time.time()
+
+    def __copy_tree(self, pool, src, dest_path):
+        root = src["name"].rstrip("/")
+        for info in self.src_fs.walk(src, workers=self.workers):
+            rel = info["name"][len(root):].lstrip("/")
+            dest = "%s/%s" % (dest_path.rstrip("/"), rel) if rel else dest_path
+            if info["kind"] == "directory":
+                self.dest_fs.create_directory(dest)
+                self.stats.directories += 1
+            else:
+                self.__schedule_file(pool, info, dest)
+
+    def __schedule_file(self, pool, info, dest_path):
+        size = info["size"]
+        with self.__lock:
+            self.stats.total_files += 1
+            self.stats.total_bytes += size
+        split_size = self.split_size or info.get("block_size") or size
+        if self.workers < 2 or size <= split_size or self.dest_fs.host:
+            pool.submit(self.__copy_file, info, dest_path)
+            return
+        local_path = self.__prepare_local_file(dest_path, size)
+        ranges = [(_, min(split_size, size - _))
+                  for _ in range(0, size, split_size)]
+        counter = [len(ranges)]
+        for offset, length in ranges:
+            pool.submit(self.__copy_range, info, dest_path, local_path,
+                        offset, length, counter)
+
+    def __prepare_local_file(self, dest_path, size):
+        self.dest_fs.open_file(dest_path, "w").close()
+        name = self.dest_fs.get_path_info(dest_path)["name"]
+        local_path = urlparse(name).path
+        with io.open(local_path, "r+b") as f:
+            f.truncate(size)
+        return local_path
+
+    def __update(self, n_bytes, n_files=0):
+        with self.__lock:
+            self.stats.bytes += n_bytes
+            self.stats.files += n_files
+            if self.progress is not None:
+                self.progress(self.stats)
+
+    def __open_src(self, path):
+        kwargs = self.open_kwargs.copy()
+        kwargs.setdefault("readline_chunk_size", self.bufsize)
+        return self.src_fs.open_file(path, "r", **kwargs)
+
+    def __file_done(self, info, dest_path):
+        if self.preserve_times:
+            self.dest_fs.utime(
+                dest_path, info["last_mod"], info["last_access"]
+            )
+        self.__update(0, 1)
+
+    def __copy_file(self, info, dest_path):
+        with self.__open_src(info["name"]) as fi:
+            with self.dest_fs.open_file(dest_path, "w",
+                                        **self.open_kwargs) as fo:
+                while 1:
+                    chunk = fi.read(self.bufsize)
+                    if not chunk:
+                        break
+                    fo.write(chunk)
+                    self.__update(len(chunk))
+        self.__file_done(info, dest_path)
+
+    def __copy_range(self, info, dest_path, local_path, offset, length,
+                     counter):
+        src_path = info["name"]
+        fd = os.open(local_path, os.O_WRONLY)
+        try:
+            os.lseek(fd, offset, os.SEEK_SET)
+            with self.__open_src(src_path) as fi:
+                fi.seek(offset)
+                while length > 0:
+                    chunk = fi.read(min(self.bufsize, length))
+                    if not chunk:
+                        raise IOError("%s: unexpected end of file" % src_path)
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view):]
+                    length -= len(chunk)
+                    self.__update(len(chunk))
+        finally:
+            os.close(fd)
+        with self.__lock:
+            counter[0] -= 1
+            done = not counter[0]
+        if done:
+            self.__file_done(info, dest_path)
+
+
+def _tree(fs, top, workers):
+    """
+    Map paths relative to ``top`` to path infos for the tree rooted at
+    ``top`` (``top`` itself maps to the empty string).
+    """
+    root = top["name"].rstrip("/")
+    return dict(
+        (info["name"][len(root):].lstrip("/"), info)
+        for info in fs.walk(top, workers=workers)
+    )
+
+
+def _block_digest(args):
+    fs, path, offset, length, bufsize = args
+    digest = hashlib.md5()
+    with fs.open_file(path) as f:
+        while length > 0:
+            chunk = f.pread(offset, min(bufsize, length))
+            if not chunk:
+                break
+            digest.update(chunk)
+            offset += len(chunk)
+            length -= len(chunk)
+    return digest.digest()
+
+
+def _same_contents(candidates, src_fs, dest_fs, workers, bufsize,
+                   block_size):
+    """
+    For each (source info, destination info) pair in ``candidates``,
+    tell whether the two files have the same contents, comparing
+    checksums of their blocks. Blocks are read in parallel.
+    """
+    tasks = []
+    for src, dest in candidates:
+        for offset in range(0, src["size"], block_size):
+            length = min(block_size, src["size"] - offset)
+            for fs, info in (src_fs, src), (dest_fs, dest):
+                tasks.append((fs, info["name"], offset, length, bufsize))
+    if workers > 1 and len(tasks) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(workers)
+        try:
+            digests = iter(pool.map(_block_digest, tasks))
+        finally:
+            pool.terminate()
+    else:
+        digests = (_block_digest(_) for _ in tasks)
+    res = []
+    for src, dest in candidates:
+        n_blocks = -(-src["size"] // block_size)
+        pairs = [(next(digests), next(digests)) for _ in range(n_blocks)]
+        res.append(all(a == b for a, b in pairs))
+    return res
+
+
+def sync(src_fs, src_path, dest_fs, dest_path, delete=False, checksum=False,
+         workers=1, checksum_block_size=CHECKSUM_BLOCK_SIZE, **kwargs):
+    """
+    Make ``dest_path`` on ``dest_fs`` a copy of ``src_path`` on
+    ``src_fs``, transferring only what changed.
+
+    If ``src_path`` is a directory, the two trees are compared file by
+    file. A destination file is considered up to date if it has the
+    same size and modification time as the source. If ``checksum`` is
+    :obj:`True`, files with the same size but a different modification
+    time are also compared by reading them in blocks of
+    ``checksum_block_size`` bytes, in parallel, and are not copied if
+    all block checksums match. Copied files get the modification time of
+    their source, so that unchanged files are recognized by the next
+    sync. If ``delete`` is :obj:`True`, destination paths that do not
+    exist in the source tree are removed.
+
+    Other arguments are passed to :class:`Copier`.
+
+    :rtype: :class:`CopyStats`
+    :return: stats for the sync
+    """
+    kwargs["preserve_times"] = True
+    copier = Copier(src_fs, dest_fs, workers=workers, **kwargs)
+    src_top = src_fs.get_path_info(src_path)
+    try:
+        dest_top = dest_fs.get_path_info(dest_path)
+    except IOError:
+        dest_top = None
+    stats = CopyStats()
+    if dest_top is not None and dest_top["kind"] != src_top["kind"]:
+        dest_fs.delete(dest_path)
+        stats.deleted += 1
+        dest_top = None
+    src_tree = _tree(src_fs, src_top, workers)
+    dest_tree = {} if dest_top is None else _tree(dest_fs, dest_top, workers)
+    if src_top["kind"] == "directory":
+        prefix = dest_path.rstrip("/") + "/"
+    else:
+        prefix = dest_path
+
+    def dest_name(rel):
+        return prefix + rel if rel else dest_path
+    to_copy, candidates = [], []
+    for rel in sorted(src_tree):  # parents first
+        src, dest = src_tree[rel], dest_tree.get(rel)
+        if dest is not None and dest["kind"] != src["kind"]:
+            dest_fs.delete(dest["name"])
+            stats.deleted += 1
+            for k in [_ for _ in dest_tree if _.startswith(rel + "/")]:
+                del dest_tree[k]
+            dest = None
+        if src["kind"] == "directory":
+            if dest is None:
+                dest_fs.create_directory(dest_name(rel))
+                stats.directories += 1
+        elif dest is None or dest["size"] != src["size"]:
+            to_copy.append((src, dest_name(rel)))
+        elif dest["last_mod"] == src["last_mod"]:
+            stats.skipped += 1
+        elif checksum:
+            candidates.append((src, dest))
+        else:
+            to_copy.append((src, dest_name(rel)))
+    if candidates:
+        same = _same_contents(candidates, src_fs, dest_fs, workers,
+                              copier.bufsize, checksum_block_size)
+        for (src, dest), is_same in zip(candidates, same):
+            if is_same:
+                dest_fs.utime(dest["name"], src["last_mod"],
+                              src["last_access"])
+                stats.skipped += 1
+            else:
+                to_copy.append((src, dest["name"]))
+    if delete:
+        extra = sorted(_ for _ in dest_tree if _ not in src_tree)
+        deleted = set()
+        for rel in extra:
+            if rel.rsplit("/", 1)[0] in deleted:
+                deleted.add(rel)  # already removed with its parent
+                continue
+            dest_fs.delete(dest_tree[rel]["name"])
+            deleted.add(rel)
+            stats.deleted += 1
+    try:
+        copier.copy_files(to_copy, stats)
+    finally:
+        dest_fs.invalidate_metadata(dest_path)
+    return stats
+
+
+class _TaskPool(object):
+    """
+    Run tasks on a pool of threads (or in the calling thread if there
+    is only one worker), with a bounded number of pending tasks. The
+    first exception raised by a task is raised again by :meth:`submit`
+    or :meth:`join`, and no further tasks are started.
+    """
+    def __init__(self, workers):
+        self.errors = []
+        if workers > 1:
+            from multiprocessing.pool import ThreadPool
+            self.pool = ThreadPool(workers)
+            self.slots = threading.BoundedSemaphore(QUEUE_FACTOR * workers)
+        else:
+            self.pool = None
+
+    def __run(self, task, args):
+        try:
+            if not self.errors:
+                task(*args)
+        except Exception as e:
+            self.errors.append(e)
+        finally:
+            self.slots.release()
+
+    def __check(self):
+        if self.errors:
+            raise self.errors[0]
+
+    def submit(self, task, *args):
+        if self.pool is None:
+            return task(*args)
+        self.slots.acquire()
+        self.__check()
+        self.pool.apply_async(self.__run, (task, args))
+
+    def join(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.__check()
+
+    def terminate(self):
+        if self.pool is not None:
+            self.pool.terminate()
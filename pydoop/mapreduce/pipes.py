@@ -345,6 +345,16 @@ class TaskContext(api.MapContext, api.ReduceContext):
     def get_input_value_class(self):
         return self._input_value_class
 
+    def expand_input(self, stream):
+        """
+        Return an iterator over the ``(key, value)`` records to be fed
+        to the mapper, given the stream of input items sent by the
+        framework. The default implementation returns the stream
+        itself; subclasses can override this to handle items that hold
+        more than one record.
+        """
+        return stream
+
     def next_value(self):
         try:
             self._value = next(self._values)
@@ -461,7 +471,8 @@ class StreamRunner(object):
             raise api.PydoopError('RecordReader not defined')
         send_progress = reader is not None
         mapper = factory.create_mapper(ctx)
-        reader = reader if reader else get_key_value_stream(self.cmd_stream)
+        if not reader:
+            reader = ctx.expand_input(get_key_value_stream(self.cmd_stream))
         ctx.set_combiner(factory, input_split, n_reduces)
         mapper_map = mapper.map
         progress_function = ctx.progress
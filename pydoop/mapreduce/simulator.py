@@ -61,12 +61,18 @@ AVRO_KEY_INPUT_SCHEMA = pydoop.PROPERTIES['AVRO_KEY_INPUT_SCHEMA']
 AVRO_KEY_OUTPUT_SCHEMA = pydoop.PROPERTIES['AVRO_KEY_OUTPUT_SCHEMA']
 AVRO_VALUE_INPUT_SCHEMA = pydoop.PROPERTIES['AVRO_VALUE_INPUT_SCHEMA']
 AVRO_VALUE_OUTPUT_SCHEMA = pydoop.PROPERTIES['AVRO_VALUE_OUTPUT_SCHEMA']
+AVRO_INPUT_BLOCKS = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS']
+AVRO_INPUT_BLOCKS_SCHEMA = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS_SCHEMA']
+AVRO_INPUT_BLOCKS_CODEC = pydoop.PROPERTIES['AVRO_INPUT_BLOCKS_CODEC']
 import json
 
 try:
     from avro.datafile import DataFileReader, DataFileWriter
     from avro.io import DatumReader, DatumWriter
-    from pydoop.avrolib import AvroSerializer, AvroDeserializer, AvroContext
+    from pydoop.avrolib import (
+        AvroSerializer, AvroDeserializer, AvroContext, AvroBlockReader,
+        pack_block
+    )
     import avro.schema
 
     def get_avro_reader(fp):
@@ -500,10 +506,22 @@ class HadoopSimulator(object):
         the command flow a mapItem instruction for each line of `file_in`.
         Otherwise, it assumes that the pipes program will use the
         `input_split` variable and take care of record reading by itself.
+
+        With Avro input, if `AVRO_INPUT_BLOCKS` is set to ``true`` in
+        `job_conf`, whole data blocks of `file_in` are sent as they are
+        stored in the file, one per mapItem, with the schema and codec
+        added to the job conf (see :class:`~pydoop.avrolib.AvroContext`).
         """
         input_key_type = 'org.apache.hadoop.io.LongWritable'
         input_value_type = 'org.apache.hadoop.io.Text'
         piped_input = file_in is not None
+        block_reader = None
+        if piped_input and AVRO_INPUT in job_conf and \
+                str(job_conf.get(AVRO_INPUT_BLOCKS)).lower() == 'true':
+            block_reader = AvroBlockReader(file_in)
+            job_conf = dict(job_conf)
+            job_conf[AVRO_INPUT_BLOCKS_SCHEMA] = block_reader.schema
+            job_conf[AVRO_INPUT_BLOCKS_CODEC] = block_reader.codec
         self.tempf = tempfile.NamedTemporaryFile('rb+', prefix='pydoop-tmp')
         f = self.tempf.file
         self.logger.debug('writing map input data to %s', self.tempf.name)
@@ -514,7 +532,12 @@ class HadoopSimulator(object):
         if piped_input:
             down_stream.send(down_stream.SET_INPUT_TYPES,
                              input_key_type, input_value_type)
-            if AVRO_INPUT in job_conf:
+            if block_reader is not None:
+                for _, count, data in block_reader.raw_blocks():
+                    down_stream.send(
+                        down_stream.MAP_ITEM, '', pack_block(count, data)
+                    )
+            elif AVRO_INPUT in job_conf:
                 serializers = defaultdict(lambda: lambda r: '')
                 avro_input = job_conf[AVRO_INPUT].upper()
                 reader = get_avro_reader(file_in)
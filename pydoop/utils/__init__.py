@@ -34,16 +34,28 @@ __all__ = [
     'split_hdfs_path',
 ]
 
-from .misc import (  # backward compatibility
-    raise_pydoop_exception,
-    jc_configure,
-    jc_configure_int,
-    jc_configure_bool,
-    jc_configure_float,
-    jc_configure_log_level,
-    make_input_split,
-    NullHandler,
-    NullLogger,
-    make_random_str,
-    split_hdfs_path,
-)
+import sys
+
+if sys.version_info >= (3, 7):
+    # don't load misc (and logging & co.) until one of the above is needed
+    def __getattr__(name):
+        if name in __all__:
+            from . import misc
+            return getattr(misc, name)
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name)
+        )
+else:
+    from .misc import (  # backward compatibility
+        raise_pydoop_exception,
+        jc_configure,
+        jc_configure_int,
+        jc_configure_bool,
+        jc_configure_float,
+        jc_configure_log_level,
+        make_input_split,
+        NullHandler,
+        NullLogger,
+        make_random_str,
+        split_hdfs_path,
+    )
@@ -33,6 +33,7 @@ __all__ = [
     "iteritems",
     "parser_read",
     "pickle",
+    "queue",
     "socketserver",
     "StringIO",
     "unicode",
@@ -72,8 +73,20 @@ if _is_py3:
     from io import BytesIO as StringIO
     from abc import ABC
     import configparser
-    import pickle
-    import socketserver
+    import queue
+    if sys.version_info >= (3, 7):
+        # pickle and socketserver are only needed by a few modules, and
+        # they are costly to import: defer loading them (PEP 562)
+        def __getattr__(name):
+            if name in ("pickle", "socketserver"):
+                from importlib import import_module
+                return import_module(name)
+            raise AttributeError(
+                "module %r has no attribute %r" % (__name__, name)
+            )
+    else:
+        import pickle
+        import socketserver
     clong = int
     #  something that should be interpreted as a string
     basestring = str
@@ -92,6 +105,7 @@ else:
     from cStringIO import StringIO
     import cPickle as pickle
     import ConfigParser as configparser
+    import Queue as queue
     import SocketServer as socketserver
     parser_read = __parser_read_2
     #  something that should be interpreted as a string
@@ -0,0 +1,188 @@
+// BEGIN_COPYRIGHT
+//
+// Copyright 2009-2017 CRS4.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"); you may not
+// use this file except in compliance with the License. You may obtain a copy
+// of the License at
+//
+//   http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+// WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+// License for the specific language governing permissions and limitations
+// under the License.
+//
+// END_COPYRIGHT
+
+package it.crs4.pydoop.mapreduce.pipes;
+
+import java.util.Properties;
+
+import java.io.IOException;
+import java.io.ByteArrayOutputStream;
+import java.nio.ByteBuffer;
+
+import org.apache.hadoop.mapreduce.RecordReader;
+import org.apache.hadoop.mapreduce.InputSplit;
+import org.apache.hadoop.mapreduce.TaskAttemptContext;
+import org.apache.hadoop.mapreduce.Counter;
+import org.apache.hadoop.mapreduce.lib.input.FileSplit;
+import org.apache.hadoop.io.NullWritable;
+import org.apache.hadoop.io.Text;
+import org.apache.hadoop.conf.Configuration;
+
+import org.apache.avro.Schema;
+import org.apache.avro.file.DataFileConstants;
+import org.apache.avro.file.DataFileReader;
+import org.apache.avro.file.SeekableInput;
+import org.apache.avro.generic.GenericDatumReader;
+import org.apache.avro.io.BinaryEncoder;
+import org.apache.avro.io.EncoderFactory;
+import org.apache.avro.mapred.FsInput;
+
+
+/**
+ * Block passthrough reader: instead of re-serializing each datum,
+ * send whole Avro data blocks to the pipes program, one per value.
+ * Each value holds the number of records in the block (as an Avro
+ * long) followed by the block's data (uncompressed, since the Java
+ * Avro API decompresses it while reading).  As in
+ * PydoopAvroRecordReaderBase, a split gets the blocks that begin after
+ * its start, up to but not including the first one that begins after
+ * its end.
+ */
+public class PydoopAvroBridgeBlockReader
+    extends RecordReader<NullWritable, Text> {
+
+  private static final String COUNTERS_GROUP =
+    PydoopAvroBridgeBlockReader.class.getName();
+
+  private static class BlockFileReader extends DataFileReader<Object> {
+
+    BlockFileReader(SeekableInput in) throws IOException {
+      super(in, new GenericDatumReader<Object>());
+    }
+
+    ByteBuffer readBlock() throws IOException {
+      ByteBuffer block = nextBlock();
+      // nextBlock does not update the position used by pastSync
+      blockFinished();
+      return block;
+    }
+  }
+
+  private final Submitter.AvroIO mode;
+  private Properties props;
+  private BlockFileReader reader;
+  private long startPosition;
+  private long endPosition;
+  private ByteArrayOutputStream outStream;
+  private BinaryEncoder encoder;
+  private Text value;
+
+  private Counter nBlocks;
+  private Counter readTimeCounter;
+
+  public PydoopAvroBridgeBlockReader(Submitter.AvroIO mode) {
+    this.mode = mode;
+    props = Submitter.getPydoopProperties();
+    outStream = new ByteArrayOutputStream();
+    encoder = EncoderFactory.get().directBinaryEncoder(outStream, null);
+    value = new Text();
+  }
+
+  public static boolean isEnabled(Configuration conf) {
+    Properties props = Submitter.getPydoopProperties();
+    return conf.getBoolean(props.getProperty("AVRO_INPUT_BLOCKS"), false);
+  }
+
+  public void initialize(InputSplit split, TaskAttemptContext context)
+      throws IOException, InterruptedException {
+    if (!(split instanceof FileSplit)) {
+      throw new IllegalArgumentException("Only compatible with FileSplits.");
+    }
+    FileSplit fileSplit = (FileSplit) split;
+    Configuration conf = context.getConfiguration();
+    reader = new BlockFileReader(new FsInput(fileSplit.getPath(), conf));
+    reader.sync(fileSplit.getStart());
+    startPosition = reader.previousSync();
+    endPosition = fileSplit.getStart() + fileSplit.getLength();
+    nBlocks = context.getCounter(COUNTERS_GROUP, "Number of blocks");
+    readTimeCounter = context.getCounter(COUNTERS_GROUP, "Read time (ms)");
+    Schema schema = reader.getSchema();
+    conf.set(props.getProperty("AVRO_INPUT"), mode.name());
+    conf.set(props.getProperty("AVRO_INPUT_BLOCKS_SCHEMA"),
+        schema.toString());
+    conf.set(props.getProperty("AVRO_INPUT_BLOCKS_CODEC"),
+        DataFileConstants.NULL_CODEC);
+    switch (mode) {
+    case K:
+      conf.set(props.getProperty("AVRO_KEY_INPUT_SCHEMA"), schema.toString());
+      break;
+    case V:
+      conf.set(props.getProperty("AVRO_VALUE_INPUT_SCHEMA"),
+          schema.toString());
+      break;
+    case KV:
+      conf.set(props.getProperty("AVRO_KEY_INPUT_SCHEMA"),
+          schema.getField("key").schema().toString());
+      conf.set(props.getProperty("AVRO_VALUE_INPUT_SCHEMA"),
+          schema.getField("value").schema().toString());
+      break;
+    default:
+      throw new IllegalArgumentException("Bad Avro input type");
+    }
+  }
+
+  public synchronized boolean nextKeyValue()
+      throws IOException, InterruptedException {
+    long start = System.nanoTime();
+    if (!reader.hasNext() || reader.pastSync(endPosition)) {
+      return false;
+    }
+    long count = reader.getBlockCount();
+    ByteBuffer block = reader.readBlock();
+    outStream.reset();
+    encoder.writeLong(count);
+    encoder.flush();
+    outStream.write(block.array(), block.arrayOffset() + block.position(),
+        block.remaining());
+    value.set(outStream.toByteArray());
+    readTimeCounter.increment((System.nanoTime() - start) / 1000000);
+    nBlocks.increment(1);
+    return true;
+  }
+
+  @Override
+  public NullWritable getCurrentKey()
+      throws IOException, InterruptedException {
+    return NullWritable.get();
+  }
+
+  @Override
+  public Text getCurrentValue()
+      throws IOException, InterruptedException {
+    return value;
+  }
+
+  public float getProgress() throws IOException, InterruptedException {
+    if (endPosition == startPosition) {
+      return 0.0f;
+    }
+    long bytesRead = reader.previousSync() - startPosition;
+    long bytesTotal = endPosition - startPosition;
+    return Math.min(1.0f, (float) bytesRead / (float) bytesTotal);
+  }
+
+  public synchronized void close() throws IOException {
+    if (reader != null) {
+      try {
+        reader.close();
+      } finally {
+        reader = null;
+      }
+    }
+  }
+}
@@ -25,6 +25,7 @@ import org.apache.hadoop.conf.Configuration;
 import org.apache.hadoop.mapreduce.InputSplit;
 import org.apache.hadoop.mapreduce.JobContext;
 import org.apache.hadoop.mapreduce.InputFormat;
+import org.apache.hadoop.mapreduce.RecordReader;
 import org.apache.hadoop.mapreduce.lib.input.TextInputFormat;
 import org.apache.hadoop.util.ReflectionUtils;
 
@@ -46,6 +47,20 @@ public abstract class PydoopAvroInputBridgeBase<K, V>
     return actualFormat;
   }
 
+  /**
+   * Return a block passthrough reader if it has been requested via the
+   * AVRO_INPUT_BLOCKS property, else null.  Blocks are read directly
+   * from Avro container files, bypassing the actual input format.
+   */
+  @SuppressWarnings("unchecked")
+  protected RecordReader<K, V> getBlockReader(
+      Configuration conf, Submitter.AvroIO mode) {
+    if (!PydoopAvroBridgeBlockReader.isEnabled(conf)) {
+      return null;
+    }
+    return (RecordReader) new PydoopAvroBridgeBlockReader(mode);
+  }
+
   @Override
   public List<InputSplit> getSplits(JobContext context)
       throws IOException, InterruptedException {
@@ -40,6 +40,11 @@ public class PydoopAvroInputKeyBridge
       InputSplit split, TaskAttemptContext context)
       throws IOException, InterruptedException {
     Configuration conf = context.getConfiguration();
+    RecordReader<Text, NullWritable> blockReader = getBlockReader(
+        conf, Submitter.AvroIO.K);
+    if (blockReader != null) {
+      return blockReader;
+    }
     return new PydoopAvroBridgeKeyReader(
         getActualFormat(conf).createRecordReader(split, context));
   }
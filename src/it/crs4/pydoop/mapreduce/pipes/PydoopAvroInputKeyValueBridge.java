@@ -39,6 +39,11 @@ public class PydoopAvroInputKeyValueBridge
       InputSplit split, TaskAttemptContext context)
       throws IOException, InterruptedException {
     Configuration conf = context.getConfiguration();
+    RecordReader<Text, Text> blockReader = getBlockReader(
+        conf, Submitter.AvroIO.KV);
+    if (blockReader != null) {
+      return blockReader;
+    }
     return new PydoopAvroBridgeKeyValueReader(
         getActualFormat(conf).createRecordReader(split, context));
   }
@@ -40,6 +40,11 @@ public class PydoopAvroInputValueBridge
       InputSplit split, TaskAttemptContext context)
       throws IOException, InterruptedException {
     Configuration conf = context.getConfiguration();
+    RecordReader<NullWritable, Text> blockReader = getBlockReader(
+        conf, Submitter.AvroIO.V);
+    if (blockReader != null) {
+      return blockReader;
+    }
     return new PydoopAvroBridgeValueReader(
         getActualFormat(conf).createRecordReader(split, context));
   }
@@ -409,3 +409,37 @@ PyObject* FileClass_flush(FileInfo *self){
         return NULL;
     }
 }
+
+PyObject* FileClass_hflush(FileInfo *self){
+    int result;
+
+    if (!_ensure_open_for_writing(self))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS;
+        result = hdfsHFlush(self->fs, self->file);
+    Py_END_ALLOW_THREADS;
+    if (result >= 0) {
+        Py_RETURN_NONE;
+    }
+    else {
+        PyErr_SetFromErrno(PyExc_IOError);
+        return NULL;
+    }
+}
+
+PyObject* FileClass_hsync(FileInfo *self){
+    int result;
+
+    if (!_ensure_open_for_writing(self))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS;
+        result = hdfsHSync(self->fs, self->file);
+    Py_END_ALLOW_THREADS;
+    if (result >= 0) {
+        Py_RETURN_NONE;
+    }
+    else {
+        PyErr_SetFromErrno(PyExc_IOError);
+        return NULL;
+    }
+}
@@ -24,6 +24,7 @@
 #include <hdfs.h>
 #include <unicodeobject.h>
 #include <errno.h>
+#include <stdint.h>
 
 #define MAX_WD_BUFFSIZE 2048
 
@@ -60,9 +61,10 @@ int FsClass_init(FsInfo *self, PyObject *args, PyObject *kwds)
 
     // XXX: This call to PyArg_ParseTuple doesn't support non-ASCII characters in
     // the input strings (host, user, group)
-    if (! PyArg_ParseTuple(args, "z|izz",
+    int new_instance = 0;
+    if (! PyArg_ParseTuple(args, "z|izzi",
             &(self->host), &(self->port),
-            &(self->user), &(self->group)))
+            &(self->user), &(self->group), &new_instance))
         return -1;
 
     if (str_empty(self->host))
@@ -77,11 +79,17 @@ int FsClass_init(FsInfo *self, PyObject *args, PyObject *kwds)
     // Connect cycles and retries more than once if necessary.  Better let
     // other Python threads through.
     Py_BEGIN_ALLOW_THREADS;
+        // a new instance bypasses the FileSystem cache on the Java side,
+        // so that closing it does not affect other connections
         if (self->user != NULL) {
-            self->_fs = hdfsConnectAsUser(self->host, self->port, self->user);
-
+            self->_fs = new_instance ?
+                hdfsConnectAsUserNewInstance(self->host, self->port,
+                                             self->user) :
+                hdfsConnectAsUser(self->host, self->port, self->user);
         } else {
-            self->_fs = hdfsConnect(self->host, self->port);
+            self->_fs = new_instance ?
+                hdfsConnectNewInstance(self->host, self->port) :
+                hdfsConnect(self->host, self->port);
         }
     Py_END_ALLOW_THREADS;
 
@@ -514,6 +522,34 @@ static int setPathInfo(PyObject* dict, hdfsFileInfo* fileInfo) {
     return error_code;
 }
 
+// Get info on the entries of a directory, or on the path itself if it's a
+// file.  Must be called without holding the GIL; on error, returns -1 with
+// errno set.  The caller must free *pathList (*numEntries elements)
+static int getListing(hdfsFS fs, const char* path,
+                      hdfsFileInfo** pathList, int* numEntries) {
+
+    hdfsFileInfo* pathInfo = hdfsGetPathInfo(fs, path);
+    *pathList = NULL;
+    *numEntries = 0;
+    if (!pathInfo) return -1;
+    if (pathInfo->mKind == kObjectKindDirectory) {
+        *pathList = hdfsListDirectory(fs, pathInfo->mName, numEntries);
+        int saved_errno = errno;
+        hdfsFreeFileInfo(pathInfo, 1);
+        // hdfsListDirectory returns NULL when a directory is empty, so to
+        // determine whether there's been an error we also need to check errno
+        if (!*pathList && saved_errno) {
+            errno = saved_errno;
+            return -1;
+        }
+    }
+    else {
+        *numEntries = 1;
+        *pathList = pathInfo;
+    }
+    return 0;
+}
+
 PyObject *FsClass_list_directory(FsInfo *self, PyObject *args, PyObject *kwds) {
 
     PyObject* retval = NULL;
@@ -521,7 +557,7 @@ PyObject *FsClass_list_directory(FsInfo *self, PyObject *args, PyObject *kwds) {
 
     hdfsFileInfo* pathList = NULL;
     int numEntries = 0;
-    hdfsFileInfo* pathInfo = NULL;
+    int result;
 
     if (!PyArg_ParseTuple(args, "es", "utf-8",  &path))
         return NULL;
@@ -532,33 +568,14 @@ PyObject *FsClass_list_directory(FsInfo *self, PyObject *args, PyObject *kwds) {
     }
 
     Py_BEGIN_ALLOW_THREADS;
-        pathInfo = hdfsGetPathInfo(self->_fs, path);
-
-        if (!pathInfo) {
-            Py_BLOCK_THREADS; // later we 'goto' skipping over END_ALLOW_THREADS
-            PyErr_SetFromErrno(PyExc_IOError);
-            goto error;
-        }
-
-        if (pathInfo->mKind == kObjectKindDirectory) {
-
-            pathList = hdfsListDirectory(self->_fs, pathInfo->mName, &numEntries);
-
-            // hdfsListDirectory returns NULL when a directory is empty, so to determine
-            // whether there's been an error we also need to check errno
-            if (!pathList && errno) {
-                Py_BLOCK_THREADS; // later we 'goto' skipping over END_ALLOW_THREADS
-                PyErr_SetFromErrno(PyExc_IOError);
-                goto error;
-            }
-        }
-        else {
-            numEntries = 1;
-            pathList = pathInfo;
-            pathInfo = NULL;
-        }
+        result = getListing(self->_fs, path, &pathList, &numEntries);
     Py_END_ALLOW_THREADS;
 
+    if (result < 0) {
+        PyErr_SetFromErrno(PyExc_IOError);
+        goto error;
+    }
+
     retval = PyList_New(numEntries);
     if (!retval) goto mem_error;
 
@@ -587,14 +604,121 @@ error:
 done:
     // all code paths go through the 'done' section
     PyMem_Free((void*)path);
-    if (pathInfo != NULL)
-        hdfsFreeFileInfo(pathInfo, 1);
     if (pathList != NULL)
         hdfsFreeFileInfo(pathList, numEntries);
 
     return retval;
 }
 
+// Return the same string object for equal values (owners and groups are
+// usually shared by all entries)
+static PyObject* getSharedString(PyObject* strings, const char* s) {
+    PyObject* str = PyUnicode_FromString(s);
+    if (!str) return NULL;
+    PyObject* shared = PyDict_GetItem(strings, str);  // borrowed
+    if (shared) {
+        Py_DECREF(str);
+        Py_INCREF(shared);
+        return shared;
+    }
+    if (PyDict_SetItem(strings, str, str) < 0) {
+        Py_DECREF(str);
+        return NULL;
+    }
+    return str;
+}
+
+#define N_INT_COLUMNS 6
+
+PyObject *FsClass_list_directory_compact(FsInfo *self, PyObject *args,
+                                         PyObject *kwds) {
+
+    PyObject* retval = NULL;
+    PyObject* strings = NULL;
+    PyObject *names = NULL, *kinds = NULL, *owners = NULL, *groups = NULL;
+    PyObject* intColumns[N_INT_COLUMNS] = {NULL};
+    const char* path = NULL;
+
+    hdfsFileInfo* pathList = NULL;
+    int numEntries = 0;
+    int result;
+
+    if (!PyArg_ParseTuple(args, "es", "utf-8",  &path))
+        return NULL;
+
+    if (str_empty(path)) {
+        PyErr_SetString(PyExc_ValueError, "Empty path");
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS;
+        result = getListing(self->_fs, path, &pathList, &numEntries);
+    Py_END_ALLOW_THREADS;
+
+    if (result < 0) {
+        PyErr_SetFromErrno(PyExc_IOError);
+        goto done;
+    }
+
+    strings = PyDict_New();
+    names = PyList_New(numEntries);
+    owners = PyList_New(numEntries);
+    groups = PyList_New(numEntries);
+    kinds = PyBytes_FromStringAndSize(NULL, numEntries);
+    for (int j = 0; j < N_INT_COLUMNS; j++) {
+        intColumns[j] = PyBytes_FromStringAndSize(
+            NULL, numEntries * sizeof(int64_t));
+        if (!intColumns[j]) goto done;
+    }
+    if (!strings || !names || !owners || !groups || !kinds) goto done;
+
+    {
+        char* kindBuf = PyBytes_AS_STRING(kinds);
+        int64_t* ints[N_INT_COLUMNS];
+        for (int j = 0; j < N_INT_COLUMNS; j++) {
+            ints[j] = (int64_t*)PyBytes_AS_STRING(intColumns[j]);
+        }
+        for (int i = 0; i < numEntries; i++) {
+            hdfsFileInfo* info = &pathList[i];
+            PyObject* name = PyUnicode_FromString(info->mName);
+            PyObject* owner = getSharedString(strings, info->mOwner);
+            PyObject* group = getSharedString(strings, info->mGroup);
+            // SET_ITEM steals the references: NULLs are cleaned up with
+            // the lists
+            PyList_SET_ITEM(names, i, name);
+            PyList_SET_ITEM(owners, i, owner);
+            PyList_SET_ITEM(groups, i, group);
+            if (!name || !owner || !group) goto done;
+            kindBuf[i] = info->mKind == kObjectKindDirectory;
+            // same order as pydoop.hdfs.listing.Listing.INT_FIELDS
+            ints[0][i] = info->mSize;
+            ints[1][i] = info->mLastMod;
+            ints[2][i] = info->mLastAccess;
+            ints[3][i] = info->mReplication;
+            ints[4][i] = info->mPermissions;
+            ints[5][i] = info->mBlockSize;
+        }
+    }
+
+    retval = Py_BuildValue("(OOOOOOOOOO)", names, kinds, owners, groups,
+                           intColumns[0], intColumns[1], intColumns[2],
+                           intColumns[3], intColumns[4], intColumns[5]);
+
+done:
+    PyMem_Free((void*)path);
+    if (pathList != NULL)
+        hdfsFreeFileInfo(pathList, numEntries);
+    Py_XDECREF(strings);
+    Py_XDECREF(names);
+    Py_XDECREF(kinds);
+    Py_XDECREF(owners);
+    Py_XDECREF(groups);
+    for (int j = 0; j < N_INT_COLUMNS; j++) {
+        Py_XDECREF(intColumns[j]);
+    }
+    return retval;
+}
+
 PyObject *FsClass_move(FsInfo *self, PyObject *args, PyObject *kwds) {
 
     PyObject* retval = NULL;
@@ -76,6 +76,9 @@ PyObject* FsClass_exists(FsInfo* self, PyObject *args, PyObject *kwds);
 
 PyObject*FsClass_list_directory(FsInfo *self, PyObject *args, PyObject *kwds);
 
+PyObject* FsClass_list_directory_compact(FsInfo *self, PyObject *args,
+                                         PyObject *kwds);
+
 PyObject* FsClass_create_directory(FsInfo* self, PyObject *args, PyObject *kwds);
 
 PyObject* FsClass_rename(FsInfo* self, PyObject *args, PyObject *kwds);
@@ -60,6 +60,8 @@ static PyMethodDef FsClass_methods[] = {
    "Create a directory with the given name"},
   {"list_directory", (PyCFunction) FsClass_list_directory, METH_VARARGS,
    "Get the contents of a directory"},
+  {"list_directory_compact", (PyCFunction) FsClass_list_directory_compact,
+   METH_VARARGS, "Get the contents of a directory as columns"},
   {"move", (PyCFunction) FsClass_move, METH_VARARGS, "Move the given file"},
   {"rename", (PyCFunction) FsClass_rename, METH_VARARGS,
    "Rename the given file"},
@@ -129,6 +131,10 @@ static PyMethodDef FileClass_methods[] = {
   {"write", (PyCFunction)FileClass_write, METH_VARARGS, "Write to the file"},
   {"flush", (PyCFunction) FileClass_flush, METH_NOARGS,
    "Force any buffered output to be written"},
+  {"hflush", (PyCFunction) FileClass_hflush, METH_NOARGS,
+   "Flush data to the datanodes, making it visible to new readers"},
+  {"hsync", (PyCFunction) FileClass_hsync, METH_NOARGS,
+   "Like hflush, but also sync data to disk on the datanodes"},
   {"read", (PyCFunction) FileClass_read, METH_VARARGS, "Read from the file"},
   {"read_chunk", (PyCFunction) FileClass_read_chunk, METH_VARARGS,
    "Like read, but store data to the given buffer"},
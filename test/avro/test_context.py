@@ -17,6 +17,8 @@
 # END_COPYRIGHT
 
 import os
+import json
+import zlib
 import unittest
 
 import pydoop
@@ -160,12 +162,168 @@ class TestContext(WDTestCase):
         self.__run_test('V', ValueWrapperMapper, WrapperAvroContext)
 
 
+class CountingDeserializer(object):
+
+    def __init__(self, schema_str):
+        self.deserializer = avrolib.AvroDeserializer(schema_str)
+        self.count = 0
+
+    def deserialize(self, rec_bytes):
+        self.count += 1
+        return self.deserializer.deserialize(rec_bytes)
+
+
+class UpLink(object):
+    """
+    Records OUTPUT commands, ignores everything else.
+    """
+    def __init__(self):
+        self.sent = []
+
+    def __getattr__(self, name):
+        if name.isupper():  # command codes
+            return name
+        raise AttributeError(name)
+
+    def send(self, cmd, *args):
+        if cmd == 'OUTPUT':
+            self.sent.append((cmd,) + args)
+
+    def flush(self):
+        pass
+
+
+class TestContextMethods(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(THIS_DIR, "user.avsc")) as f:
+            self.schema_str = f.read()
+        self.schema = avrolib.parse(self.schema_str)
+        serializer = AvroSerializer(self.schema)
+        self.records = [avro_user_record(_) for _ in range(3)]
+        self.raw = [serializer.serialize(_) for _ in self.records]
+
+    def __conf(self, **kwargs):
+        vals = []
+        for k, v in iteritems(kwargs):
+            vals.extend([pydoop.PROPERTIES[k], v])
+        return vals
+
+    def memo(self):
+        ctx = avrolib.AvroContext(UpLink())
+        ctx.set_job_conf(self.__conf(
+            AVRO_INPUT='V', AVRO_VALUE_INPUT_SCHEMA=self.schema_str
+        ))
+        deserializer = CountingDeserializer(self.schema_str)
+        ctx.get_input_value = ctx.deserializing(
+            lambda: ctx._value, deserializer
+        )
+        for i, (raw, r) in enumerate(zip(self.raw, self.records)):
+            ctx._value = raw
+            for _ in range(3):
+                self.assertEqual(ctx.value, r)
+            self.assertEqual(deserializer.count, i + 1)
+            self.assertTrue(ctx.value is ctx.value)
+
+    def projection(self):
+        projection = json.dumps({
+            "namespace": "example.avro",
+            "type": "record",
+            "name": "User",
+            "fields": [{"name": "name", "type": "string"}],
+        })
+        ctx = avrolib.AvroContext(UpLink())
+        ctx.set_job_conf(self.__conf(
+            AVRO_INPUT='KV',
+            AVRO_KEY_INPUT_SCHEMA=self.schema_str,
+            AVRO_VALUE_INPUT_SCHEMA=self.schema_str,
+            AVRO_VALUE_INPUT_PROJECTION=projection,
+        ))
+        for raw, r in zip(self.raw, self.records):
+            ctx._key = ctx._value = raw
+            self.assertEqual(ctx.key, r)
+            self.assertEqual(ctx.value, {'name': r['name']})
+
+    def emit(self):
+        for mode in 'K', 'V', 'KV':
+            up_link = UpLink()
+            ctx = avrolib.AvroContext(up_link)
+            schema_props = {}
+            if 'K' in mode:
+                schema_props['AVRO_KEY_OUTPUT_SCHEMA'] = self.schema_str
+            if 'V' in mode:
+                schema_props['AVRO_VALUE_OUTPUT_SCHEMA'] = self.schema_str
+            ctx.set_job_conf(self.__conf(AVRO_OUTPUT=mode, **schema_props))
+            ctx.set_is_reducer()
+            r = self.records[0]
+            k = r if 'K' in mode else 'k'
+            v = r if 'V' in mode else 'v'
+            ctx.emit(k, v)
+            self.assertEqual(up_link.sent, [(
+                'OUTPUT',
+                self.raw[0] if 'K' in mode else 'k',
+                self.raw[0] if 'V' in mode else 'v',
+            )])
+            # mapper with reducers: no serialization
+            up_link = UpLink()
+            ctx = avrolib.AvroContext(up_link)
+            conf = self.__conf(AVRO_OUTPUT=mode, **schema_props)
+            ctx.set_job_conf(conf + ['mapreduce.job.reduces', '1'])
+            ctx.set_is_mapper()
+            ctx.emit('k', 'v')
+            self.assertEqual(up_link.sent, [('OUTPUT', 'k', 'v')])
+
+    def blocks(self):
+        pair_schema = json.dumps({
+            "type": "record", "name": "Pair", "fields": [
+                {"name": "key", "type": "string"},
+                {"name": "value", "type": json.loads(self.schema_str)},
+            ],
+        })
+        pair_serializer = AvroSerializer(avrolib.parse(pair_schema))
+        pairs = [{'key': r['name'], 'value': r} for r in self.records]
+        for mode in 'K', 'V', 'KV':
+            if mode == 'KV':
+                data = b''.join(pair_serializer.serialize(_) for _ in pairs)
+                expected = [(_['key'], _['value']) for _ in pairs]
+            else:
+                data = b''.join(self.raw)
+                expected = [
+                    (r, None) if mode == 'K' else (None, r)
+                    for r in self.records
+                ]
+            for codec in 'null', 'deflate':
+                if codec == 'deflate':
+                    c = zlib.compressobj(6, zlib.DEFLATED, -15)
+                    block_data = c.compress(data) + c.flush()
+                else:
+                    block_data = data
+                block = avrolib.pack_block(len(expected), block_data)
+                ctx = avrolib.AvroContext(UpLink())
+                ctx.set_job_conf(self.__conf(
+                    AVRO_INPUT=mode,
+                    AVRO_INPUT_BLOCKS='true',
+                    AVRO_INPUT_BLOCKS_CODEC=codec,
+                    AVRO_INPUT_BLOCKS_SCHEMA=(
+                        pair_schema if mode == 'KV' else self.schema_str
+                    ),
+                ))
+                stream = [('', block), ('', block)]
+                self.assertEqual(
+                    list(ctx.expand_input(stream)), 2 * expected
+                )
+
+
 def suite():
     suite_ = unittest.TestSuite()
     suite_.addTest(TestContext('test_key'))
     suite_.addTest(TestContext('test_value'))
     suite_.addTest(TestContext('test_wrapper_key'))
     suite_.addTest(TestContext('test_wrapper_value'))
+    suite_.addTest(TestContextMethods('memo'))
+    suite_.addTest(TestContextMethods('emit'))
+    suite_.addTest(TestContextMethods('projection'))
+    suite_.addTest(TestContextMethods('blocks'))
     return suite_
 
 
@@ -17,16 +17,23 @@
 # END_COPYRIGHT
 
 import os
+import json
 import unittest
 import itertools as it
 
 import avro.datafile as avdf
 from avro.io import DatumReader, DatumWriter
 
-from pydoop.mapreduce.pipes import InputSplit
+from pydoop.mapreduce.pipes import InputSplit, Factory
 from pydoop.avrolib import (
-    SeekableDataFileReader, AvroReader, AvroWriter, parse
+    SeekableDataFileReader, AvroReader, AvroWriter, AvroBlockReader,
+    BlockDecoder, SYNC_SIZE, AVRO_INPUT, AVRO_INPUT_BLOCKS,
+    AVRO_INPUT_BLOCKS_CODEC, AVRO_INPUT_BLOCKS_SCHEMA, AVRO_INPUT_WORKERS,
+    AVRO_OUTPUT_CODEC, AVRO_OUTPUT_SYNC_INTERVAL, parse
 )
+from pydoop.mapreduce.api import JobConf
+from pydoop.mapreduce.binary_streams import BinaryDownStreamAdapter
+from pydoop.mapreduce.simulator import HadoopSimulatorLocal
 from pydoop.test_utils import WDTestCase
 from pydoop.utils.py3compat import czip, cmap
 import pydoop.hdfs as hdfs
@@ -44,11 +51,14 @@ class TestAvroIO(WDTestCase):
         with open(os.path.join(THIS_DIR, "user.avsc")) as f:
             self.schema = parse(f.read())
 
-    def write_avro_file(self, rec_creator, n_samples, sync_interval):
+    def write_avro_file(self, rec_creator, n_samples, sync_interval,
+                        codec='null'):
         avdf.SYNC_INTERVAL = sync_interval
         self.assertEqual(avdf.SYNC_INTERVAL, sync_interval)
         fo = self._mkf('data.avro', mode='wb')
-        with avdf.DataFileWriter(fo, DatumWriter(), self.schema) as writer:
+        with avdf.DataFileWriter(
+                fo, DatumWriter(), self.schema, codec=codec
+        ) as writer:
             for i in range(n_samples):
                 writer.append(rec_creator(i))
         return fo.name
@@ -115,6 +125,76 @@ class TestAvroIO(WDTestCase):
         highs = [x for x in get_areader(mid_len, file_length)]
         self.assertEqual(N, len(lows) + len(highs))
 
+    def test_avro_reader_workers(self):
+        N = 500
+        fn = self.write_avro_file(avro_user_record, N, 1024, 'deflate')
+        url = hdfs.path.abspath(fn, local=True)
+        file_length = os.stat(fn).st_size
+
+        class FunkyCtx(object):
+            def __init__(self, isplit, job_conf):
+                self.input_split = isplit
+                self.job_conf = job_conf
+
+        mid_len = file_length // 2
+        records = []
+        for offset, length in (0, mid_len), (mid_len, file_length - mid_len):
+            isplit = InputSplit(InputSplit.to_string(url, offset, length))
+            areader = AvroReader(FunkyCtx(isplit, {AVRO_INPUT_WORKERS: '4'}))
+            self.assertEqual(areader.reader.workers, 4)
+            records.extend(r for _, r in areader)
+            areader.close()
+        self.assertEqual(records, [avro_user_record(_) for _ in range(N)])
+
+    def test_block_reader(self):
+        N = 500
+        records = [avro_user_record(_) for _ in range(N)]
+        for codec in 'null', 'deflate':
+            fn = self.write_avro_file(avro_user_record, N, 1024, codec)
+            file_length = os.stat(fn).st_size
+            with open(fn, 'rb') as f:
+                reader = AvroBlockReader(f)
+                self.assertEqual(reader.codec, codec)
+                self.assertEqual(list(reader), records)
+                self.assertEqual(reader.get_progress(), 1.0)
+                offsets = [o for o, _ in AvroBlockReader(f).batches()]
+                self.assertTrue(len(offsets) > 2)
+                syncs = [o - SYNC_SIZE for o in offsets]
+                # split boundaries on, right before and after sync markers
+                for bounds in (
+                    [0, file_length],
+                    [0, syncs[1], syncs[2], file_length],
+                    [0, syncs[1] + 1, syncs[2] - 1, file_length],
+                    list(range(0, file_length, 100)) + [file_length],
+                ):
+                    for bufsize, workers in (20, 1), (1000, 2):
+                        res = []
+                        for start, end in czip(bounds, bounds[1:]):
+                            res.extend(AvroBlockReader(
+                                f, start, end - start, workers=workers,
+                                bufsize=bufsize
+                            ))
+                        self.assertEqual(res, records)
+
+    def test_block_reader_projection(self):
+        N = 100
+        fn = self.write_avro_file(avro_user_record, N, 1024, 'deflate')
+        projection = json.dumps({
+            "namespace": "example.avro",
+            "type": "record",
+            "name": "User",
+            "fields": [
+                {"name": "favorite_color", "type": ["string", "null"]},
+                {"name": "name", "type": "string"},
+            ],
+        })
+        with open(fn, 'rb') as f:
+            reader = AvroBlockReader(f, reader_schema=projection)
+            self.assertEqual(list(reader), [
+                {'name': r['name'], 'favorite_color': r['favorite_color']}
+                for r in map(avro_user_record, range(N))
+            ])
+
     def test_avro_writer(self):
 
         class FunkyCtx(object):
@@ -129,22 +209,66 @@ class TestAvroIO(WDTestCase):
             def emit(self_, key, value):
                 self_.writer.append(key)
 
-        ctx = FunkyCtx({
-            'mapreduce.task.partition': 1,
-            'mapreduce.task.output.dir': hdfs.path.abspath(self.wd, local=True)
-        })
-        awriter = AWriter(ctx)
-        N = 10
-        for i in range(N):
-            awriter.emit(avro_user_record(i), '')
-        awriter.close()
-
+        N = 100
+        records = [avro_user_record(i) for i in range(N)]
+        for codec in 'null', 'deflate', 'bzip2':
+            ctx = FunkyCtx({
+                'mapreduce.task.partition': 1,
+                'mapreduce.task.output.dir': hdfs.path.abspath(
+                    self.wd, local=True
+                ),
+                AVRO_OUTPUT_CODEC: codec,
+                AVRO_OUTPUT_SYNC_INTERVAL: 512,
+            })
+            awriter = AWriter(ctx)
+            for r in records:
+                awriter.emit(r, '')
+            awriter.close()
+            fn = os.path.join(self.wd, 'part-r-00001.avro')
+            with open(fn, 'rb') as f:
+                reader = avdf.DataFileReader(f, DatumReader())
+                self.assertEqual(reader.GetMeta('avro.codec'),
+                                 codec.encode('ascii'))
+                self.assertEqual(list(reader), records)
+            with open(fn, 'rb') as f:
+                blocks = list(AvroBlockReader(f).blocks())
+                self.assertTrue(len(blocks) > 1)
+                for _, _, data in blocks[:-1]:
+                    self.assertTrue(512 <= len(data) < 1024)
+        ctx.job_conf[AVRO_OUTPUT_CODEC] = 'foo'
+        self.assertRaises(ValueError, AWriter, ctx)
+    def test_simulator_blocks(self):
+        N = 100
+        fn = self.write_avro_file(avro_user_record, N, 1024, 'deflate')
+        job_conf = {AVRO_INPUT: 'V', AVRO_INPUT_BLOCKS: 'true'}
+        simulator = HadoopSimulatorLocal(Factory(mapper_class=None))
+        with open(fn, 'rb') as f:
+            down_stream = BinaryDownStreamAdapter(
+                simulator.write_map_down_stream(f, job_conf, 0)
+            )
+            blocks = []
+            for cmd, args in down_stream:
+                if cmd == down_stream.SET_JOB_CONF:
+                    jc = JobConf(args[0])
+                elif cmd == down_stream.MAP_ITEM:
+                    blocks.append(args[1])
+        self.assertTrue(len(blocks) > 1)
+        self.assertEqual(jc[AVRO_INPUT_BLOCKS_CODEC], 'deflate')
+        decoder = BlockDecoder(jc[AVRO_INPUT_BLOCKS_SCHEMA], codec='deflate')
+        self.assertEqual(
+            [r for b in blocks for r in decoder.decode(b)],
+            [avro_user_record(i) for i in range(N)]
+        )
 
 def suite():
     suite_ = unittest.TestSuite()
     suite_.addTest(TestAvroIO('test_seekable'))
     suite_.addTest(TestAvroIO('test_avro_reader'))
+    suite_.addTest(TestAvroIO('test_avro_reader_workers'))
+    suite_.addTest(TestAvroIO('test_block_reader'))
+    suite_.addTest(TestAvroIO('test_block_reader_projection'))
     suite_.addTest(TestAvroIO('test_avro_writer'))
+    suite_.addTest(TestAvroIO('test_simulator_blocks'))
     return suite_
 
 
@@ -21,9 +21,11 @@ Test suite for top-level functions.
 """
 
 import unittest
+import sys
 import os
 import tempfile
 import shutil
+import subprocess
 from imp import reload
 
 import pydoop
@@ -62,12 +64,49 @@ class TestPydoop(unittest.TestCase):
             self.assertEqual(filename, pydoop.jar_name())
             self.assertEqual('pydoop', os.path.basename(directory))
 
+    def test_lazy_hdfs_import(self):
+        # importing pydoop.hdfs must not search for Hadoop jars & co.
+        code = "; ".join([
+            "import sys, os",
+            "import pydoop.hdfs",
+            "print(pydoop.hdfs._INITIALIZED)",
+            "print('xml.dom.minidom' in sys.modules)",
+            "print(os.getenv('CLASSPATH', ''))",
+        ])
+        env = os.environ.copy()
+        env.pop("CLASSPATH", None)
+        out = subprocess.check_output(
+            [sys.executable, "-c", code], env=env, universal_newlines=True
+        )
+        self.assertEqual(out.splitlines(), ["False", "False", ""])
+
+    def test_hdfs_import_footprint(self):
+        # heavy modules must be loaded only by the functions that need them
+        heavy = [
+            "bz2", "lzma", "tempfile", "hashlib", "fcntl",
+            "multiprocessing.pool",
+            "pydoop.hdfs.transfer", "pydoop.hdfs.node_cache",
+            "pydoop.hdfs.blocks", "pydoop.hdfs.globbing",
+            "pydoop.hdfs.compression",
+        ]
+        code = "; ".join([
+            "import sys",
+            "import pydoop.hdfs",
+            "print('\\n'.join(m for m in %r if m in sys.modules))" % heavy,
+        ])
+        out = subprocess.check_output(
+            [sys.executable, "-c", code], universal_newlines=True
+        )
+        self.assertEqual(out.split(), [])
+
 
 def suite():
     suite_ = unittest.TestSuite()
     suite_.addTest(TestPydoop('test_home'))
     suite_.addTest(TestPydoop('test_conf'))
     suite_.addTest(TestPydoop('test_pydoop_jar_path'))
+    suite_.addTest(TestPydoop('test_lazy_hdfs_import'))
+    suite_.addTest(TestPydoop('test_hdfs_import_footprint'))
     return suite_
 
 
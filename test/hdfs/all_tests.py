@@ -18,14 +18,23 @@
 
 import unittest
 from pydoop.test_utils import get_module
+from pydoop.utils.py3compat import _is_py3
 
 
 TEST_MODULE_NAMES = [
     'test_local_fs',
     'test_hdfs_fs',
+    'test_listing',
+    'test_cache',
+    'test_node_cache',
+    'test_pool',
+    'test_compression',
+    'test_blocks',
     'test_path',
     'test_hdfs',
 ]
+if _is_py3:
+    TEST_MODULE_NAMES.append('test_aio')  # async syntax
 
 
 def suite(path=None):
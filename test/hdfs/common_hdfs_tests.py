@@ -31,6 +31,8 @@ except ImportError as e:
 from ctypes import create_string_buffer
 
 import pydoop.hdfs as hdfs
+from pydoop.hdfs.listing import PathInfo
+from pydoop.hdfs.cache import BlockCache
 import pydoop
 import pydoop.test_utils as utils
 from pydoop.utils.py3compat import _is_py3
@@ -329,6 +331,57 @@ class TestCommon(unittest.TestCase):
             self.assertEqual(chunk.value, content[offset: offset + length])
             self.assertEqual(f.tell(), 0)
 
+    def write_buffer(self):
+        path = self._make_random_path()
+        lines = [("line %d\n" % i).encode("ascii") for i in range(1000)]
+        with self.fs.open_file(path, "w", write_buffer_size=1000) as f:
+            for i, line in enumerate(lines):
+                f.write(line)
+                if i == 100:
+                    f.hflush()
+                    self.assertEqual(f.tell(), len(b"".join(lines[:101])))
+            f.hsync()
+            f.write(create_string_buffer(b"foo", 3))
+        with self.fs.open_file(path) as f:
+            self.assertEqual(f.read(), b"".join(lines) + b"foo")
+        text = u"text " + utils.UNI_CHR
+        with self.fs.open_file(path, "wt", write_buffer_size=4,
+                               flush_interval=0.01) as f:
+            for _ in range(10):
+                f.write(text)
+        with self.fs.open_file(path, "rt") as f:
+            self.assertEqual(f.read(), text * 10)
+        if self.fs.host:
+            self.assertRaises(
+                ValueError, self.fs.open_file, path, "r",
+                write_buffer_size=10
+            )
+
+    def block_cache(self):
+        content = os.urandom(10000)
+        path = self._make_random_file(content=content)
+        cache = BlockCache(block_size=1000, max_bytes=4000)
+        with self.fs.open_file(path, block_cache=cache) as f:
+            if self.fs.host:  # ignored for local files
+                self.assertTrue(f.block_cache is cache)
+            for offset, length in (2, 3), (999, 2), (2500, 3000), (9998, 10):
+                self.assertEqual(
+                    f.pread(offset, length), content[offset: offset + length]
+                )
+            chunk = create_string_buffer(1500)
+            self.assertEqual(f.pread_chunk(100, chunk), 1500)
+            self.assertEqual(chunk.raw, content[100: 1600])
+            f.seek(4500)
+            self.assertEqual(f.read(1000), content[4500: 5500])
+            self.assertEqual(f.tell(), 5500)
+            self.assertEqual(f.read(), content[5500:])
+        if self.fs.host:
+            self.assertGreater(cache.hits, 0)
+            self.assertRaises(
+                ValueError, self.fs.open_file, self._make_random_path(), "w",
+                block_cache=cache
+            )
+
     def copy_on_self(self):
         content = utils.make_random_data()
         path = self._make_random_file(content=content)
@@ -372,6 +425,27 @@ class TestCommon(unittest.TestCase):
         )
         self.assertRaises(ValueError, self.fs.list_directory, "")
 
+    def list_directory_compact(self):
+        new_d = self._make_random_dir()
+        self.assertEqual(len(self.fs.list_directory(new_d, compact=True)), 0)
+        for _ in range(3):
+            self._make_random_file(where=new_d)
+        self._make_random_dir(where=new_d)
+        key = operator.itemgetter("name")
+        infos = sorted(self.fs.list_directory(new_d), key=key)
+        listing = self.fs.list_directory(new_d, compact=True)
+        self.assertEqual(len(listing), len(infos))
+        self.assertEqual(sorted(listing, key=key), infos)
+        sizes = sorted(_["size"] for _ in infos)
+        self.assertEqual(sorted(listing.size), sizes)
+        path = self._make_random_file()
+        listing = self.fs.list_directory(path, compact=True)
+        self.assertEqual(list(listing), self.fs.list_directory(path))
+        self.assertRaises(
+            IOError, self.fs.list_directory, self._make_random_path(), True
+        )
+        self.assertRaises(ValueError, self.fs.list_directory, "", True)
+
     def __check_readline(self, get_lines):
         samples = [
             b"foo\nbar\n\ntar",
@@ -517,6 +591,89 @@ class TestCommon(unittest.TestCase):
         for top in '', None:
             self.assertRaises(ValueError, lambda: next(self.fs.walk(top)))
 
+    def walk_options(self):
+        top = self._make_random_dir()
+        names = [top]
+        pruned = None
+        for _ in range(3):
+            d = self._make_random_dir(where=top)
+            names.append(d)
+            for _ in range(2):
+                names.append(self._make_random_file(where=d))
+            sub_d = self._make_random_dir(where=d)
+            names.append(sub_d)
+            names.append(self._make_random_file(where=sub_d))
+            pruned = sub_d
+        names = sorted(self.fs.get_path_info(_)["name"] for _ in names)
+        pruned = self.fs.get_path_info(pruned)["name"]
+        top = self.fs.get_path_info(top)["name"]
+
+        def get_names(infos):
+            return sorted(_["name"] for _ in infos)
+        for workers in 1, 4:
+            for topdown in True, False:
+                infos = list(self.fs.walk(top, workers, topdown=topdown))
+                self.assertEqual(get_names(infos), names)
+                pos = dict((_["name"], i) for i, _ in enumerate(infos))
+                for name, i in pos.items():
+                    parent = name.rsplit("/", 1)[0]
+                    if parent in pos:
+                        self.assertEqual(pos[parent] < i, topdown)
+            infos = list(self.fs.walk(
+                top, workers,
+                prune=lambda info: info["name"] == pruned
+            ))
+            self.assertEqual(get_names(infos), [
+                _ for _ in names if not _.startswith(pruned + "/")
+            ])
+            infos = list(self.fs.walk(top, workers, prune=lambda info: True))
+            self.assertEqual(get_names(infos), [top])
+            walker = self.fs.walk(self._make_random_path(), workers)
+            self.assertRaises(IOError, lambda: next(walker))
+            infos = list(self.fs.walk(top, workers, compact=True))
+            self.assertEqual(get_names(infos), names)
+            self.assertTrue(all(isinstance(_, PathInfo) for _ in infos))
+
+    def metadata_cache(self):
+        self.fs.enable_metadata_cache(ttl=600)
+        try:
+            cache = self.fs.metadata_cache
+            path = self._make_random_file(content=b"foo")
+            info = self.fs.get_path_info(path)
+            hits = cache.hits
+            self.assertEqual(self.fs.get_path_info(path), info)
+            self.assertEqual(cache.hits, hits + 1)
+            with self.fs.open_file(path, "w") as f:
+                f.write(b"foobar")
+            self.assertEqual(self.fs.get_path_info(path)["size"], 6)
+            d = self._make_random_dir()
+            self.assertEqual(len(self.fs.list_directory(d)), 0)
+            new_path = "%s/%s" % (d, "foo")
+            self.assertFalse(self.fs.exists(new_path))
+            self.fs.rename(path, new_path)
+            self.assertTrue(self.fs.exists(new_path))
+            self.assertFalse(self.fs.exists(path))
+            infos = self.fs.list_directory(d)
+            self.assertEqual(len(infos), 1)
+            hits = cache.hits
+            self.assertEqual(self.fs.get_path_info(infos[0]["name"]), infos[0])
+            self.assertEqual(cache.hits, hits + 1)
+            self.fs.chmod(new_path, 0o600)
+            info = self.fs.get_path_info(new_path)
+            self.assertEqual(info["permissions"], 0o600)
+            self.fs.delete(d)
+            self.assertFalse(self.fs.exists(new_path))
+            self.assertRaises(IOError, self.fs.get_path_info, new_path)
+            self.fs.create_directory(new_path)
+            self.assertEqual(
+                self.fs.get_path_info(new_path)["kind"], "directory"
+            )
+            self.fs.invalidate_metadata()
+            self.assertEqual(len(cache), 0)
+        finally:
+            self.fs.disable_metadata_cache()
+        self.assertTrue(self.fs.metadata_cache is None)
+
     def exists(self):
         self.assertFalse(self.fs.exists('some_file'))
         self.assertFalse(self.fs.exists('some_file/other_file'))
@@ -569,18 +726,23 @@ def common_tests():
         'tell',
         'pread',
         'pread_chunk',
+        'block_cache',
+        'write_buffer',
         'rename',
         'change_dir',
         'copy_on_self',
         'available',
         'get_path_info',
         'list_directory',
+        'list_directory_compact',
         'readline',
         'readline_big',
         'iter_lines',
         'seek',
         'block_boundary',
         'walk',
+        'walk_options',
+        'metadata_cache',
         'exists',
         'text_io',
     ]
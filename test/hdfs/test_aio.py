@@ -0,0 +1,137 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+import tempfile
+import shutil
+import asyncio
+import os
+
+from pydoop.hdfs.aio import AsyncHdfs
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestAsyncHdfs(unittest.TestCase):
+
+    def setUp(self):
+        self.wd = tempfile.mkdtemp(prefix="pydoop_test_")
+        self.lines = [b"line %d\n" % i for i in range(10000)]
+        self.data = b"".join(self.lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.wd)
+
+    def test_files(self):
+        path = os.path.join(self.wd, "f")
+
+        async def main():
+            async with AsyncHdfs(max_workers=4) as client:
+                await client.write(path, self.data)
+                info = await client.get_path_info(path)
+                self.assertEqual(info["size"], len(self.data))
+                self.assertEqual(await client.read(path), self.data)
+                results = await asyncio.gather(*(
+                    client.pread(path, i * 10, 5) for i in range(20)
+                ))
+                self.assertEqual(
+                    results, [self.data[i * 10: i * 10 + 5] for i in range(20)]
+                )
+                f = await client.open(path)
+                async with f:
+                    self.assertEqual(await f.readline(), self.lines[0])
+                    self.assertEqual(await f.read(3), self.lines[1][:3])
+                    self.assertEqual(await f.tell(), len(self.lines[0]) + 3)
+                    await f.seek(0)
+                    lines = [_ async for _ in f]
+                    self.assertEqual(lines, self.lines)
+                self.assertTrue(f.closed)
+                async with await client.open(path, "w") as f:
+                    await f.write(b"new data")
+                self.assertEqual(await client.read(path), b"new data")
+                copy = os.path.join(self.wd, "copy")
+                await client.cp(path, copy)
+                self.assertEqual(await client.read(copy), b"new data")
+            self.assertTrue(client.closed)
+            with self.assertRaises(ValueError):
+                await client.read(path)
+
+        run(main())
+
+    def test_walk(self):
+        expected = set([self.wd])
+        for d in "a", "b", os.path.join("a", "c"):
+            expected.add(os.path.join(self.wd, d))
+            os.mkdir(os.path.join(self.wd, d))
+            p = os.path.join(self.wd, d, "f")
+            with open(p, "wb"):
+                pass
+            expected.add(p)
+
+        async def main():
+            async with AsyncHdfs(max_workers=4) as client:
+                infos = [_ async for _ in client.walk(self.wd)]
+                names = [_["name"].split(":", 1)[-1] for _ in infos]
+                self.assertEqual(names[0], self.wd)
+                self.assertEqual(set(names), expected)
+                self.assertEqual(len(names), len(expected))
+                ls = await client.list_directory(self.wd)
+                self.assertEqual(len(ls), 2)
+
+        run(main())
+
+    def test_walk_bounded(self):
+        expected = set([self.wd])
+        for i in range(50):
+            d = os.path.join(self.wd, "d%d" % i)
+            for p in d, os.path.join(d, "sub"):
+                os.mkdir(p)
+                expected.add(p)
+
+        async def main():
+            async with AsyncHdfs(max_workers=2) as client:
+                queued, names = [], []
+                async for info in client.walk(self.wd):
+                    queued.append(client.executor._work_queue.qsize())
+                    names.append(info["name"].split(":", 1)[-1])
+                self.assertEqual(set(names), expected)
+                self.assertEqual(len(names), len(expected))
+                for i, n in enumerate(names):
+                    self.assertTrue(os.path.dirname(n) in names[:i] or i == 0)
+                self.assertTrue(max(queued) <= 2)
+
+        run(main())
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestAsyncHdfs('test_files'))
+    suite_.addTest(TestAsyncHdfs('test_walk'))
+    suite_.addTest(TestAsyncHdfs('test_walk_bounded'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
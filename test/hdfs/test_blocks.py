@@ -0,0 +1,66 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+
+from pydoop.hdfs.blocks import BlockLocations, Block
+
+
+class TestBlockLocations(unittest.TestCase):
+
+    def setUp(self):
+        self.loc = BlockLocations()
+        self.loc.add_file("/a", 250, 100, [["h1", "h2"], ["h2"], ["h3"]])
+        self.loc.add_file("/b", 50, 100, [["h2", "h3"]])
+        self.loc.add_file("/c", 0, 100, [])
+
+    def test_table(self):
+        loc = self.loc
+        self.assertEqual(len(loc), 4)
+        self.assertEqual(loc.paths, ["/a", "/b"])
+        self.assertEqual(list(loc.offset), [0, 100, 200, 0])
+        self.assertEqual(list(loc.length), [100, 100, 50, 50])
+        self.assertEqual(loc[2], Block("/a", 200, 50, ("h3",)))
+        self.assertEqual(list(loc)[3], Block("/b", 0, 50, ("h2", "h3")))
+        self.assertEqual(loc.all_hosts(), ["h1", "h2", "h3"])
+        # one location for a whole multi-block file
+        loc.add_file("/d", 250, 100, [["h1"]])
+        self.assertEqual(loc[4], Block("/d", 0, 250, ("h1",)))
+
+    def test_grouping(self):
+        groups = self.loc.by_host()
+        self.assertEqual(sorted(groups), ["h1", "h2", "h3"])
+        self.assertEqual(groups["h1"], [Block("/a", 0, 100, ("h1", "h2"))])
+        self.assertEqual([(b.path, b.offset) for b in groups["h2"]],
+                         [("/a", 0), ("/a", 100), ("/b", 0)])
+        files = self.loc.files_by_host()
+        self.assertEqual(files["h1"], [("/a", 100)])
+        self.assertEqual(files["h2"], [("/a", 200), ("/b", 50)])
+        self.assertEqual(files["h3"], [("/a", 50), ("/b", 50)])  # ties
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestBlockLocations('test_table'))
+    suite_.addTest(TestBlockLocations('test_grouping'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
@@ -0,0 +1,133 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+import time
+
+from pydoop.hdfs.cache import MetadataCache, BlockCache, MISSING
+
+
+def info(kind="file"):
+    return {"kind": kind}
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def test_get_put(self):
+        cache = MetadataCache()
+        self.assertTrue(cache.get("/a") is None)
+        cache.put("/a", info())
+        self.assertEqual(cache.get("/a"), info())
+        cache.put("/b", MISSING)
+        self.assertTrue(cache.get("/b") is MISSING)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertRaises(ValueError, MetadataCache, ttl=0)
+        self.assertRaises(ValueError, MetadataCache, max_size=0)
+
+    def test_ttl(self):
+        cache = MetadataCache(ttl=0.05)
+        cache.put("/a", info())
+        time.sleep(0.1)
+        self.assertTrue(cache.get("/a") is None)
+
+    def test_lru(self):
+        cache = MetadataCache(max_size=2)
+        cache.put("/a", info())
+        cache.put("/b", info())
+        cache.get("/a")
+        cache.put("/c", info())
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.get("/b") is None)
+        self.assertEqual(cache.get("/a"), info())
+
+    def test_invalidate(self):
+        cache = MetadataCache()
+        keys = ["/", "/a", "/a/b", "/a/b/c", "/a/bc", "/a/b/c/d", "/x"]
+        for k in keys:
+            cache.put(k, info("directory"))
+        cache.invalidate("/a/b")
+        for k in "/", "/a", "/a/b", "/a/b/c", "/a/b/c/d":
+            self.assertTrue(cache.get(k) is None, k)
+        for k in "/a/bc", "/x":
+            self.assertEqual(cache.get(k), info("directory"))
+        cache.put("/x/f", info())
+        cache.put("/x/f.crc", info())
+        cache.invalidate("/x/f")
+        self.assertEqual(cache.get("/x/f.crc"), info())
+        self.assertTrue(cache.get("/x") is None)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestBlockCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data = bytes(bytearray(range(256))) * 4
+        self.fetched = []
+
+    def fetch(self, offset, length):
+        self.fetched.append(offset)
+        return self.data[offset: offset + length]
+
+    def test_read(self):
+        cache = BlockCache(block_size=100, max_bytes=1000)
+        for position, length in (0, 10), (95, 10), (150, 300), (1000, 50):
+            self.assertEqual(
+                cache.read("f", self.fetch, position, length),
+                self.data[position: position + length]
+            )
+        self.assertEqual(self.fetched, [0, 100, 200, 300, 400, 1000])
+        self.assertEqual(cache.read("f", self.fetch, 10, 0), b"")
+        self.assertEqual(cache.read("f", self.fetch, 120, 200),
+                         self.data[120: 320])
+        self.assertEqual(len(self.fetched), 6)
+        self.assertEqual(cache.nbytes, 524)
+        self.assertEqual(cache.read("g", self.fetch, 0, 1), self.data[:1])
+        self.assertEqual(len(self.fetched), 7)
+        self.assertRaises(ValueError, BlockCache, block_size=0)
+        self.assertRaises(ValueError, BlockCache, 100, max_bytes=10)
+
+    def test_lru(self):
+        cache = BlockCache(block_size=100, max_bytes=200)
+        cache.read("f", self.fetch, 0, 200)
+        cache.read("f", self.fetch, 0, 1)
+        cache.read("f", self.fetch, 200, 1)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 200)
+        self.assertTrue(cache.get("f", 1) is None)
+        self.assertEqual(cache.get("f", 0), self.data[:100])
+        hits, misses = cache.hits, cache.misses
+        self.assertEqual((hits, misses), (2, 4))
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes, cache.hits), (0, 0, 0))
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestMetadataCache('test_get_put'))
+    suite_.addTest(TestMetadataCache('test_ttl'))
+    suite_.addTest(TestMetadataCache('test_lru'))
+    suite_.addTest(TestMetadataCache('test_invalidate'))
+    suite_.addTest(TestBlockCache('test_read'))
+    suite_.addTest(TestBlockCache('test_lru'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
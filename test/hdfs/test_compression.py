@@ -0,0 +1,126 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+import tempfile
+import shutil
+import gzip
+import bz2
+import os
+
+import pydoop.hdfs as hdfs
+from pydoop.hdfs import compression
+from pydoop.utils.py3compat import _is_py3
+
+CODECS = ["gzip", "bz2"] + (["xz"] if compression.lzma else [])
+COMPRESS = {"gzip": gzip.compress, "bz2": bz2.compress} if _is_py3 else {}
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.wd = tempfile.mkdtemp(prefix="pydoop_test_")
+        self.lines = [("line %d\n" % i).encode("ascii") for i in range(10000)]
+        self.data = b"".join(self.lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.wd)
+
+    def test_infer(self):
+        self.assertEqual(compression.infer("/a/b.gz"), "gzip")
+        self.assertEqual(compression.infer("a.tar.BZ2"), "bz2")
+        self.assertEqual(compression.infer("hdfs://h:1/a.xz"), "xz")
+        self.assertTrue(compression.infer("a.txt") is None)
+        self.assertRaises(ValueError, compression.check, "zip")
+
+    def test_round_trip(self):
+        for codec in CODECS:
+            path = os.path.join(self.wd, "f")
+            with hdfs.open(path, "w", compression=codec) as f:
+                for line in self.lines:
+                    f.write(line)
+            f.fs.close()
+            with hdfs.open(path, compression=codec) as f:
+                self.assertEqual(f.readline(), self.lines[0])
+                self.assertEqual(list(f), self.lines[1:])
+            f.fs.close()
+            with hdfs.open(path) as f:
+                self.assertNotEqual(f.read(), self.data)
+            f.fs.close()
+
+    def test_infer_open(self):
+        gz_path = os.path.join(self.wd, "f.gz")
+        with hdfs.open(gz_path, "wt", compression="infer") as f:
+            f.write(u"text\n")
+        with gzip.open(gz_path) as f:
+            self.assertEqual(f.read(), b"text\n")
+        with hdfs.open(gz_path, "rt", compression="infer") as f:
+            self.assertEqual(f.read(), u"text\n")
+        plain = os.path.join(self.wd, "f.txt")
+        hdfs.dump(self.data, plain)
+        with hdfs.open(plain, compression="infer") as f:
+            self.assertEqual(f.read(), self.data)
+        f.fs.close()
+        self.assertRaises(ValueError, hdfs.open, plain, compression="zip")
+
+    def test_truncated(self):
+        if not _is_py3:
+            return
+        path = os.path.join(self.wd, "f.gz")
+        with hdfs.open(path, "w", compression="infer") as f:
+            f.write(os.urandom(100000))
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:-100])
+        with hdfs.open(path, compression="infer") as f:
+            self.assertRaises(IOError, f.read)
+
+    def test_multi_member(self):
+        if not _is_py3:
+            return
+        chunks = [self.data[i: i + 5000]
+                  for i in range(0, len(self.data), 5000)]
+        for codec, comp in COMPRESS.items():
+            path = os.path.join(self.wd, "f")
+            with open(path, "wb") as f:
+                for c in chunks:
+                    f.write(comp(c))
+            for workers in 1, 4:
+                f = hdfs.open(path, compression=codec,
+                              compression_workers=workers)
+                # small bufsize, so that members cross window boundaries
+                f.raw.bufsize = 3000
+                with f:
+                    self.assertEqual(f.read(), self.data)
+                f.fs.close()
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestCompression('test_infer'))
+    suite_.addTest(TestCompression('test_round_trip'))
+    suite_.addTest(TestCompression('test_infer_open'))
+    suite_.addTest(TestCompression('test_truncated'))
+    suite_.addTest(TestCompression('test_multi_member'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
@@ -22,11 +22,13 @@ import unittest
 import tempfile
 import os
 import stat
+import time
 from pydoop.utils.py3compat import czip
 from threading import Thread
 
 import pydoop.hdfs as hdfs
-from pydoop.hdfs.common import BUFSIZE
+from pydoop.hdfs.common import BUFSIZE, DEFAULT_USER
+from pydoop.hdfs.globbing import expand_braces
 from pydoop.test_utils import UNI_CHR, make_random_data, FSTree
 
 
@@ -101,6 +103,11 @@ class TestHDFS(unittest.TestCase):
     def ls(self):
         self.__ls(hdfs.ls, lambda x: x)
 
+    def iter_lsl(self):
+        def ls_func(p, recursive=False):
+            return list(hdfs.iter_lsl(p, recursive=recursive, workers=2))
+        self.__ls(ls_func, lambda x: x["name"])
+
     def mkdir(self):
         for wd in self.local_wd, self.hdfs_wd:
             d1 = "%s/d1" % wd
@@ -115,6 +122,131 @@ class TestHDFS(unittest.TestCase):
             hdfs.dump(self.data, test_path, mode="wb")
             rdata = hdfs.load(test_path)
             self.assertEqual(rdata, self.data)
+            text = u"a string\nwith \u00e0 non-ascii char\n"
+            hdfs.dump(text, test_path)
+            self.assertEqual(hdfs.load(test_path, mode="rt"), text)
+            big = os.urandom(3 * BUFSIZE + 1)
+            hdfs.dump(big, test_path)
+            rdata = hdfs.load(test_path)
+            self.assertTrue(isinstance(rdata, bytes))
+            self.assertEqual(rdata, big)
+            hdfs.dump(b"", test_path)
+            self.assertEqual(hdfs.load(test_path), b"")
+            # options supported only by open
+            gz_path = "%s.gz" % test_path
+            hdfs.dump(big, gz_path, compression="infer")
+            self.assertNotEqual(hdfs.load(gz_path), big)
+            self.assertEqual(hdfs.load(gz_path, compression="infer"), big)
+            hdfs.dump(text, gz_path, compression="gzip")
+            self.assertEqual(
+                hdfs.load(gz_path, mode="rt", compression="gzip"), text
+            )
+            self.assertEqual(hdfs.load(test_path, cache="node"), b"")
+
+    def block_locations(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            t = self.__make_tree(wd)
+            paths = [_.name for _ in t.walk() if _.kind == 0]
+            loc = hdfs.block_locations([wd], workers=2)
+            self.assertEqual(sorted(loc.paths), sorted(
+                hdfs.stat(_).name for _ in paths
+            ))
+            self.assertEqual(sum(loc.length), len(self.data) * len(paths))
+            self.assertEqual(len(loc.files_by_host()), len(loc.all_hosts()))
+            infos = hdfs.lsl(wd, recursive=True)
+            loc2 = hdfs.block_locations(infos)
+            self.assertEqual(sorted(loc2.paths), sorted(loc.paths))
+            loc3 = hdfs.block_locations(paths[:1])
+            self.assertEqual(len(loc3.paths), 1)
+
+    def glob(self):
+        self.assertEqual(
+            expand_braces("a{b,c{d,e}}f{,g"),
+            ["abf{,g", "acdf{,g", "acef{,g"]
+        )
+        for wd in self.hdfs_wd, self.local_wd:
+            self.__make_tree(wd)
+            hdfs.dump(self.data, "%s/d1/d2/f3.txt" % wd, mode="wb")
+            names = dict(
+                (_["name"].rsplit("/", 1)[-1], _["name"])
+                for _ in hdfs.lsl(wd, recursive=True)
+            )
+            for pattern, expected in (
+                ("d1/*", ["d2", "f1"]),
+                ("d1/?2", ["d2"]),
+                ("d1/[ef]1", ["f1"]),
+                ("*/{f1,d2/f2}", ["f1", "f2"]),
+                ("d1/**", ["d1", "d2", "f1", "f2", "f3.txt"]),
+                ("**/f?", ["f1", "f2"]),
+                ("d1/**/*.txt", ["f3.txt"]),
+                ("d1/d2/f2", ["f2"]),
+                ("d1/f1/*", []),
+                ("*/f1/*", []),  # file in a non-final position
+                ("*/f1/**", []),
+                ("*/f1/f?/*", []),
+                ("d*/none", []),
+                ("none/*", []),
+            ):
+                expected = sorted(names[_] for _ in expected)
+                for workers in 1, 4:
+                    matches = hdfs.glob("%s/%s" % (wd, pattern),
+                                        workers=workers)
+                    self.assertEqual(matches, expected)
+                it = hdfs.iglob("%s/%s" % (wd, pattern))
+                self.assertEqual(sorted(it), expected)
+
+    def du(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            self.__make_tree(wd)
+            hdfs.dump(self.data[:10], "%s/d1/d2/f3" % wd, mode="wb")
+            d1, n = hdfs.stat("%s/d1" % wd).name, len(self.data)
+            d2 = "%s/d2" % d1
+            for workers in 1, 4:
+                s = hdfs.content_summary(d1, workers=workers)
+                self.assertEqual(
+                    (s.length, s.file_count, s.directory_count),
+                    (2 * n + 10, 3, 2)
+                )
+                self.assertTrue(s.space_consumed >= s.length)
+                totals = hdfs.du(d1, workers=workers)
+                self.assertEqual(list(totals), [d1])
+                self.assertEqual(totals[d1], s)
+                totals = hdfs.du(d1, depth=1, workers=workers)
+                self.assertEqual(
+                    sorted(totals), sorted([d1, d2, "%s/f1" % d1])
+                )
+                self.assertEqual(totals[d1], s)
+                self.assertEqual(totals[d2].length, n + 10)
+                self.assertEqual(totals[d2].directory_count, 1)
+                self.assertEqual(totals["%s/f1" % d1].file_count, 1)
+                self.assertEqual(len(hdfs.du(d1, depth=5)), 5)
+            s = hdfs.content_summary("%s/f1" % d1)
+            self.assertEqual((s.length, s.file_count), (n, 1))
+            self.assertRaises(IOError, hdfs.du, "%s/none" % wd)
+            self.assertRaises(ValueError, hdfs.du, d1, depth=-1)
+
+    def load_many(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            paths = ["%s/side_%d" % (wd, i) for i in range(10)]
+            contents = [self.data * i for i in range(10)]
+            hdfs.dump_many(czip(paths, contents), workers=4)
+            self.assertEqual(hdfs.load_many(paths, workers=4), contents)
+            self.assertEqual(hdfs.load_many(paths[:3]), contents[:3])
+            hdfs.dump_many({paths[0]: u"text"})
+            self.assertEqual(
+                hdfs.load_many(paths[:1], mode="rt"), [u"text"]
+            )
+            self.assertRaises(
+                IOError, hdfs.load_many, [paths[0], "%s/none" % wd],
+                workers=2
+            )
+            gz_paths = ["%s.gz" % _ for _ in paths[:3]]
+            hdfs.dump_many(czip(gz_paths, contents[:3]), workers=2,
+                           compression="infer")
+            self.assertEqual(hdfs.load_many(
+                gz_paths, workers=2, compression="infer"
+            ), contents[:3])
+            self.assertRaises(ValueError, hdfs.load_many, paths, mode="w")
 
     def __make_tree(self, wd, root="d1", create=True):
         """
@@ -190,6 +322,67 @@ class TestHDFS(unittest.TestCase):
             self.__cp_dir(wd)
             self.__cp_recursive(wd)
 
+    def cp_parallel(self):
+        for wd in self.local_wd, self.hdfs_wd:
+            src_t = self.__make_tree(wd)
+            big = "%s/big" % src_t.name
+            hdfs.dump(self.data, big, mode="wb")
+            for dest_wd in self.local_wd, self.hdfs_wd:
+                dest = "%s/%s_copy" % (dest_wd, hdfs.path.basename(wd))
+                updates = []
+                stats = hdfs.cp(src_t.name, dest, workers=3,
+                                progress=lambda s: updates.append(s.bytes),
+                                split_size=BUFSIZE)
+                self.assertEqual(stats.files, 3)
+                self.assertEqual(stats.bytes, 3 * len(self.data))
+                self.assertEqual(stats.bytes, stats.total_bytes)
+                self.assertEqual(updates[-1], stats.bytes)
+                self.assertEqual(updates, sorted(updates))
+                for bn in "f1", "d2/f2", "big":
+                    self.assertEqual(
+                        hdfs.load("%s/%s" % (dest, bn)), self.data
+                    )
+                hdfs.rmr(dest)
+            hdfs.rmr(src_t.name)
+
+    def sync(self):
+        src_t = self.__make_tree(self.local_wd)
+        src = src_t.name
+        f1, f2 = "%s/f1" % src, "%s/d2/f2" % src
+        dest = "%s/synced" % self.hdfs_wd
+        stats = hdfs.sync(src, dest, workers=2, user=DEFAULT_USER)
+        self.assertEqual((stats.files, stats.skipped), (2, 0))
+        for p in f1, f2:
+            copy = dest + p[len(src):]
+            self.assertEqual(hdfs.load(copy), self.data)
+            self.assertEqual(int(hdfs.path.getmtime(copy)),
+                             int(hdfs.path.getmtime(p)))
+        stats = hdfs.sync(src, dest)
+        self.assertEqual((stats.files, stats.skipped), (0, 2))
+        # same size, different contents and mtime
+        new_data = self.data[::-1]
+        hdfs.dump(new_data, f1, mode="wb")
+        mtime = int(hdfs.path.getmtime(f1))
+        hdfs.path.utime(f1, (mtime + 10, mtime + 10))
+        stats = hdfs.sync(src, dest, checksum=True, workers=2,
+                          checksum_block_size=BUFSIZE)
+        self.assertEqual((stats.files, stats.skipped), (1, 1))
+        self.assertEqual(hdfs.load("%s/f1" % dest), new_data)
+        # same contents, different mtime
+        hdfs.path.utime(f2, (mtime + 20, mtime + 20))
+        stats = hdfs.sync(src, dest, checksum=True)
+        self.assertEqual((stats.files, stats.skipped), (0, 2))
+        self.assertEqual(
+            int(hdfs.path.getmtime("%s/d2/f2" % dest)), mtime + 20
+        )
+        extra = "%s/d2/extra" % dest
+        hdfs.dump(self.data, extra, mode="wb")
+        hdfs.sync(src, dest)
+        self.assertTrue(hdfs.path.exists(extra))
+        stats = hdfs.sync(src, dest, delete=True)
+        self.assertEqual((stats.files, stats.deleted), (0, 1))
+        self.assertFalse(hdfs.path.exists(extra))
+
     def put(self):
         src = hdfs.path.split(self.local_paths[0])[-1]
         dest = self.hdfs_paths[0]
@@ -221,6 +414,89 @@ class TestHDFS(unittest.TestCase):
             s = os.stat(f.name)
             self.assertEqual(444, stat.S_IMODE(s.st_mode))
 
+    def recursive_mutations(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            t = self.__make_tree(wd)
+            names = [hdfs.stat(_.name).name for _ in t.walk()]
+            files = [hdfs.stat(_.name).name for _ in t.walk() if _.kind == 0]
+            for workers in 1, 4:
+                mode = 0o750 if workers == 1 else 0o700
+                self.assertEqual(hdfs.chmod(
+                    t.name, mode, recursive=True, workers=workers
+                ), {})
+                for n in names:
+                    self.assertEqual(hdfs.stat(n).st_mode & 0o777, mode)
+                times = (1e9, 1e9 + workers)
+                self.assertEqual(hdfs.utime(
+                    t.name, times, recursive=True, workers=workers
+                ), {})
+                for n in names:
+                    self.assertEqual(hdfs.stat(n).st_mtime, times[1])
+                self.assertEqual(hdfs.set_replication(
+                    t.name, 1, recursive=True, workers=workers
+                ), {})
+                for f in files:
+                    self.assertEqual(hdfs.stat(f).replication, 1)
+                owner = hdfs.lsl(files[0])[0]["owner"]
+                self.assertEqual(hdfs.chown(
+                    t.name, user=owner, recursive=True, workers=workers
+                ), {})
+            self.assertRaises(IOError, hdfs.chmod, "%s/none" % wd, 0o700,
+                              recursive=True)
+        # unknown local owner: every path fails, none aborts the walk
+        t = self.__make_tree(self.local_wd)
+        names = [hdfs.stat(_.name).name for _ in t.walk()]
+        for workers in 1, 4:
+            failed = hdfs.chown(
+                t.name, user="pydoop_no_such_user", recursive=True,
+                workers=workers
+            )
+            self.assertEqual(sorted(failed), sorted(names))
+            for e in failed.values():
+                self.assertTrue(isinstance(e, IOError))
+
+    def recursive_order(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            t = self.__make_tree(wd)
+            sub = "%s/d2/d3" % t.name
+            hdfs.dump(self.data, "%s/f3" % sub, mode="wb")
+            done = []
+
+            def record(fs, p):
+                # the deeper, the slower: concurrent parents finish first
+                time.sleep(0.01 * p.count("/"))
+                done.append(p)
+            self.assertEqual(hdfs._mutate_tree(t.name, None, 4, record), {})
+            self.assertEqual(len(done), 6)
+            for i, p in enumerate(done):
+                for q in done[i + 1:]:
+                    self.assertFalse(q.startswith(p.rstrip("/") + "/"))
+            # no exec permission on directories: children must go first
+            names = [hdfs.stat(_.name).name for _ in t.walk()]
+            self.assertEqual(hdfs.chmod(
+                t.name, 0o600, recursive=True, workers=4
+            ), {})
+            self.assertEqual(hdfs.stat(t.name).st_mode & 0o777, 0o600)
+            for n in names:  # top-down
+                hdfs.chmod(n, 0o700)
+
+    def delete_many(self):
+        for wd in self.hdfs_wd, self.local_wd:
+            t = self.__make_tree(wd)
+            paths = ["%s/side_%d" % (wd, i) for i in range(10)]
+            hdfs.dump_many(czip(paths, [self.data] * len(paths)))
+            missing = "%s/none" % wd
+            failed = hdfs.delete_many(paths + [missing, t.name], workers=4)
+            self.assertEqual(list(failed), [missing])
+            self.assertTrue(isinstance(failed[missing], IOError))
+            for p in paths + [t.name]:
+                self.assertFalse(hdfs.path.exists(p))
+            d = "%s/d" % wd
+            hdfs.dump(self.data, "%s/f" % d, mode="wb")
+            failed = hdfs.delete_many([d], recursive=False)
+            self.assertEqual(list(failed), [d])
+            self.assertTrue(hdfs.path.exists(d))
+
     def move(self):
         for wd in self.local_wd, self.hdfs_wd:
             t1 = self.__make_tree(wd)
@@ -373,13 +649,23 @@ def suite():
     suite_.addTest(TestHDFS("dump"))
     suite_.addTest(TestHDFS("lsl"))
     suite_.addTest(TestHDFS("ls"))
+    suite_.addTest(TestHDFS("glob"))
+    suite_.addTest(TestHDFS("du"))
+    suite_.addTest(TestHDFS("iter_lsl"))
     suite_.addTest(TestHDFS("mkdir"))
     suite_.addTest(TestHDFS("load"))
+    suite_.addTest(TestHDFS("load_many"))
+    suite_.addTest(TestHDFS("block_locations"))
     suite_.addTest(TestHDFS("cp"))
+    suite_.addTest(TestHDFS("cp_parallel"))
+    suite_.addTest(TestHDFS("sync"))
     suite_.addTest(TestHDFS("put"))
     suite_.addTest(TestHDFS("get"))
     suite_.addTest(TestHDFS("rmr"))
     suite_.addTest(TestHDFS("chmod"))
+    suite_.addTest(TestHDFS("recursive_mutations"))
+    suite_.addTest(TestHDFS("recursive_order"))
+    suite_.addTest(TestHDFS("delete_many"))
     suite_.addTest(TestHDFS("move"))
     suite_.addTest(TestHDFS("chown"))
     suite_.addTest(TestHDFS("rename"))
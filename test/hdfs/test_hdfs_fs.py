@@ -19,6 +19,7 @@
 import unittest
 import getpass
 import socket
+import threading
 from itertools import product
 
 import pydoop.hdfs as hdfs
@@ -60,11 +61,78 @@ class TestConnection(unittest.TestCase):
                 with hdfs.hdfs(h2, p2) as fs2:
                     print(' * %r vs %r' % ((h1, p1), (h2, p2)))
                     self.assertTrue(fs2.fs is fs1.fs)
-                for fs in fs1, fs2:
-                    self.assertFalse(fs.closed)
+                self.assertFalse(fs1.closed)
+                self.assertTrue(fs2.closed)
             for fs in fs1, fs2:
                 self.assertTrue(fs.closed)
 
+    def double_close(self):
+        fs1 = hdfs.hdfs("default", 0)
+        fs2 = hdfs.hdfs("default", 0)
+        refcount = fs1.refcount
+        fs2.close()
+        fs2.close()
+        self.assertEqual(fs1.refcount, refcount - 1)
+        self.assertFalse(fs1.closed)
+        fs1.close()
+
+    def close_shared(self):
+        with hdfs.hdfs("default", 0) as fs1:
+            fs2 = hdfs.hdfs("default", 0)
+            self.assertTrue(fs2.fs is fs1.fs)
+            fs2.close()
+            self.assertTrue(fs2.closed)
+            self.assertFalse(fs1.closed)
+            self.assertRaises(ValueError, fs2.get_path_info, "/")
+            self.assertRaises(ValueError, fs2.list_directory, "/")
+            fs1.get_path_info("/")
+
+    def concurrent(self):
+        n_threads, n_iter = 8, 50
+        errors = []
+        with hdfs.hdfs("default", 0) as fs:
+            refcount = fs.refcount
+
+            def run():
+                try:
+                    for _ in range(n_iter):
+                        with hdfs.hdfs("default", 0) as t_fs:
+                            if t_fs.fs is not fs.fs:
+                                raise AssertionError("handle not shared")
+                            t_fs.get_path_info("/")
+                except Exception as e:
+                    errors.append(e)
+            threads = [threading.Thread(target=run) for _ in range(n_threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(fs.refcount, refcount)
+            self.assertFalse(fs.closed)
+
+    def per_thread(self):
+        results = {}
+
+        def run(name):
+            with hdfs.hdfs("default", 0, per_thread=True) as fs1:
+                with hdfs.hdfs("default", 0, per_thread=True) as fs2:
+                    results[name] = (fs1.fs, fs2.fs is fs1.fs)
+        with hdfs.hdfs("default", 0) as fs:
+            threads = [threading.Thread(target=run, args=(i,))
+                       for i in range(2)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertFalse(fs.closed)
+            core_fs = set()
+            for name, (t_fs, shared) in results.items():
+                self.assertTrue(shared)
+                self.assertFalse(t_fs is fs.fs)
+                core_fs.add(id(t_fs))
+            self.assertEqual(len(core_fs), 2)
+
 
 class TestHDFS(TestCommon):
 
@@ -205,6 +273,10 @@ def suite():
     suite_ = unittest.TestSuite()
     suite_.addTest(TestConnection('connect'))
     suite_.addTest(TestConnection('cache'))
+    suite_.addTest(TestConnection('double_close'))
+    suite_.addTest(TestConnection('close_shared'))
+    suite_.addTest(TestConnection('concurrent'))
+    suite_.addTest(TestConnection('per_thread'))
     tests = common_tests()
     if not hdfs.default_is_local():
         tests.extend([
@@ -0,0 +1,109 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+
+from pydoop.hdfs.listing import Listing, PathInfo, _tobytes
+
+
+def make_info(i, kind="file"):
+    return {
+        "name": "hdfs://localhost:9000/user/foo/part-%05d" % i,
+        "path": "hdfs://localhost:9000/user/foo/part-%05d" % i,
+        "kind": kind,
+        "group": "supergroup",
+        "owner": "foo",
+        "last_mod": 1500000000 + i,
+        "last_access": 1500000001 + i,
+        "replication": 3,
+        "permissions": 0o644,
+        "block_size": 128 * 2 ** 20,
+        "size": 2 ** 40 + i,
+    }
+
+
+class TestPathInfo(unittest.TestCase):
+
+    def runTest(self):
+        d = make_info(0)
+        info = PathInfo.from_dict(d)
+        self.assertEqual(info, d)
+        self.assertEqual(info.to_dict(), d)
+        self.assertEqual(sorted(info.keys()), sorted(d))
+        for k, v in d.items():
+            self.assertEqual(info[k], v)
+            self.assertTrue(k in info)
+        self.assertRaises(KeyError, info.__getitem__, "foo")
+        self.assertIsNone(info.get("foo"))
+        self.assertNotEqual(info, make_info(1))
+        self.assertRaises(AttributeError, setattr, info, "foo", 1)
+
+
+class TestListing(unittest.TestCase):
+
+    def setUp(self):
+        self.infos = [make_info(i, "directory" if i % 3 else "file")
+                      for i in range(10)]
+
+    def test_build(self):
+        listing = Listing(self.infos)
+        self.assertEqual(len(listing), len(self.infos))
+        self.assertEqual(list(listing), self.infos)
+        self.assertEqual(listing[-1], self.infos[-1])
+        self.assertEqual(list(listing[2:5]), self.infos[2:5])
+        self.assertEqual(list(listing.size), [_["size"] for _ in self.infos])
+        self.assertTrue(all(_ is listing.owner[0] for _ in listing.owner))
+        other = Listing(self.infos[:4])
+        other.extend(Listing(self.infos[4:]))
+        self.assertEqual(list(other), self.infos)
+
+    def test_from_columns(self):
+        listing = Listing(self.infos)
+        columns = [listing.name, _tobytes(listing.kind),
+                   listing.owner, listing.group]
+        for f in Listing.INT_FIELDS:
+            columns.append(_tobytes(getattr(listing, f)))
+        self.assertEqual(list(Listing.from_columns(tuple(columns))),
+                         self.infos)
+
+    def test_to_numpy(self):
+        try:
+            import numpy as np
+        except ImportError:
+            return
+        d = Listing(self.infos).to_numpy()
+        self.assertEqual(list(d["name"]), [_["name"] for _ in self.infos])
+        self.assertEqual(d["size"].dtype, np.int64)
+        self.assertEqual(list(d["size"]), [_["size"] for _ in self.infos])
+        self.assertEqual(
+            list(d["kind"]), [_["kind"] == "directory" for _ in self.infos]
+        )
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestPathInfo())
+    suite_.addTest(TestListing('test_build'))
+    suite_.addTest(TestListing('test_from_columns'))
+    suite_.addTest(TestListing('test_to_numpy'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
@@ -22,6 +22,7 @@ import tempfile
 import os
 
 import pydoop.hdfs as hdfs
+from pydoop.hdfs.core import CoreLocalFs
 from common_hdfs_tests import TestCommon, common_tests
 
 
@@ -39,6 +40,21 @@ class TestConnection(unittest.TestCase):
         os.chdir(cwd)
 
 
+class TestNoJVM(unittest.TestCase):
+
+    def runTest(self):
+        with hdfs.hdfs("", 0) as fs:
+            self.assertTrue(isinstance(fs.fs, CoreLocalFs))
+            wd = tempfile.mkdtemp()
+            try:
+                info = fs.get_path_info(wd)
+                self.assertEqual(info["name"], "file:%s" % wd)
+                self.assertEqual(info["kind"], "directory")
+                self.assertEqual(fs.get_path_info(info["name"]), info)
+            finally:
+                fs.delete(wd)
+
+
 class TestLocalFS(TestCommon):
 
     def __init__(self, target):
@@ -48,6 +64,7 @@ class TestLocalFS(TestCommon):
 def suite():
     suite_ = unittest.TestSuite()
     suite_.addTest(TestConnection('runTest'))
+    suite_.addTest(TestNoJVM('runTest'))
     tests = common_tests()
     for t in tests:
         suite_.addTest(TestLocalFS(t))
@@ -0,0 +1,139 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+import tempfile
+import shutil
+import threading
+import os
+
+import pydoop.hdfs as hdfs
+from pydoop.hdfs.node_cache import NodeCache
+
+
+class TestNodeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.wd = tempfile.mkdtemp(prefix="pydoop_test_")
+        self.cache_dir = os.path.join(self.wd, "cache")
+        self.fs = hdfs.hdfs("", 0)
+
+    def tearDown(self):
+        self.fs.close()
+        shutil.rmtree(self.wd)
+
+    def __make_file(self, name, data):
+        path = os.path.join(self.wd, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_fetch(self):
+        cache = NodeCache(self.cache_dir)
+        path = self.__make_file("f", b"data")
+        local_path = cache.fetch(self.fs, path)
+        self.assertEqual(os.path.dirname(local_path), cache.directory)
+        with open(local_path, "rb") as f:
+            self.assertEqual(f.read(), b"data")
+        self.assertEqual(cache.fetch(self.fs, path), local_path)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(sorted(os.listdir(self.cache_dir)),
+                         [os.path.basename(local_path)])
+        # a different size means a different file
+        self.__make_file("f", b"new data")
+        new_local_path = cache.fetch(self.fs, path)
+        self.assertNotEqual(new_local_path, local_path)
+        with open(new_local_path, "rb") as f:
+            self.assertEqual(f.read(), b"new data")
+        self.assertRaises(IOError, cache.fetch, self.fs, self.wd)
+        self.assertRaises(IOError, cache.fetch, self.fs, path + "_none")
+        self.assertRaises(ValueError, NodeCache, self.cache_dir, max_size=0)
+
+    def test_evict(self):
+        cache = NodeCache(self.cache_dir, max_size=10)
+        paths = [self.__make_file("f%d" % i, b"x" * 4) for i in range(3)]
+        local_paths = [cache.fetch(self.fs, _) for _ in paths[:2]]
+        self.assertEqual(cache.size(), 8)
+        os.utime(local_paths[0], (0, 0))
+        os.utime(local_paths[1], (1, 1))
+        cache.fetch(self.fs, paths[0])  # now the most recently used
+        cache.fetch(self.fs, paths[2])
+        self.assertEqual(cache.size(), 8)
+        self.assertTrue(os.path.exists(local_paths[0]))
+        self.assertFalse(os.path.exists(local_paths[1]))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)  # no locks left
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_fetch_open(self):
+        cache = NodeCache(self.cache_dir)
+        path = self.__make_file("f", b"data")
+        opened = []
+
+        def opener(local_path):
+            if not opened:  # evicted by someone else before opening
+                os.unlink(local_path)
+            opened.append(local_path)
+            return open(local_path, "rb")
+        with cache.fetch_open(self.fs, path, opener) as f:
+            self.assertEqual(f.read(), b"data")
+        self.assertEqual(len(opened), 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertRaises(IOError, cache.fetch_open, self.fs, path,
+                          lambda p: open(p + "_none", "rb"))
+
+    def test_concurrent(self):
+        path = self.__make_file("f", os.urandom(1000000))
+        caches = [NodeCache(self.cache_dir) for _ in range(8)]
+        results = []
+
+        def fetch(cache):
+            results.append(cache.fetch(self.fs, path))
+
+        threads = [threading.Thread(target=fetch, args=(_,)) for _ in caches]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(sum(_.misses for _ in caches), 1)
+        self.assertEqual(os.listdir(self.cache_dir),
+                         [os.path.basename(results[0])])
+
+    def test_open(self):
+        path = self.__make_file("f", b"data")
+        # local paths are read directly
+        with hdfs.open(path, cache="node") as f:
+            self.assertEqual(f.read(), b"data")
+        f.fs.close()
+        self.assertRaises(ValueError, hdfs.open, path, cache="foo")
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestNodeCache('test_fetch'))
+    suite_.addTest(TestNodeCache('test_evict'))
+    suite_.addTest(TestNodeCache('test_fetch_open'))
+    suite_.addTest(TestNodeCache('test_concurrent'))
+    suite_.addTest(TestNodeCache('test_open'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
@@ -230,15 +230,91 @@ class TestSplitBasenameDirname(unittest.TestCase):
 
 class TestExists(unittest.TestCase):
 
+    def setUp(self):
+        self.base_path = make_random_str()
+
+    def tearDown(self):
+        for path in self.base_path, self.base_path + UNI_CHR:
+            if hdfs.path.exists(path):
+                hdfs.rmr(path)
+
     def good(self):
-        base_path = make_random_str()
-        for path in base_path, base_path + UNI_CHR:
+        for path in self.base_path, self.base_path + UNI_CHR:
             hdfs.dump("foo\n", path)
             self.assertTrue(hdfs.path.exists(path))
             hdfs.rmr(path)
             self.assertFalse(hdfs.path.exists(path))
 
 
+class TestMany(unittest.TestCase):
+
+    def setUp(self):
+        self.wd = tempfile.mkdtemp(suffix='_%s' % UNI_CHR)
+        self.paths = ['file:%s/%d' % (self.wd, i) for i in range(10)]
+        for p in self.paths[::2]:
+            hdfs.dump("foo\n", p)
+
+    def tearDown(self):
+        hdfs.rmr('file:%s' % self.wd)
+
+    def exists_many(self):
+        for workers in 1, 4:
+            self.assertEqual(
+                hdfs.path.exists_many(self.paths, workers=workers),
+                [i % 2 == 0 for i in range(len(self.paths))]
+            )
+        self.assertEqual(hdfs.path.exists_many([]), [])
+
+    def stat_many(self):
+        for workers in 1, 4:
+            res = hdfs.path.stat_many(self.paths, workers=workers)
+            self.assertEqual(len(res), len(self.paths))
+            for i, (p, st) in enumerate(zip(self.paths, res)):
+                if i % 2:
+                    self.assertTrue(st is None)
+                else:
+                    self.assertEqual(st.st_size, 4)
+                    self.assertEqual(st.name, hdfs.path.stat(p).name)
+
+
+class TestMemo(unittest.TestCase):
+
+    def split(self):
+        p = 'hdfs://localhost:9000/a/%s' % UNI_CHR
+        r = hdfs.path.split(p)
+        self.assertTrue(hdfs.path.split(p) is r)
+        self.assertEqual(hdfs.path.split(p, "foo"), r)
+        hdfs.path.clear_cache()
+        self.assertEqual(hdfs.path.split(p), r)
+        for _ in range(2):
+            self.assertRaises(ValueError, hdfs.path.split, 'hdfs:')
+
+    def abspath(self):
+        if not hdfs.default_is_local():
+            return
+        old_wd = os.getcwd()
+        try:
+            for wd in '/', '/tmp':
+                os.chdir(wd)
+                self.assertEqual(
+                    hdfs.path.abspath('b'), 'file:%s' % os.path.abspath('b')
+                )
+                self.assertEqual(hdfs.path.abspath('/a/../b'), 'file:/b')
+        finally:
+            os.chdir(old_wd)
+
+    def handles(self):
+        # other handles to the same fs may be open: check cache state
+        fs = hdfs.path._handle('', 0)
+        self.assertTrue(hdfs.path._handle('', 0) is fs)
+        self.assertTrue(hdfs.path._HANDLES[('', 0, None)] is fs)
+        hdfs.path.clear_cache()
+        self.assertEqual(hdfs.path._HANDLES, {})
+        self.assertFalse(hdfs.path._handle('', 0) is fs)
+        self.assertEqual(list(hdfs.path._HANDLES), [('', 0, None)])
+        self.assertTrue(hdfs.path.exists('file:/'))
+
+
 class TestKind(unittest.TestCase):
 
     def setUp(self):
@@ -451,6 +527,13 @@ class TestReal(unittest.TestCase):
 
 class TestSame(unittest.TestCase):
 
+    def setUp(self):
+        self.path = make_random_str() + UNI_CHR
+
+    def tearDown(self):
+        if hdfs.path.exists(self.path):
+            hdfs.rmr(self.path)
+
     def samefile_link(self):
         wd_ = tempfile.mkdtemp(prefix='pydoop_', suffix=UNI_CHR)
         wd = 'file:%s' % wd_
@@ -460,10 +543,9 @@ class TestSame(unittest.TestCase):
         hdfs.rmr(wd)
 
     def samefile_rel(self):
-        p = make_random_str() + UNI_CHR
+        p = self.path
         hdfs.dump("foo\n", p)
         self.assertTrue(hdfs.path.samefile(p, hdfs.path.abspath(p)))
-        hdfs.rmr(p)
 
     def samefile_norm(self):
         for pre in '', 'file:/', 'hdfs://host:1/':
@@ -499,9 +581,15 @@ class TestAccess(unittest.TestCase):
 
 class TestUtime(unittest.TestCase):
 
+    def setUp(self):
+        self.path = make_random_str() + UNI_CHR
+        hdfs.dump("foo\n", self.path)
+
+    def tearDown(self):
+        hdfs.rmr(self.path)
+
     def runTest(self):
-        path = make_random_str() + UNI_CHR
-        hdfs.dump("foo\n", path)
+        path = self.path
         st = hdfs.path.stat(path)
         atime, mtime = [getattr(st, 'st_%stime' % _) for _ in 'am']
         new_atime, new_mtime = atime + 100, mtime + 200
@@ -509,7 +597,6 @@ class TestUtime(unittest.TestCase):
         st = hdfs.path.stat(path)
         self.assertEqual(st.st_atime, new_atime)
         self.assertEqual(st.st_mtime, new_mtime)
-        hdfs.rmr(path)
 
 
 class TestCallFromHdfs(unittest.TestCase):
@@ -559,6 +646,11 @@ def suite():
     suite_.addTest(TestAbspath('already_absolute'))
     suite_.addTest(TestSplitBasenameDirname('runTest'))
     suite_.addTest(TestExists('good'))
+    suite_.addTest(TestMany('exists_many'))
+    suite_.addTest(TestMany('stat_many'))
+    suite_.addTest(TestMemo('split'))
+    suite_.addTest(TestMemo('abspath'))
+    suite_.addTest(TestMemo('handles'))
     suite_.addTest(TestExpand('expanduser'))
     suite_.addTest(TestExpand('expanduser_no_expansion'))
     suite_.addTest(TestExpand('expandvars'))
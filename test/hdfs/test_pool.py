@@ -0,0 +1,115 @@
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+import unittest
+import tempfile
+import shutil
+import threading
+import os
+
+import pydoop.hdfs as hdfs
+
+
+class TestHandlePool(unittest.TestCase):
+
+    def setUp(self):
+        self.wd = tempfile.mkdtemp(prefix="pydoop_test_")
+        self.paths = []
+        for i in range(4):
+            self.paths.append(os.path.join(self.wd, "f%d" % i))
+            self.__write(i, b"data %d" % i)
+
+    def tearDown(self):
+        shutil.rmtree(self.wd)
+
+    def __write(self, i, data):
+        with open(self.paths[i], "wb") as f:
+            f.write(data)
+
+    def test_reuse(self):
+        with hdfs.HandlePool(max_open=2) as pool:
+            with pool.open(self.paths[0]) as f:
+                self.assertEqual(f.read(), b"data 0")
+                f0 = f
+            with pool.open(self.paths[0]) as f:
+                self.assertTrue(f is f0)
+                self.assertEqual(f.read(), b"data 0")
+            self.assertEqual((pool.hits, pool.misses), (1, 1))
+            for p in self.paths[1:]:
+                with pool.open(p) as f:
+                    f.read()
+            self.assertEqual(len(pool), 2)
+            self.assertTrue(f0.closed)
+            with pool.open(self.paths[3]) as f:
+                self.assertEqual(f.pread(2, 3), b"ta ")
+            self.assertEqual((pool.hits, pool.misses), (2, 4))
+            self.assertRaises(IOError, pool.open(self.wd + "/none").__enter__)
+            self.assertEqual(len(pool), 2)
+        self.assertTrue(f.closed)
+        self.assertRaises(ValueError, pool.open(self.paths[0]).__enter__)
+        self.assertRaises(ValueError, hdfs.HandlePool, max_open=0)
+        self.assertRaises(ValueError, hdfs.HandlePool, mode="w")
+
+    def test_invalidate(self):
+        with hdfs.HandlePool(max_age=600) as pool:
+            with pool.open(self.paths[0]) as f:
+                self.assertEqual(f.read(), b"data 0")
+            self.__write(0, b"new data 0")
+            pool.invalidate(self.paths[0])
+            with pool.open(self.paths[0]) as f:
+                self.assertEqual(f.read(), b"new data 0")
+            self.assertEqual(pool.misses, 2)
+            pool.invalidate()
+            with pool.open(self.paths[0]) as f:
+                self.assertEqual(f.read(), b"new data 0")
+            self.assertEqual(pool.misses, 2)
+
+    def test_threads(self):
+        errors = []
+        with hdfs.HandlePool(max_open=2) as pool:
+
+            def run(i):
+                try:
+                    for j in range(50):
+                        k = (i + j) % len(self.paths)
+                        with pool.open(self.paths[k]) as f:
+                            self.assertEqual(f.read(), b"data %d" % k)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=run, args=(_,))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(errors, [])
+            self.assertTrue(len(pool) <= 2)
+
+
+def suite():
+    suite_ = unittest.TestSuite()
+    suite_.addTest(TestHandlePool('test_reuse'))
+    suite_.addTest(TestHandlePool('test_invalidate'))
+    suite_.addTest(TestHandlePool('test_threads'))
+    return suite_
+
+
+if __name__ == '__main__':
+    _RUNNER = unittest.TextTestRunner(verbosity=2)
+    _RUNNER.run((suite()))
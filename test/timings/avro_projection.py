@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+Measure the Avro decoding time saved by a projection schema.
+
+Writes records with a wide schema (``--n-fields`` string, long and
+double fields) to a temporary Avro file, then decodes the whole file
+with :class:`pydoop.avrolib.AvroBlockReader`, first with the full
+writer schema, then with a reader schema that selects only
+``--n-selected`` fields. Reports the best of ``--n-runs`` timings for
+each case.
+"""
+
+from __future__ import print_function
+
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from avro.datafile import DataFileWriter
+from avro.io import DatumWriter
+
+from pydoop.avrolib import AvroBlockReader, parse
+
+TYPES = ["string", "long", "double"]
+
+
+def wide_schema(n_fields, selected=None):
+    fields = [{"name": "f%d" % i, "type": TYPES[i % len(TYPES)]}
+              for i in range(n_fields)]
+    if selected is not None:
+        fields = [fields[i] for i in selected]
+    return json.dumps({
+        "type": "record", "name": "Wide", "namespace": "pydoop.timings",
+        "fields": fields,
+    })
+
+
+def make_record(n_fields, j):
+    def value(i):
+        t = TYPES[i % len(TYPES)]
+        if t == "string":
+            return "value-%d-%d" % (i, j)
+        return i * j if t == "long" else float(i) / (j + 1)
+    return dict(("f%d" % i, value(i)) for i in range(n_fields))
+
+
+def write_file(fn, n_fields, n_records, codec):
+    schema = parse(wide_schema(n_fields))
+    with open(fn, "wb") as f:
+        writer = DataFileWriter(f, DatumWriter(), schema, codec=codec)
+        for j in range(n_records):
+            writer.append(make_record(n_fields, j))
+        writer.close()
+
+
+def time_decode(fn, reader_schema, n_runs):
+    best, n = None, 0
+    for _ in range(n_runs):
+        with open(fn, "rb") as f:
+            start = time.time()
+            n = sum(1 for _ in AvroBlockReader(f, reader_schema=reader_schema))
+            t = time.time() - start
+        best = t if best is None else min(best, t)
+    return best, n
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--n-fields", type=int, default=200,
+                        help="number of fields in the writer schema")
+    parser.add_argument("--n-selected", type=int, default=5,
+                        help="number of fields in the projection")
+    parser.add_argument("--n-records", type=int, default=2000,
+                        help="number of records")
+    parser.add_argument("--codec", default="deflate",
+                        help="Avro codec for the test file")
+    parser.add_argument("-n", "--n-runs", type=int, default=3,
+                        help="number of measurements per case")
+    return parser
+
+
+def main(argv):
+    args = make_parser().parse_args(argv)
+    fd, fn = tempfile.mkstemp(suffix=".avro")
+    os.close(fd)
+    try:
+        write_file(fn, args.n_fields, args.n_records, args.codec)
+        step = max(args.n_fields // args.n_selected, 1)
+        selected = list(range(0, args.n_fields, step))[:args.n_selected]
+        full, n = time_decode(fn, None, args.n_runs)
+        proj, _ = time_decode(
+            fn, wide_schema(args.n_fields, selected), args.n_runs
+        )
+    finally:
+        os.remove(fn)
+    print("%d records, %d fields (%s)" % (n, args.n_fields, args.codec))
+    print("  full schema:          %6.3f s" % full)
+    print("  %3d-field projection: %6.3f s (%.1fx)" % (
+        len(selected), proj, full / proj
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
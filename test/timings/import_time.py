@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# BEGIN_COPYRIGHT
+#
+# Copyright 2009-2017 CRS4.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# END_COPYRIGHT
+
+"""
+Measure the time it takes to import Pydoop modules.
+
+Each measurement runs ``python -X importtime -c 'import MODULE'`` in a
+fresh interpreter (Python >= 3.7 is required). The script reports the
+median cumulative import time and the modules with the highest median
+self time. With ``--max-ms``, it exits with a nonzero status if the
+median import time exceeds the given threshold, so that it can be used
+to catch regressions.
+"""
+
+from __future__ import print_function
+
+import sys
+import os
+import argparse
+import subprocess
+
+DEFAULT_MODULES = ["pydoop", "pydoop.hdfs", "pydoop.mapreduce.pipes"]
+
+
+def median(values):
+    values = sorted(values)
+    n = len(values)
+    if n % 2:
+        return values[n // 2]
+    return (values[n // 2 - 1] + values[n // 2]) / 2.
+
+
+def parse_importtime(output):
+    """
+    Return a list of (module, self_us, cumulative_us) tuples.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cum_us = int(fields[0]), int(fields[1])
+        except ValueError:  # header
+            continue
+        records.append((fields[2].strip(), self_us, cum_us))
+    return records
+
+
+def time_import(module):
+    env = os.environ.copy()
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    p = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+        universal_newlines=True
+    )
+    _, err = p.communicate()
+    if p.returncode:
+        raise RuntimeError("importing %s failed:\n%s" % (module, err))
+    records = parse_importtime(err)
+    total = [cum for name, _, cum in records if name == module][-1]
+    return total, records
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("modules", metavar="MODULE", nargs="*",
+                        default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("-n", "--n-runs", type=int, default=10,
+                        help="number of measurements per module")
+    parser.add_argument("-t", "--top", type=int, default=10,
+                        help="number of most expensive modules to show")
+    parser.add_argument("--max-ms", type=float,
+                        help="fail if any median import time exceeds this")
+    return parser
+
+
+def main(argv):
+    if sys.version_info < (3, 7):
+        sys.exit("ERROR: -X importtime requires Python >= 3.7")
+    args = make_parser().parse_args(argv)
+    failed = False
+    for module in args.modules:
+        totals, self_times = [], {}
+        for _ in range(args.n_runs):
+            total, records = time_import(module)
+            totals.append(total)
+            for name, self_us, _ in records:
+                self_times.setdefault(name, []).append(self_us)
+        total_ms = median(totals) / 1000.
+        print("%s: %.1f ms (median of %d runs)" % (
+            module, total_ms, args.n_runs
+        ))
+        top = sorted(
+            ((median(v), k) for k, v in self_times.items()), reverse=True
+        )[:args.top]
+        for t, name in top:
+            print("  %8.1f ms  %s" % (t / 1000., name))
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print("  ERROR: above the %.1f ms threshold" % args.max_ms)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))